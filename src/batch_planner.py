@@ -0,0 +1,76 @@
+import math
+
+
+class BatchPlanner:
+    """Sizes generation batches from the observed tokens per row.
+
+    The first batch is sent with a conservative size; once its usage is
+    known, later batches are sized to fill the completion token budget.
+    """
+
+    def __init__(
+        self,
+        target_rows,
+        max_tokens=4000,
+        initial_batch_size=100,
+        min_batch_size=10,
+        max_batch_size=500,
+        token_headroom=0.85,
+        max_batches=50,
+    ):
+        self.target_rows = target_rows
+        self.max_tokens = max_tokens
+        self.initial_batch_size = initial_batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.token_headroom = token_headroom
+        self.max_batches = max_batches
+        self.tokens_per_row = None
+        self.batches_issued = 0
+        self.rows_collected = 0
+
+    def observe(self, rows, completion_tokens):
+        self.rows_collected += rows
+        if rows <= 0 or not completion_tokens:
+            return
+
+        sample = completion_tokens / rows
+        if self.tokens_per_row is None:
+            self.tokens_per_row = sample
+        else:
+            # Keep the worst case recent: lean towards the larger estimate so
+            # a wide batch does not get the next one truncated.
+            self.tokens_per_row = max(sample, 0.7 * self.tokens_per_row + 0.3 * sample)
+
+    def discard(self, rows):
+        # Rows rejected after observe() (e.g. duplicates) still count towards
+        # tokens per row, but have to be generated again.
+        self.rows_collected = max(0, self.rows_collected - rows)
+
+    @property
+    def remaining_rows(self):
+        return max(0, self.target_rows - self.rows_collected)
+
+    @property
+    def done(self):
+        return self.remaining_rows == 0 or self.batches_issued >= self.max_batches
+
+    def next_batch_size(self):
+        if self.tokens_per_row is None:
+            size = self.initial_batch_size
+        else:
+            size = int(self.max_tokens * self.token_headroom / self.tokens_per_row)
+        size = max(self.min_batch_size, min(size, self.max_batch_size))
+        return min(size, max(self.remaining_rows, 1))
+
+    def plan_wave(self, max_batches):
+        """Return the batch sizes to issue next, at most ``max_batches``."""
+        if self.done:
+            return []
+
+        size = self.next_batch_size()
+        count = math.ceil(self.remaining_rows / size)
+        count = min(count, max_batches, self.max_batches - self.batches_issued)
+        sizes = [size] * count
+        self.batches_issued += count
+        return sizes
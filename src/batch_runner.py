@@ -0,0 +1,274 @@
+"""Headless bulk generation from a JSONL file of jobs.
+
+Each line is one job, for example::
+
+    {"job_id": "customers", "prompt": "Customer demographics", "target_rows": 1000}
+    {"prompt": "Sensor readings", "amplify_rows": 1000000, "quality_threshold": 40}
+
+``prompt`` is required. ``target_rows`` defaults to the dataset config;
+with ``amplify_rows`` the job generates a seed and amplifies it locally
+(see ``amplify_dataset``). ``key_columns`` (e.g. ``["customer_id"]``) drops
+generated rows that repeat a key, on top of the columns the refined
+prompt marks unique. Every job gets ``<output-dir>/<job_id>/`` with
+``dataset.csv``, ``eda.json`` and ``feedback_prompt.txt``, and one summary
+line is appended to ``<output-dir>/results.jsonl``.
+
+Usage: python batch_runner.py jobs.jsonl --output-dir out --workers 4
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from feedback.eda_main import run_comprehensive_eda
+from feedback.feedback_generator import FeedbackGenerator
+from feedback.incremental_analyzer import IncrementalQualityTracker
+from generate import MAX_CONCURRENT_BATCHES, amplify_dataset, generate_multiple_batches
+from logger import logger
+from progress import LoggingProgressReporter
+from row_sink import CsvFileRowSink
+
+DEFAULT_WORKERS = 4
+EDA_SAMPLE_SIZE = 10_000
+RESULTS_FILE = "results.jsonl"
+
+
+def _job_id(spec, line_no):
+    job_id = str(spec.get("job_id") or f"job-{line_no:04d}")
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", job_id)
+
+
+def load_jobs(path):
+    """Parse the jobs file; returns ``(jobs, errors)`` with one entry per line."""
+    jobs, errors = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                spec = json.loads(line)
+            except json.JSONDecodeError as e:
+                errors.append((line_no, f"invalid JSON: {e}"))
+                continue
+            if not isinstance(spec, dict) or not str(spec.get("prompt", "")).strip():
+                errors.append((line_no, "missing 'prompt'"))
+                continue
+            keys = spec.get("key_columns")
+            if isinstance(keys, str):
+                spec["key_columns"] = [keys]
+            elif keys is not None and not (
+                isinstance(keys, list) and all(isinstance(k, str) for k in keys)
+            ):
+                errors.append((line_no, "'key_columns' must be a list of column names"))
+                continue
+            spec["job_id"] = _job_id(spec, line_no)
+            jobs.append(spec)
+
+    seen = set()
+    for spec in jobs:
+        if spec["job_id"] in seen:
+            errors.append((None, f"duplicate job_id '{spec['job_id']}'"))
+        seen.add(spec["job_id"])
+    return jobs, errors
+
+
+def _completed_jobs(output_dir):
+    path = os.path.join(output_dir, RESULTS_FILE)
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                done.add(record["job_id"])
+    return done
+
+
+def run_job(spec, output_dir, batch_slots=None, eda_sample_size=EDA_SAMPLE_SIZE):
+    """Generate one dataset and its EDA; returns the summary record."""
+    job_id = spec["job_id"]
+    job_dir = os.path.join(output_dir, job_id)
+    os.makedirs(job_dir, exist_ok=True)
+    dataset_path = os.path.join(job_dir, "dataset.csv")
+    if os.path.exists(dataset_path):
+        # The sink appends, so a rerun must start from an empty file
+        os.remove(dataset_path)
+
+    started = time.perf_counter()
+    record = {"job_id": job_id, "status": "failed", "dataset": dataset_path}
+    progress = LoggingProgressReporter(job_id)
+    tracker = None
+    if spec.get("quality_threshold"):
+        tracker = IncrementalQualityTracker(threshold=spec["quality_threshold"])
+
+    try:
+        sink = CsvFileRowSink(dataset_path)
+        report = None
+        if spec.get("amplify_rows"):
+            # target_rows, when given, sizes the model-generated seed
+            seed_kwargs = {}
+            if spec.get("target_rows"):
+                seed_kwargs["seed_rows"] = int(spec["target_rows"])
+            result, report = amplify_dataset(
+                spec["prompt"],
+                int(spec["amplify_rows"]),
+                **seed_kwargs,
+                sink=sink,
+                quality_tracker=tracker,
+                random_state=spec.get("seed"),
+                key_columns=spec.get("key_columns"),
+                progress=progress,
+                batch_slots=batch_slots,
+            )
+        else:
+            result = generate_multiple_batches(
+                spec["prompt"],
+                target_rows=spec.get("target_rows"),
+                sink=sink,
+                quality_tracker=tracker,
+                key_columns=spec.get("key_columns"),
+                progress=progress,
+                batch_slots=batch_slots,
+            )
+        sink.close()
+        if not result:
+            record["error"] = "no rows generated"
+            return record
+
+        record.update(rows=sink.row_count, content_hash=sink.content_hash)
+        results = run_comprehensive_eda(
+            dataset_path,
+            print_report=False,
+            save_feedback=False,
+            sample_size=eda_sample_size or None,
+        )
+        if results is None:
+            record["error"] = "EDA failed"
+            return record
+        if report is not None:
+            results["amplify"] = report
+        with open(os.path.join(job_dir, "eda.json"), "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, default=str)
+        FeedbackGenerator(results).save_feedback_prompt(
+            os.path.join(job_dir, "feedback_prompt.txt")
+        )
+
+        record.update(status="ok", overall_quality=results["quality_scores"]["overall"])
+        if report is not None:
+            record["fidelity"] = report["fidelity"]
+        return record
+    except Exception as e:
+        logger.exception(f"Job {job_id} failed")
+        record["error"] = f"{e.__class__.__name__}: {e}"
+        return record
+    finally:
+        record["elapsed"] = round(time.perf_counter() - started, 3)
+
+
+def run_batch(
+    jobs,
+    output_dir,
+    workers=DEFAULT_WORKERS,
+    max_concurrent_calls=MAX_CONCURRENT_BATCHES,
+    eda_sample_size=EDA_SAMPLE_SIZE,
+):
+    """Run ``jobs`` on a pool of ``workers`` threads.
+
+    ``max_concurrent_calls`` caps in-flight generation calls across all
+    jobs together, so adding workers overlaps refinement, validation and
+    EDA without raising the load on the model provider.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    batch_slots = threading.BoundedSemaphore(max(1, max_concurrent_calls))
+    results_path = os.path.join(output_dir, RESULTS_FILE)
+    records = []
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [
+            executor.submit(run_job, spec, output_dir, batch_slots, eda_sample_size)
+            for spec in jobs
+        ]
+        # Records are written from this thread as jobs finish, so an
+        # interrupted run keeps every completed job for --resume
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            with open(results_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+            detail = (
+                f"{record.get('rows')} rows, quality {record['overall_quality']:.1f}%"
+                if record["status"] == "ok"
+                else record.get("error")
+            )
+            print(
+                f"[{len(records)}/{len(jobs)}] {record['job_id']}: {record['status']} "
+                f"({detail}, {record['elapsed']:.1f}s)",
+                flush=True,
+            )
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate datasets from a JSONL file")
+    parser.add_argument("jobs", help="JSONL file with one job per line")
+    parser.add_argument("--output-dir", default="batch_output")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="jobs to run at the same time",
+    )
+    parser.add_argument(
+        "--max-concurrent-calls",
+        type=int,
+        default=MAX_CONCURRENT_BATCHES,
+        help="generation calls in flight across all jobs",
+    )
+    parser.add_argument(
+        "--eda-sample-size",
+        type=int,
+        default=EDA_SAMPLE_SIZE,
+        help="rows sampled for the EDA; 0 analyzes every row",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"skip jobs already recorded as ok in {RESULTS_FILE}",
+    )
+    args = parser.parse_args(argv)
+
+    jobs, errors = load_jobs(args.jobs)
+    for line_no, error in errors:
+        where = f"line {line_no}" if line_no else args.jobs
+        print(f"Skipping {where}: {error}", file=sys.stderr)
+    if any(line_no is None for line_no, _ in errors):
+        return 2
+
+    if args.resume:
+        done = _completed_jobs(args.output_dir)
+        jobs = [spec for spec in jobs if spec["job_id"] not in done]
+        if done:
+            print(f"Resuming: {len(done)} jobs already complete")
+
+    records = run_batch(
+        jobs,
+        args.output_dir,
+        workers=args.workers,
+        max_concurrent_calls=args.max_concurrent_calls,
+        eda_sample_size=args.eda_sample_size,
+    )
+    failed = [r for r in records if r["status"] != "ok"]
+    print(f"{len(records) - len(failed)}/{len(records)} jobs succeeded")
+    return 1 if failed or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
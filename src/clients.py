@@ -0,0 +1,62 @@
+import os
+import threading
+import httpx
+from openai import OpenAI
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+MAX_CONNECTIONS = int(os.getenv("http_max_connections", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("http_max_keepalive_connections", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("http_keepalive_expiry", "120"))
+REQUEST_TIMEOUT = float(os.getenv("http_request_timeout", "300"))
+
+try:
+    import h2  # noqa: F401
+
+    http2_available = True
+except ImportError:
+    http2_available = False
+
+# Clients live at module scope so they survive Streamlit reruns and are
+# shared by every session in the process.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _build_http_client():
+    return httpx.Client(
+        http2=http2_available,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=10.0),
+    )
+
+
+def get_client(api_key, base_url=OPENROUTER_BASE_URL):
+    key = (base_url, api_key)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                http_client=_build_http_client(),
+                # Retries are handled by retry.call_with_retry
+                max_retries=0,
+            )
+            _clients[key] = client
+    return client
+
+
+def close_clients():
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
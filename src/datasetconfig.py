@@ -1,4 +1,8 @@
 class DatasetConfig:
+    def __init__(self):
+        self.rows(max_rows=1000, min_rows=50)
+        self.columns(max_columns=8, min_columns=2)
+
     def rows(self, max_rows, min_rows):
         self.max_rows = max_rows
         self.min_rows = min_rows
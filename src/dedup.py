@@ -0,0 +1,110 @@
+import csv
+import hashlib
+from logger import logger
+
+
+def _digest(values):
+    return hashlib.blake2b("\x1f".join(values).encode("utf-8"), digest_size=8).digest()
+
+
+class RowDeduplicator:
+    """Drops generated rows that repeat a row (or key) from earlier batches.
+
+    Rows are normalized (fields stripped and case-folded) and remembered as
+    8-byte digests, so even large jobs keep only a small set in memory.
+    With ``key_columns`` a row is also dropped when its composite key was
+    already seen, e.g. a repeated ``id``; each of ``unique_columns`` is
+    checked on its own, e.g. both ``id`` and ``email``. Per-batch counts
+    are kept in ``batch_stats``.
+    """
+
+    def __init__(self, key_columns=None, unique_columns=None):
+        self.key_columns = list(key_columns or [])
+        self.unique_columns = list(unique_columns or [])
+        self._key_indices = None
+        self._rows = set()
+        self._keys = []
+        self.rows_seen = 0
+        self.duplicates = 0
+        self.batch_stats = []
+
+    def set_header(self, header):
+        keys = [self.key_columns] if self.key_columns else []
+        keys += [[c] for c in self.unique_columns if [c] not in keys]
+        if self._key_indices is not None or not keys:
+            return
+        columns = [c.strip().casefold() for c in self._fields(header)]
+        missing = [
+            c
+            for c in dict.fromkeys(c for key in keys for c in key)
+            if c.strip().casefold() not in columns
+        ]
+        if missing:
+            logger.warning(f"Key columns not in header, ignoring: {missing}")
+        self._key_indices = []
+        for key in keys:
+            indices = [
+                columns.index(c.strip().casefold()) for c in key if c not in missing
+            ]
+            if indices:
+                self._key_indices.append(indices)
+                self._keys.append(set())
+
+    def _fields(self, line):
+        if '"' not in line:
+            return line.split(",")
+        return next(csv.reader([line]))
+
+    def _normalize(self, line):
+        return [field.strip().casefold() for field in self._fields(line)]
+
+    def is_duplicate(self, line):
+        fields = self._normalize(line)
+        row_digest = _digest(fields)
+        if row_digest in self._rows:
+            return True
+
+        if self._key_indices:
+            key_digests = [
+                _digest([fields[i] if i < len(fields) else "" for i in indices])
+                for indices in self._key_indices
+            ]
+            if any(d in seen for d, seen in zip(key_digests, self._keys)):
+                return True
+            for digest, seen in zip(key_digests, self._keys):
+                seen.add(digest)
+
+        self._rows.add(row_digest)
+        return False
+
+    def filter(self, lines, batch_num=None, completion_tokens=None):
+        """Return the rows of one batch that were not seen before."""
+        kept = [line for line in lines if not self.is_duplicate(line)]
+        self.record_batch(
+            len(lines), len(lines) - len(kept), batch_num, completion_tokens
+        )
+        return kept
+
+    def record_batch(self, rows, dropped, batch_num=None, completion_tokens=None):
+        """Count a batch checked row by row with ``is_duplicate``."""
+        self.rows_seen += rows
+        self.duplicates += dropped
+
+        stats = {
+            "batch": batch_num,
+            "rows": rows,
+            "duplicates": dropped,
+            "duplicate_rate": dropped / rows if rows else 0.0,
+        }
+        if completion_tokens and rows:
+            # Tokens spent on rows that were thrown away
+            stats["wasted_tokens"] = round(completion_tokens * dropped / rows)
+        self.batch_stats.append(stats)
+
+    @property
+    def duplicate_rate(self):
+        return self.duplicates / self.rows_seen if self.rows_seen else 0.0
+
+    @property
+    def wasted_tokens(self):
+        return sum(s.get("wasted_tokens", 0) for s in self.batch_stats)
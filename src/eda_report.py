@@ -1,16 +1,42 @@
+import argparse
 from feedback.eda_main import run_comprehensive_eda
 
+FAST_SAMPLE_SIZE = 10_000
+
 
 def main():
-    csv_file_path = "generated_dataset_batched.csv"
+    parser = argparse.ArgumentParser(description="Run EDA on a generated dataset")
+    parser.add_argument(
+        "csv_file_path", nargs="?", default="generated_dataset_batched.csv"
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help=f"analyze a random sample of {FAST_SAMPLE_SIZE} rows, with error bounds",
+    )
+    parser.add_argument(
+        "--sample-size", type=int, help="analyze a random sample of this many rows"
+    )
+    parser.add_argument("--strata", help="column to stratify the sample by")
+    args = parser.parse_args()
 
+    sample_size = args.sample_size or (FAST_SAMPLE_SIZE if args.fast else None)
     results = run_comprehensive_eda(
-        csv_file_path=csv_file_path, print_report=False, save_feedback=True
+        csv_file_path=args.csv_file_path,
+        print_report=False,
+        save_feedback=True,
+        sample_size=sample_size,
+        strata=args.strata,
     )
 
     if results:
         print("\nEDA analysis completed successfully!")
-        print(f"Overall Quality Score: {results['quality_scores']['overall']:.1f}%")
+        overall = results["quality_scores"]["overall"]
+        if "sampling" in results:
+            low, high = results["sampling"]["bounds"]["quality_scores"]["overall"]
+            print(f"Overall Quality Score: {overall:.1f}% ({low:.1f}-{high:.1f}%)")
+        else:
+            print(f"Overall Quality Score: {overall:.1f}%")
     else:
         print("EDA analysis failed. Please check your CSV file path and format.")
 
@@ -0,0 +1,257 @@
+"""Mergeable streaming accumulators used by the chunked analyzer.
+
+Each accumulator is updated with one chunk at a time (NumPy arrays or
+pandas Series) and can be merged with another instance of the same kind,
+so partial results from separate chunks or workers combine exactly as if
+the data had been seen in one pass.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def hash_values(values):
+    """Stable 64-bit hashes for a Series or DataFrame (row-wise)."""
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(np.uint64)
+
+
+class MomentsAccumulator:
+    """Count, mean, variance (Welford / Chan merge), min and max."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        other = MomentsAccumulator()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta**2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        # Sample standard deviation, matching DataFrame.describe()
+        if self.count < 2:
+            return np.nan
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+
+class HyperLogLog:
+    """Distinct-count estimate with ~1.04 / sqrt(2 ** precision) error."""
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = (hashes << np.uint64(p)) | np.uint64(1 << (p - 1))
+        # Position of the leftmost set bit in the remaining 64 - p bits
+        rank = (
+            64 - np.floor(np.log2(rest.astype(np.float64))).astype(np.int64)
+        ).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def update(self, values):
+        self.update_hashes(hash_values(pd.Series(values)))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class HashSet:
+    """Exact set of 64-bit hashes, counting repeats as they are added.
+
+    Hashes are kept as sorted, disjoint runs (8 bytes each). A run is
+    merged into the one before it once it has grown as large, so there are
+    O(log n) runs and a batch of b hashes costs O(b log n) lookups instead
+    of a pass over everything seen.
+    """
+
+    def __init__(self):
+        self.runs = []
+        self.size = 0
+
+    def add_hashes(self, hashes):
+        """Add ``hashes``; returns how many were already in the set (or
+        repeated within the batch)."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        new = np.unique(hashes)
+        for run in self.runs:
+            if not len(new):
+                break
+            positions = np.minimum(np.searchsorted(run, new), len(run) - 1)
+            new = new[run[positions] != new]
+        if len(new):
+            self.runs.append(new)
+            self.size += len(new)
+            while len(self.runs) > 1 and len(self.runs[-1]) >= len(self.runs[-2]):
+                last = self.runs.pop()
+                merged = np.concatenate([self.runs.pop(), last])
+                # Two sorted runs: mergesort finds them and merges linearly
+                merged.sort(kind="mergesort")
+                self.runs.append(merged)
+        return len(hashes) - len(new)
+
+    def merge(self, other):
+        for run in other.runs:
+            self.add_hashes(run)
+
+
+class TDigest:
+    """Merging t-digest for streaming quantile and CDF estimates."""
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._buffer = []
+        self._buffered = 0
+
+    @property
+    def count(self):
+        return float(self.weights.sum()) + self._buffered
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self._buffer.append(values)
+        self._buffered += len(values)
+        if self._buffered >= 20 * self.compression:
+            self._compress()
+
+    def merge(self, other):
+        other._compress()
+        self._compress()
+        self._merge_centroids(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights]),
+        )
+
+    def _compress(self):
+        if not self._buffered:
+            return
+        values = np.concatenate(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        self._merge_centroids(
+            np.concatenate([self.means, values]),
+            np.concatenate([self.weights, np.ones(len(values))]),
+        )
+
+    def _merge_centroids(self, means, weights):
+        if len(means) == 0:
+            return
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        # k1 scale function: centroids are small near the tails and large in
+        # the middle, which keeps extreme quantiles accurate.
+        cumulative = np.cumsum(weights) / total
+        k = (
+            self.compression
+            / (2 * np.pi)
+            * np.arcsin(2 * np.clip(cumulative, 0, 1) - 1)
+        )
+        groups = np.floor(k - k.min()).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+
+        merged_weights = np.add.reduceat(weights, starts)
+        merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.means, self.weights = merged_means, merged_weights
+
+    def quantile(self, q):
+        self._compress()
+        if len(self.means) == 0:
+            return np.nan
+        if len(self.means) == 1:
+            return float(self.means[0])
+        total = self.weights.sum()
+        centers = (np.cumsum(self.weights) - self.weights / 2) / total
+        return float(np.interp(q, centers, self.means))
+
+    def cdf(self, x):
+        self._compress()
+        if len(self.means) == 0:
+            return np.nan
+        total = self.weights.sum()
+        centers = (np.cumsum(self.weights) - self.weights / 2) / total
+        return float(np.interp(x, self.means, centers, left=0.0, right=1.0))
+
+
+class MisraGries:
+    """Top-k heavy hitters; reported counts are lower bounds."""
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counters = pd.Series(dtype="int64")
+
+    def update(self, values):
+        self.merge_counts(pd.Series(values).dropna().value_counts())
+
+    def merge(self, other):
+        self.merge_counts(other.counters)
+
+    def merge_counts(self, counts):
+        if len(counts) == 0:
+            return
+        if len(self.counters) == 0:
+            merged = counts.astype("int64")
+        else:
+            merged = self.counters.add(counts, fill_value=0).astype("int64")
+
+        if len(merged) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count from everything
+            cutoff = np.partition(merged.to_numpy(), -(self.capacity + 1))[
+                -(self.capacity + 1)
+            ]
+            merged = merged[merged > cutoff] - cutoff
+        self.counters = merged
+
+    def top(self, n=10):
+        return list(
+            self.counters.sort_values(ascending=False, kind="mergesort").head(n).items()
+        )
@@ -0,0 +1,235 @@
+"""Correlation and association measures for the quality analyzers.
+
+Numeric pairs use Pearson or Spearman matrices built from blocked
+co-moments, categorical pairs use bias-corrected Cramér's V, and
+categorical-vs-numeric pairs use the correlation ratio (eta). Tall or
+wide frames are sampled first, so the cost is bounded by the sample size
+rather than the dataset size.
+"""
+
+import numpy as np
+import pandas as pd
+
+CORRELATION_SAMPLE_ROWS = 100_000
+MAX_SAMPLE_CELLS = 10_000_000
+BLOCK_ROWS = 20_000
+MAX_CATEGORIES = 50
+DEFAULT_METHODS = ("pearson", "cramers_v", "correlation_ratio")
+
+
+def sample_rows(
+    df, sample_rows=CORRELATION_SAMPLE_ROWS, max_cells=MAX_SAMPLE_CELLS, seed=0
+):
+    if sample_rows is None:
+        return df
+    # Wide frames get fewer rows so the sample stays within max_cells
+    limit = min(sample_rows, max(1000, max_cells // max(1, df.shape[1])))
+    if len(df) <= limit:
+        return df
+    return df.sample(n=limit, random_state=seed)
+
+
+class _CoMoments:
+    """Pairwise-complete sums for an exact, blockable Pearson matrix."""
+
+    def __init__(self, first_chunk):
+        k = first_chunk.shape[1]
+        # Shifting by a rough centre keeps the sums well conditioned
+        self.shift = np.nan_to_num(first_chunk.mean().to_numpy(dtype="float64"))
+        self.n = np.zeros((k, k))
+        self.sx = np.zeros((k, k))
+        self.sxx = np.zeros((k, k))
+        self.sxy = np.zeros((k, k))
+
+    def update(self, chunk):
+        x = chunk.to_numpy(dtype="float64") - self.shift
+        present = ~np.isnan(x)
+        if present.all():
+            # No missing values: every pair shares all rows, one matmul
+            self.n += len(x)
+            self.sx += x.sum(axis=0)[:, None]
+            self.sxx += (x**2).sum(axis=0)[:, None]
+            self.sxy += x.T @ x
+            return
+
+        x0 = np.where(present, x, 0.0)
+        mask = present.astype("float64")
+        self.n += mask.T @ mask
+        self.sx += x0.T @ mask
+        self.sxx += (x0**2).T @ mask
+        self.sxy += x0.T @ x0
+
+    def correlation(self, columns):
+        n, sx, sxx = self.n, self.sx, self.sxx
+        cov = n * self.sxy - sx * sx.T
+        var_i = n * sxx - sx**2
+        var_j = var_i.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.sqrt(var_i * var_j)
+        corr[n < 2] = np.nan
+        return pd.DataFrame(np.clip(corr, -1, 1), index=columns, columns=columns)
+
+
+def correlation_matrix(frame, method="pearson", block_rows=BLOCK_ROWS):
+    """Pairwise-complete correlation of the numeric columns in ``frame``.
+
+    Rows are folded in ``block_rows`` at a time, so memory stays at one
+    block plus a few k x k matrices. Spearman correlates the ranks of
+    each column's non-null values.
+    """
+    columns = list(frame.columns)
+    if method == "spearman":
+        frame = frame.rank()
+    elif method != "pearson":
+        raise ValueError(f"Unknown correlation method: {method}")
+
+    co_moments = _CoMoments(frame.iloc[:block_rows])
+    for start in range(0, len(frame), block_rows):
+        co_moments.update(frame.iloc[start : start + block_rows])
+    return co_moments.correlation(columns)
+
+
+def high_pairs(matrix, threshold=0.7, method="pearson"):
+    """Pairs in the upper triangle of ``matrix`` with ``|value| > threshold``."""
+    values = matrix.to_numpy()
+    upper = np.triu(np.ones(values.shape, dtype=bool), k=1)
+    with np.errstate(invalid="ignore"):
+        rows, cols = np.nonzero(upper & (np.abs(values) > threshold))
+    columns = matrix.columns
+    return [
+        {
+            "col1": columns[i],
+            "col2": columns[j],
+            "correlation": float(values[i, j]),
+            "method": method,
+        }
+        for i, j in zip(rows, cols)
+    ]
+
+
+def _one_hot(coded, start, stop):
+    total = sum(k for _, k in coded)
+    block = np.zeros((stop - start, total))
+    rows = np.arange(stop - start)
+    offset = 0
+    for codes, k in coded:
+        c = codes[start:stop]
+        ok = c >= 0  # missing values get no indicator
+        block[rows[ok], offset + c[ok]] = 1.0
+        offset += k
+    return block
+
+
+def cramers_v(table):
+    """Bias-corrected Cramér's V (Bergsma 2013) of a contingency table."""
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    r, k = table.shape
+    n = table.sum()
+    if r < 2 or k < 2 or n < 2:
+        return np.nan
+
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    chi2 = ((table - expected) ** 2 / expected).sum()
+    phi2 = max(0.0, chi2 / n - (k - 1) * (r - 1) / (n - 1))
+    r_corr = r - (r - 1) ** 2 / (n - 1)
+    k_corr = k - (k - 1) ** 2 / (n - 1)
+    denom = min(k_corr - 1, r_corr - 1)
+    return float(np.sqrt(phi2 / denom)) if denom > 0 else np.nan
+
+
+def correlation_ratio(counts, sums, sums_sq):
+    """Correlation ratio (eta) from per-category counts, sums and sums of
+    squares; each argument is (categories x numeric columns)."""
+    n = counts.sum(axis=0)
+    total = sums.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grand = total**2 / n
+        between = np.where(counts > 0, sums**2 / counts, 0.0).sum(axis=0) - grand
+        ss_total = sums_sq.sum(axis=0) - grand
+        eta = np.sqrt(np.clip(between / ss_total, 0, 1))
+    eta[(n < 2) | ~(ss_total > 0)] = np.nan
+    return eta
+
+
+def categorical_associations(
+    frame,
+    categorical_cols,
+    numeric_cols,
+    threshold=0.7,
+    methods=DEFAULT_METHODS,
+    block_rows=BLOCK_ROWS,
+):
+    """High Cramér's V and correlation-ratio pairs in ``frame``.
+
+    Categories are one-hot encoded a block of rows at a time: one matmul
+    per block gives every pairwise contingency table, and one more per
+    statistic gives per-category counts, sums and sums of squares for all
+    numeric columns.
+    """
+    names, coded = [], []
+    for col in categorical_cols:
+        codes, uniques = pd.factorize(frame[col])
+        if 2 <= len(uniques) <= MAX_CATEGORIES:
+            names.append(col)
+            coded.append((codes, len(uniques)))
+    if not names:
+        return []
+
+    want_v = "cramers_v" in methods and len(names) > 1
+    want_eta = "correlation_ratio" in methods and len(numeric_cols) > 0
+    if not (want_v or want_eta):
+        return []
+
+    numeric = frame[numeric_cols]
+    # Centring keeps the sums of squares well conditioned; eta is unchanged
+    shift = np.nan_to_num(numeric.iloc[:block_rows].mean().to_numpy(dtype="float64"))
+    total = sum(k for _, k in coded)
+    tables = np.zeros((total, total))
+    counts = np.zeros((total, len(numeric_cols)))
+    sums = np.zeros_like(counts)
+    sums_sq = np.zeros_like(counts)
+    for start in range(0, len(frame), block_rows):
+        stop = min(start + block_rows, len(frame))
+        one_hot = _one_hot(coded, start, stop)
+        if want_v:
+            tables += one_hot.T @ one_hot
+        if want_eta:
+            x = numeric.iloc[start:stop].to_numpy(dtype="float64") - shift
+            present = ~np.isnan(x)
+            x0 = np.where(present, x, 0.0)
+            counts += one_hot.T @ present
+            sums += one_hot.T @ x0
+            sums_sq += one_hot.T @ (x0**2)
+
+    offsets = np.cumsum([0] + [k for _, k in coded])
+    pairs = []
+    if want_v:
+        for i, a in enumerate(names):
+            for j in range(i + 1, len(names)):
+                table = tables[offsets[i] : offsets[i + 1], offsets[j] : offsets[j + 1]]
+                value = cramers_v(table)
+                if value > threshold:
+                    pairs.append(
+                        {
+                            "col1": a,
+                            "col2": names[j],
+                            "correlation": value,
+                            "method": "cramers_v",
+                        }
+                    )
+
+    if want_eta:
+        for i, col in enumerate(names):
+            block = slice(offsets[i], offsets[i + 1])
+            etas = correlation_ratio(counts[block], sums[block], sums_sq[block])
+            for num_col, value in zip(numeric_cols, etas):
+                if value > threshold:
+                    pairs.append(
+                        {
+                            "col1": col,
+                            "col2": num_col,
+                            "correlation": float(value),
+                            "method": "correlation_ratio",
+                        }
+                    )
+    return pairs
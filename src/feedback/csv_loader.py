@@ -0,0 +1,355 @@
+"""CSV loading for messy LLM output.
+
+A bounded sample is sniffed for the dialect and ``is_clean_csv`` checks
+the field count of every record on raw byte blocks. Clean files, the
+common case, go straight to pandas' C parser; anything else is streamed
+through ``RepairingReader``, which fixes or quarantines malformed rows
+before the C parser sees them.
+
+The scan reads the whole file once before the parse reads it again. A
+sample would not do: the C parser pads short rows with NaN without a
+word, so a bad row past the sample would go unreported. The scan costs
+well under half of the parse and the second read comes from the page
+cache.
+"""
+
+import csv
+import io
+import itertools
+import numpy as np
+import pandas as pd
+
+SAMPLE_BYTES = 64 * 1024
+SCAN_BLOCK_BYTES = 8 * 1024 * 1024
+MAX_REPORTED_ROWS = 1000
+MAX_RECORD_LINES = 50
+
+
+def sniff_dialect(path, sample_bytes=SAMPLE_BYTES):
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        sample = f.read(sample_bytes)
+
+    # Drop a trailing partial line so the sniffer only sees whole records
+    if len(sample) == sample_bytes and "\n" in sample:
+        sample = sample[: sample.rindex("\n")]
+
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        return dialect.delimiter, dialect.quotechar or '"'
+    except csv.Error:
+        return ",", '"'
+
+
+def is_clean_csv(path, delimiter=",", quotechar='"', block_bytes=SCAN_BLOCK_BYTES):
+    """True when every non-blank record has as many fields as the header.
+
+    Delimiters and newlines inside quotes are masked out by the parity of
+    the quotes before them, carried from block to block, so the whole
+    check is a few numpy passes per block rather than a Python loop over
+    lines.
+    """
+    if len(delimiter) != 1 or len(quotechar) != 1:
+        return False
+    if ord(delimiter) > 127 or ord(quotechar) > 127:
+        return False
+    delim, quote = ord(delimiter), ord(quotechar)
+
+    expected = None
+    in_quotes = 0
+    # Delimiters and length of the record still open at the end of a block
+    open_fields = 0
+    open_length = 0
+    last_byte = -1
+
+    def check(fields, lengths, ends_with_cr):
+        nonlocal expected
+        blank = (lengths == 0) | ((lengths == 1) & ends_with_cr)
+        counts = fields[~blank]
+        if not len(counts):
+            return True
+        if expected is None:
+            expected = counts[0]
+        return bool((counts == expected).all())
+
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_bytes)
+            if not block:
+                break
+            buf = np.frombuffer(block, dtype=np.uint8)
+            newlines = np.flatnonzero(buf == 10)
+            delims = np.flatnonzero(buf == delim)
+            quotes = np.flatnonzero(buf == quote)
+            if len(quotes) or in_quotes:
+                # A position is quoted when an odd number of quotes precede it
+                newlines = newlines[
+                    (np.searchsorted(quotes, newlines) + in_quotes) & 1 == 0
+                ]
+                delims = delims[(np.searchsorted(quotes, delims) + in_quotes) & 1 == 0]
+                in_quotes = (in_quotes + len(quotes)) & 1
+            if len(newlines):
+                fields = np.diff(np.searchsorted(delims, newlines), prepend=0) + 1
+                fields[0] += open_fields
+                lengths = np.diff(newlines, prepend=-1) - 1
+                lengths[0] += open_length
+                before = newlines - 1
+                ends_with_cr = np.where(
+                    before >= 0, buf[np.maximum(before, 0)] == 13, last_byte == 13
+                )
+                if not check(fields, lengths, ends_with_cr):
+                    return False
+                open_fields = len(delims) - int(np.searchsorted(delims, newlines[-1]))
+                open_length = len(buf) - int(newlines[-1]) - 1
+            else:
+                open_fields += len(delims)
+                open_length += len(buf)
+            last_byte = int(buf[-1])
+
+    if in_quotes:
+        return False
+    if open_length:
+        trailing_cr = last_byte == 13
+        return check(
+            np.array([open_fields + 1]),
+            np.array([open_length]),
+            np.array([trailing_cr]),
+        )
+    return True
+
+
+def clean_report(delimiter, rows_read):
+    """Load report for a file that needed no repairs."""
+    return {
+        "delimiter": delimiter,
+        "rows_read": rows_read,
+        "fixed_count": 0,
+        "fixed_rows": [],
+        "quarantined_count": 0,
+        "quarantined_rows": [],
+        "dropped_count": 0,
+    }
+
+
+class RepairingReader(io.TextIOBase):
+    """File-like wrapper that yields a clean CSV stream.
+
+    Rows with too few fields are padded, rows whose extra fields are all
+    empty are trimmed, and anything else that does not match the header is
+    quarantined, as is a line whose opening quote is never closed, since it
+    would swallow the rest of the file. Markdown code fences around the CSV
+    are dropped.
+    """
+
+    def __init__(self, f, delimiter=",", quotechar='"'):
+        self._lines = enumerate(f, 1)
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.expected_fields = None
+        self.rows_read = 0
+        self.rows_written = 0
+        self.fixed_count = 0
+        self.quarantined_count = 0
+        self.fixed_rows = []
+        self.quarantined_rows = []
+        self._records = self._repaired_records()
+        self._buffer = ""
+        self._eof = False
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        parts = [self._buffer]
+        buffered = len(self._buffer)
+        while not self._eof and (size is None or size < 0 or buffered < size):
+            # Pull records in small groups to keep per-call overhead low
+            for _ in range(256):
+                record = next(self._records, None)
+                if record is None:
+                    self._eof = True
+                    break
+                parts.append(record)
+                buffered += len(record)
+
+        data = "".join(parts)
+        if size is None or size < 0:
+            self._buffer = ""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+    def _logical_records(self):
+        # Quoted fields can span lines; join until the quotes balance. When
+        # they never do, only the first line is given up (as unbalanced) and
+        # the lines read ahead are tried again as records of their own.
+        while True:
+            for line_no, line in self._lines:
+                record = line
+                if self.quotechar not in record:
+                    yield line_no, record.rstrip("\r\n"), True
+                    continue
+                joined = []
+                while (
+                    record.count(self.quotechar) % 2 and len(joined) < MAX_RECORD_LINES
+                ):
+                    nxt = next(self._lines, None)
+                    if nxt is None:
+                        break
+                    joined.append(nxt)
+                    record += nxt[1]
+                if record.count(self.quotechar) % 2:
+                    self._lines = itertools.chain(joined, self._lines)
+                    yield line_no, line.rstrip("\r\n"), False
+                    break
+                yield line_no, record.rstrip("\r\n"), True
+            else:
+                return
+
+    def _field_count(self, record):
+        if self.quotechar not in record:
+            return record.count(self.delimiter) + 1
+        return len(self._split(record))
+
+    def _split(self, record):
+        return next(
+            csv.reader([record], delimiter=self.delimiter, quotechar=self.quotechar)
+        )
+
+    def _join(self, fields):
+        out = io.StringIO()
+        csv.writer(
+            out,
+            delimiter=self.delimiter,
+            quotechar=self.quotechar,
+            lineterminator="",
+        ).writerow(fields)
+        return out.getvalue()
+
+    def _repaired_records(self):
+        for line_no, record, balanced in self._logical_records():
+            stripped = record.strip()
+            if not stripped or stripped.startswith("```"):
+                continue
+
+            if self.expected_fields is None:
+                self.expected_fields = self._field_count(record)
+                yield record + "\n"
+                continue
+
+            self.rows_read += 1
+            if not balanced:
+                self._quarantine(line_no, record)
+                continue
+            count = self._field_count(record)
+            if count == self.expected_fields:
+                self.rows_written += 1
+                yield record + "\n"
+                continue
+
+            if count < self.expected_fields:
+                repaired = record + self.delimiter * (self.expected_fields - count)
+            else:
+                fields = self._split(record)
+                extra = fields[self.expected_fields :]
+                if any(field.strip() for field in extra):
+                    self._quarantine(line_no, record)
+                    continue
+                repaired = self._join(fields[: self.expected_fields])
+
+            self.fixed_count += 1
+            if len(self.fixed_rows) < MAX_REPORTED_ROWS:
+                self.fixed_rows.append(line_no)
+            self.rows_written += 1
+            yield repaired + "\n"
+
+    def _quarantine(self, line_no, record):
+        self.quarantined_count += 1
+        if len(self.quarantined_rows) < MAX_REPORTED_ROWS:
+            self.quarantined_rows.append((line_no, record))
+
+    def report(self, parsed_rows=None):
+        """Load report; ``parsed_rows`` is how many rows the parser returned,
+        so rows it still dropped show up as ``dropped_count``."""
+        dropped = 0 if parsed_rows is None else self.rows_written - parsed_rows
+        return {
+            "delimiter": self.delimiter,
+            "rows_read": self.rows_read,
+            "fixed_count": self.fixed_count,
+            "fixed_rows": self.fixed_rows,
+            "quarantined_count": self.quarantined_count,
+            "quarantined_rows": self.quarantined_rows,
+            "dropped_count": dropped,
+        }
+
+
+def open_repaired_csv(path, sample_bytes=SAMPLE_BYTES):
+    delimiter, quotechar = sniff_dialect(path, sample_bytes)
+    f = open(path, "r", encoding="utf-8", errors="replace", newline="")
+    return RepairingReader(f, delimiter, quotechar), f
+
+
+def load_csv(path, sample_bytes=SAMPLE_BYTES, **read_csv_kwargs):
+    """Read ``path``, repairing it only when needed; returns ``(df, report)``."""
+    delimiter, quotechar = sniff_dialect(path, sample_bytes)
+    if is_clean_csv(path, delimiter, quotechar):
+        try:
+            df = pd.read_csv(
+                path,
+                sep=delimiter,
+                quotechar=quotechar,
+                engine="c",
+                encoding_errors="replace",
+                **read_csv_kwargs,
+            )
+            return df, clean_report(delimiter, len(df))
+        except pd.errors.ParserError:
+            pass
+
+    reader, f = open_repaired_csv(path, sample_bytes)
+    try:
+        df = pd.read_csv(
+            reader,
+            sep=reader.delimiter,
+            quotechar=reader.quotechar,
+            engine="c",
+            on_bad_lines="skip",
+            **read_csv_kwargs,
+        )
+    finally:
+        f.close()
+    return df, reader.report(parsed_rows=len(df))
+
+
+def iter_csv_chunks(path, chunksize, report, sample_bytes=SAMPLE_BYTES):
+    """Yield frames of ``chunksize`` rows; ``report`` (a dict) is filled
+    with the load report once the whole file has been read."""
+    delimiter, quotechar = sniff_dialect(path, sample_bytes)
+    if is_clean_csv(path, delimiter, quotechar):
+        rows = 0
+        for chunk in pd.read_csv(
+            path,
+            sep=delimiter,
+            quotechar=quotechar,
+            chunksize=chunksize,
+            encoding_errors="replace",
+        ):
+            rows += len(chunk)
+            yield chunk
+        report.update(clean_report(delimiter, rows))
+        return
+
+    reader, f = open_repaired_csv(path, sample_bytes)
+    rows = 0
+    try:
+        for chunk in pd.read_csv(
+            reader,
+            sep=reader.delimiter,
+            quotechar=reader.quotechar,
+            chunksize=chunksize,
+            on_bad_lines="skip",
+        ):
+            rows += len(chunk)
+            yield chunk
+    finally:
+        f.close()
+        report.update(reader.report(parsed_rows=rows))
@@ -1,214 +1,335 @@
+import os
 import pandas as pd
 import numpy as np
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from .correlations import (
+    CORRELATION_SAMPLE_ROWS,
+    DEFAULT_METHODS,
+    MAX_CATEGORIES,
+    categorical_associations,
+    correlation_matrix,
+    high_pairs,
+    sample_rows,
+)
+from .csv_loader import load_csv
+from .dtype_optimizer import optimize_dtypes as optimize_frame_dtypes
+from .size_accounting import estimate_csv_size, file_size_bytes, memory_usage_bytes
 
 warnings.filterwarnings("ignore")
 
 
-class DataQualityAnalyzer:
-    def __init__(self, csv_file_path):
-        self.csv_file_path = csv_file_path
-        self.df = self._load_csv_robust()
-        self.results = {}
+def _profile_text_column(series):
+    values = series.dropna()
+    counts = values.value_counts()
+    # Categorical columns report unused categories with a zero count
+    counts = counts[counts > 0]
 
-    def _load_csv_robust(self):
+    # String checks run on the distinct values and are weighted by their
+    # counts, which is far cheaper than touching every row.
+    distinct = counts.index.astype(str)
+    stripped = distinct.str.strip()
+    lengths = distinct.str.len()
+
+    most_common = None
+    if len(counts) > 0:
+        tied = counts.index[counts.to_numpy() == counts.iloc[0]]
         try:
-            df = pd.read_csv(self.csv_file_path)
+            most_common = min(tied)
+        except TypeError:
+            most_common = tied[0]
+
+    total = counts.sum()
+    return {
+        "unique_count": len(counts),
+        "lower_unique_count": distinct.str.lower().nunique(),
+        "most_common": most_common,
+        "value_counts": counts.head(10).to_dict(),
+        "empty_count": int(counts[(stripped == "")].sum()),
+        "untrimmed_count": int(counts[(lengths != stripped.str.len())].sum()),
+        "mean_length": (
+            float((lengths.to_numpy() * counts.to_numpy()).sum() / total)
+            if total
+            else 0.0
+        ),
+    }
+
+
+def _profile_columns(df, text_cols):
+    """Per-column part of the profile; runs in worker processes for shards."""
+    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    other_cols = [col for col in df.columns if col not in set(text_cols)]
+
+    text = {col: _profile_text_column(df[col]) for col in text_cols}
+
+    unique_counts = pd.Series(0, index=df.columns, dtype="int64")
+    if other_cols:
+        unique_counts[other_cols] = df[other_cols].nunique()
+    for col, info in text.items():
+        unique_counts[col] = info["unique_count"]
+
+    numeric_summary = None
+    outlier_counts = None
+    negative_counts = None
+    if numeric_cols:
+        numeric = df[numeric_cols]
+        numeric_summary = numeric.describe()
+        q1 = numeric_summary.loc["25%"]
+        q3 = numeric_summary.loc["75%"]
+        iqr = q3 - q1
+        outlier_counts = (numeric.lt(q1 - 1.5 * iqr) | numeric.gt(q3 + 1.5 * iqr)).sum()
+        negative_counts = numeric.lt(0).sum()
+
+    return {
+        "null_counts": df.isnull().sum(),
+        "non_null_counts": df.count(),
+        "unique_counts": unique_counts,
+        "numeric_columns": numeric_cols,
+        "numeric_summary": numeric_summary,
+        "outlier_counts": outlier_counts,
+        "negative_counts": negative_counts,
+        "text": text,
+    }
+
+
+def _merge_column_profiles(partials, columns, text_cols):
+    numeric_cols = [
+        col for col in columns if any(col in p["numeric_columns"] for p in partials)
+    ]
+
+    def concat_series(key, index):
+        parts = [p[key] for p in partials if p[key] is not None]
+        if not parts:
+            return None
+        return pd.concat(parts).reindex(index)
+
+    summaries = [
+        p["numeric_summary"] for p in partials if p["numeric_summary"] is not None
+    ]
+    text = {}
+    for p in partials:
+        text.update(p["text"])
+
+    return {
+        "null_counts": concat_series("null_counts", columns),
+        "non_null_counts": concat_series("non_null_counts", columns),
+        "unique_counts": concat_series("unique_counts", columns),
+        "numeric_columns": numeric_cols,
+        "numeric_summary": (
+            pd.concat(summaries, axis=1)[numeric_cols] if summaries else None
+        ),
+        "outlier_counts": concat_series("outlier_counts", numeric_cols),
+        "negative_counts": concat_series("negative_counts", numeric_cols),
+        "text": {col: text[col] for col in text_cols},
+    }
+
+
+class DataQualityAnalyzer:
+    def __init__(
+        self,
+        csv_file_path,
+        workers=1,
+        memory_mode="cheap",
+        df=None,
+        optimize_dtypes=False,
+        correlation_sample_rows=CORRELATION_SAMPLE_ROWS,
+    ):
+        self.csv_file_path = csv_file_path
+        # Correlations are computed on at most this many sampled rows
+        self.correlation_sample_rows = correlation_sample_rows
+        # Number of processes used to profile columns; 1 keeps it serial
+        self.workers = workers or os.cpu_count() or 1
+        # "cheap" estimates string memory from the profile, "deep" measures it
+        self.memory_mode = memory_mode
+        self.load_report = None
+        self.df = df if df is not None else self._load_csv_robust()
+        self.dtype_report = None
+        if optimize_dtypes:
+            # Dates stay text: the checks and summaries treat them as
+            # categorical values, as they do without optimization
+            self.df, self.dtype_report = optimize_frame_dtypes(
+                self.df, parse_dates=False
+            )
             print(
-                f"CSV loaded successfully with {df.shape[0]} rows and {df.shape[1]} columns"
+                f"Optimized dtypes: {self.dtype_report['before_bytes'] / 1024:.0f} KB -> "
+                f"{self.dtype_report['after_bytes'] / 1024:.0f} KB"
             )
-            return df
-        except pd.errors.ParserError as e:
-            print(f"CSV parsing error: {e}")
-            print("Attempting robust parsing methods...")
-
-            try:
-                df = pd.read_csv(
-                    self.csv_file_path, error_bad_lines=False, warn_bad_lines=True
-                )
-                print(
-                    f"CSV loaded with bad lines skipped: {df.shape[0]} rows and {df.shape[1]} columns"
-                )
-                return df
-            except:
-                pass
-
-            try:
-                df = pd.read_csv(self.csv_file_path, sep=None, engine="python")
-                print(
-                    f"CSV loaded with auto-detected separator: {df.shape[0]} rows and {df.shape[1]} columns"
-                )
-                return df
-            except:
-                pass
-
-            try:
-                df = pd.read_csv(self.csv_file_path, quoting=3)  # QUOTE_NONE
-                print(
-                    f"CSV loaded with no quoting: {df.shape[0]} rows and {df.shape[1]} columns"
-                )
-                return df
-            except:
-                pass
-
-            try:
-                df = self._fix_csv_and_load()
-                print(
-                    f"CSV loaded after manual fixing: {df.shape[0]} rows and {df.shape[1]} columns"
-                )
-                return df
-            except Exception as fix_error:
-                print(f"All parsing methods failed: {fix_error}")
-                raise
-
-    def _fix_csv_and_load(self):
-        import csv
-        import io
-
-        print("Analyzing CSV structure...")
-
-        with open(self.csv_file_path, "r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
-
-        if len(lines) < 2:
-            raise ValueError("CSV file has insufficient data")
-
-        header_line = lines[0].strip()
-        expected_columns = len(header_line.split(","))
-        print(f"Expected columns from header: {expected_columns}")
-
-        problematic_lines = []
-        for i, line in enumerate(lines[1:], 2):
-            field_count = len(line.split(","))
-            if field_count != expected_columns:
-                problematic_lines.append((i, field_count))
-                if len(problematic_lines) <= 5:
-                    print(
-                        f"Line {i}: has {field_count} fields (expected {expected_columns})"
-                    )
-
-        if problematic_lines:
-            print(f"Found {len(problematic_lines)} problematic lines")
+        self.results = {}
+        self._profile = None
 
-            fixed_lines = [lines[0]]
+    @classmethod
+    def from_dataframe(cls, df, **kwargs):
+        return cls(None, df=df, **kwargs)
 
-            for line in lines[1:]:
-                fields = line.strip().split(",")
-                if len(fields) > expected_columns:
-                    fields = fields[:expected_columns]
-                elif len(fields) < expected_columns:
-                    fields.extend([""] * (expected_columns - len(fields)))
+    def _load_csv_robust(self):
+        df, self.load_report = load_csv(self.csv_file_path)
+        report = self.load_report
+        print(f"CSV loaded with {df.shape[0]} rows and {df.shape[1]} columns")
 
-                fixed_lines.append(",".join(fields) + "\n")
+        if report["fixed_count"]:
+            print(
+                f"Repaired {report['fixed_count']} rows with the wrong field count "
+                f"(lines {', '.join(map(str, report['fixed_rows'][:5]))}"
+                f"{', ...' if report['fixed_count'] > 5 else ''})"
+            )
+        if report["quarantined_count"]:
+            print(
+                f"Quarantined {report['quarantined_count']} rows with extra values "
+                f"(lines {', '.join(str(n) for n, _ in report['quarantined_rows'][:5])}"
+                f"{', ...' if report['quarantined_count'] > 5 else ''})"
+            )
+        if report["dropped_count"]:
+            print(f"Parser skipped {report['dropped_count']} malformed rows")
+        return df
+
+    @property
+    def profile(self):
+        if self._profile is None:
+            self._profile = self._build_profile()
+        return self._profile
+
+    def _text_columns(self):
+        return [
+            col
+            for col in self.df.columns
+            if pd.api.types.is_object_dtype(self.df[col])
+            or pd.api.types.is_string_dtype(self.df[col])
+            or isinstance(self.df[col].dtype, pd.CategoricalDtype)
+        ]
 
-            fixed_csv = "".join(fixed_lines)
-            df = pd.read_csv(io.StringIO(fixed_csv))
-            return df
+    def _build_profile(self):
+        # Every check reads from this profile, so each statistic is computed
+        # once per column instead of once per check.
+        df = self.df
+        columns = list(df.columns)
+        text_cols = self._text_columns()
+
+        workers = min(self.workers, len(columns))
+        if workers > 1:
+            # Round-robin shards keep wide text and numeric columns spread out
+            shards = [columns[i::workers] for i in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        _profile_columns,
+                        df[shard],
+                        [col for col in shard if col in set(text_cols)],
+                    )
+                    for shard in shards
+                ]
+                # Row-level duplicate detection needs every column, so it
+                # runs here while the workers profile their shards.
+                duplicate_count = int(df.duplicated().sum())
+                partials = [future.result() for future in futures]
+            column_profile = _merge_column_profiles(partials, columns, text_cols)
+        else:
+            duplicate_count = int(df.duplicated().sum())
+            column_profile = _profile_columns(df, text_cols)
 
-        raise ValueError("Could not identify CSV structure issues")
+        return {
+            "rows": len(df),
+            "columns": columns,
+            "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+            "duplicate_count": duplicate_count,
+            "text_columns": text_cols,
+            **column_profile,
+        }
 
     def get_basic_info(self):
         rows, cols = self.df.shape
+
+        if self.csv_file_path:
+            file_size = file_size_bytes(self.csv_file_path)
+        else:
+            file_size = estimate_csv_size(self.df, self.profile)
+
+        memory = memory_usage_bytes(
+            self.df, self.profile, deep=self.memory_mode == "deep"
+        )
         return {
             "shape": (rows, cols),
-            "memory_usage_kb": self.df.memory_usage(deep=True).sum() / 1024,
-            "file_size_kb": len(self.df.to_csv()) / 1024,
+            "memory_usage_kb": memory / 1024,
+            "file_size_kb": file_size / 1024,
         }
 
     def analyze_columns(self):
+        profile = self.profile
+        rows = profile["rows"]
         column_info = {}
-        for col in self.df.columns:
+        for col in profile["columns"]:
+            unique_count = int(profile["unique_counts"][col])
             column_info[col] = {
-                "dtype": str(self.df[col].dtype),
-                "non_null_count": self.df[col].count(),
-                "unique_count": self.df[col].nunique(),
-                "unique_percent": (self.df[col].nunique() / len(self.df)) * 100,
+                "dtype": profile["dtypes"][col],
+                "non_null_count": profile["non_null_counts"][col],
+                "unique_count": unique_count,
+                "unique_percent": (unique_count / rows) * 100,
             }
         return column_info
 
     def assess_data_quality(self):
-        missing_data = self.df.isnull().sum()
-        missing_percent = (missing_data / len(self.df)) * 100
+        profile = self.profile
+        missing_data = profile["null_counts"]
+        missing_percent = (missing_data / profile["rows"]) * 100
 
-        duplicate_count = self.df.duplicated().sum()
+        duplicate_count = profile["duplicate_count"]
 
-        empty_strings = {}
-        for col in self.df.select_dtypes(include=["object"]).columns:
-            if self.df[col].dtype == "object":
-                empty_count = (self.df[col].str.strip() == "").sum()
-                if empty_count > 0:
-                    empty_strings[col] = empty_count
+        empty_strings = {
+            col: info["empty_count"]
+            for col, info in profile["text"].items()
+            if info["empty_count"] > 0
+        }
 
         return {
             "missing_values": missing_data.to_dict(),
             "missing_percent": missing_percent.to_dict(),
             "duplicate_count": duplicate_count,
-            "duplicate_percent": (duplicate_count / len(self.df)) * 100,
+            "duplicate_percent": (duplicate_count / profile["rows"]) * 100,
             "empty_strings": empty_strings,
         }
 
     def get_statistical_summary(self):
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
-        categorical_cols = self.df.select_dtypes(include=["object"]).columns
-
+        profile = self.profile
         summary = {}
 
-        if len(numeric_cols) > 0:
-            summary["numeric"] = self.df[numeric_cols].describe().to_dict()
-            summary["outliers"] = self._detect_outliers(numeric_cols)
+        if profile["numeric_columns"]:
+            summary["numeric"] = profile["numeric_summary"].to_dict()
+            summary["outliers"] = self._detect_outliers(profile["numeric_columns"])
 
-        if len(categorical_cols) > 0:
+        if profile["text_columns"]:
             summary["categorical"] = {}
-            for col in categorical_cols:
+            for col, info in profile["text"].items():
                 summary["categorical"][col] = {
-                    "unique_count": self.df[col].nunique(),
-                    "most_common": (
-                        self.df[col].mode().iloc[0]
-                        if len(self.df[col].mode()) > 0
-                        else None
-                    ),
-                    "value_counts": self.df[col].value_counts().head(10).to_dict(),
+                    "unique_count": info["unique_count"],
+                    "most_common": info["most_common"],
+                    "value_counts": info["value_counts"],
                 }
 
         return summary
 
     def _detect_outliers(self, numeric_cols):
+        profile = self.profile
         outliers = {}
         for col in numeric_cols:
-            Q1 = self.df[col].quantile(0.25)
-            Q3 = self.df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            outlier_count = len(
-                self.df[(self.df[col] < lower_bound) | (self.df[col] > upper_bound)]
-            )
+            outlier_count = int(profile["outlier_counts"][col])
             outliers[col] = {
                 "count": outlier_count,
-                "percent": (outlier_count / len(self.df)) * 100,
+                "percent": (outlier_count / profile["rows"]) * 100,
             }
         return outliers
 
     def check_consistency(self):
+        profile = self.profile
         issues = []
-        categorical_cols = self.df.select_dtypes(include=["object"]).columns
-
-        for col in categorical_cols:
-            if self.df[col].dtype == "object":
-                values = self.df[col].dropna().astype(str)
-                if len(values) != len(values.str.lower().drop_duplicates()):
-                    issues.append(f"{col}: Mixed case values detected")
-
-                spaces = (
-                    self.df[col].str.len() != self.df[col].str.strip().str.len()
-                ).sum()
-                if spaces > 0:
-                    issues.append(
-                        f"{col}: {spaces} values with leading/trailing spaces"
-                    )
 
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
+        for col, info in profile["text"].items():
+            if info["lower_unique_count"] != info["unique_count"]:
+                issues.append(f"{col}: Mixed case values detected")
+
+            spaces = info["untrimmed_count"]
+            if spaces > 0:
+                issues.append(f"{col}: {spaces} values with leading/trailing spaces")
+
+        for col in profile["numeric_columns"]:
             if any(
                 keyword in col.lower()
                 for keyword in [
@@ -221,40 +342,66 @@ class DataQualityAnalyzer:
                     "rating",
                 ]
             ):
-                negative_count = (self.df[col] < 0).sum()
+                negative_count = int(profile["negative_counts"][col])
                 if negative_count > 0:
                     issues.append(f"{col}: {negative_count} negative values")
 
         return issues
 
-    def analyze_correlations(self):
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
-        high_correlations = []
+    def _correlation_frame(self):
+        return sample_rows(self.df, self.correlation_sample_rows)
 
-        if len(numeric_cols) > 1:
-            corr_matrix = self.df[numeric_cols].corr()
-
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i + 1, len(corr_matrix.columns)):
-                    corr_val = corr_matrix.iloc[i, j]
-                    if abs(corr_val) > 0.7:
-                        high_correlations.append(
-                            {
-                                "col1": corr_matrix.columns[i],
-                                "col2": corr_matrix.columns[j],
-                                "correlation": corr_val,
-                            }
-                        )
+    def _correlation_matrix(self, method="pearson", frame=None):
+        numeric_cols = self.profile["numeric_columns"]
+        if len(numeric_cols) < 2:
+            return None
+        if frame is None:
+            frame = self._correlation_frame()
+        return correlation_matrix(frame[numeric_cols], method)
+
+    def _categorical_columns(self):
+        profile = self.profile
+        return [
+            col
+            for col in profile["columns"]
+            if (col in profile["text_columns"] or profile["dtypes"][col] == "bool")
+            and 2 <= profile["unique_counts"][col] <= MAX_CATEGORIES
+        ]
+
+    def analyze_correlations(self, threshold=0.7, methods=DEFAULT_METHODS):
+        high_correlations = []
+        frame = self._correlation_frame()
+
+        for method in ("pearson", "spearman"):
+            if method in methods:
+                corr_matrix = self._correlation_matrix(method, frame)
+                if corr_matrix is not None:
+                    high_correlations.extend(high_pairs(corr_matrix, threshold, method))
+
+        if frame is not None:
+            high_correlations.extend(
+                categorical_associations(
+                    frame,
+                    self._categorical_columns(),
+                    self.profile["numeric_columns"],
+                    threshold,
+                    methods,
+                )
+            )
 
         return high_correlations
 
     def check_value_ranges(self):
+        profile = self.profile
         range_issues = []
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
 
-        for col in numeric_cols:
+        for col in profile["numeric_columns"]:
             col_lower = col.lower()
-            min_val, max_val = self.df[col].min(), self.df[col].max()
+            min_val = profile["numeric_summary"].at["min", col]
+            max_val = profile["numeric_summary"].at["max", col]
+            if "int" in profile["dtypes"][col].lower():
+                # The summary holds floats; integer columns print as integers
+                min_val, max_val = int(min_val), int(max_val)
 
             if "age" in col_lower and (min_val < 0 or max_val > 120):
                 range_issues.append(f"{col}: Age range {min_val}-{max_val} unrealistic")
@@ -275,12 +422,10 @@ class DataQualityAnalyzer:
         return range_issues
 
     def calculate_quality_scores(self, consistency_issues, range_issues):
-        completeness = (
-            1 - self.df.isnull().sum().sum() / (len(self.df) * len(self.df.columns))
-        ) * 100
-        uniqueness_score = min(
-            (self.df.nunique().sum() / (len(self.df) * len(self.df.columns))) * 100, 100
-        )
+        profile = self.profile
+        cells = profile["rows"] * len(profile["columns"])
+        completeness = (1 - profile["null_counts"].sum() / cells) * 100
+        uniqueness_score = min((profile["unique_counts"].sum() / cells) * 100, 100)
         consistency_score = max(0, 100 - len(consistency_issues) * 10)
         range_score = max(0, 100 - len(range_issues) * 15)
         overall_score = (
@@ -299,7 +444,7 @@ class DataQualityAnalyzer:
         self, quality_assessment, consistency_issues, range_issues, quality_scores
     ):
         recommendations = []
-        rows = len(self.df)
+        rows = self.profile["rows"]
 
         if rows < 1000:
             recommendations.append(
@@ -318,11 +463,11 @@ class DataQualityAnalyzer:
         if range_issues:
             recommendations.append("Correct unrealistic value ranges")
 
+        unique_counts = self.profile["unique_counts"]
         low_variety_cols = [
             col
-            for col in self.df.columns
-            if self.df[col].nunique() / len(self.df) < 0.1
-            and self.df[col].nunique() > 1
+            for col in self.profile["columns"]
+            if unique_counts[col] / rows < 0.1 and unique_counts[col] > 1
         ]
         if low_variety_cols:
             recommendations.append(
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+from .size_accounting import memory_usage_bytes
+
+try:
+    import pyarrow  # noqa: F401
+
+    pyarrow_available = True
+except ImportError:
+    pyarrow_available = False
+
+DATE_SAMPLE_SIZE = 100
+
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def _downcast_numeric(series, downcast_floats):
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        kind = "unsigned" if len(series) and series.min() >= 0 else "integer"
+        return pd.to_numeric(series, downcast=kind)
+    if downcast_floats and pd.api.types.is_float_dtype(series):
+        # Only keep float32 when it round-trips every value exactly
+        downcast = series.astype("float32")
+        same = (downcast.astype("float64") == series) | series.isna()
+        if same.all():
+            return downcast
+    return series
+
+
+def _parse_dates(series):
+    sample = series.dropna().head(DATE_SAMPLE_SIZE).astype(str)
+    if sample.empty or not sample.str.contains(r"\d{4}-\d{1,2}-\d{1,2}").all():
+        return None
+
+    parsed = pd.to_datetime(series, errors="coerce", format="ISO8601")
+    # Reject the conversion if it would turn any value into NaT
+    if parsed.isna().sum() != series.isna().sum():
+        return None
+    return parsed
+
+
+def optimize_dtypes(
+    df,
+    categorical_threshold=0.5,
+    parse_dates=True,
+    pyarrow_strings=False,
+    downcast_floats=False,
+):
+    """Return a memory-compact copy of ``df`` and a report of what changed.
+
+    Low-cardinality text columns become ``category``, integers are
+    downcast, ISO-like date columns are parsed, and remaining text can
+    optionally move to pyarrow-backed strings. Floats are only narrowed
+    with ``downcast_floats`` since pandas then aggregates in float32.
+    """
+    before = memory_usage_bytes(df)
+    optimized = {}
+    conversions = {}
+
+    for col in df.columns:
+        series = df[col]
+        original = str(series.dtype)
+
+        if pd.api.types.is_numeric_dtype(series):
+            series = _downcast_numeric(series, downcast_floats)
+        elif _is_text(series):
+            dates = _parse_dates(series) if parse_dates else None
+            non_null = series.count()
+            if dates is not None:
+                series = dates
+            elif non_null and series.nunique() / non_null <= categorical_threshold:
+                series = series.astype("category")
+            elif pyarrow_strings and pyarrow_available:
+                series = series.astype("string[pyarrow]")
+
+        optimized[col] = series
+        if str(series.dtype) != original:
+            conversions[col] = f"{original} -> {series.dtype}"
+
+    result = pd.DataFrame(optimized, index=df.index)
+    after = memory_usage_bytes(result)
+    return result, {
+        "before_bytes": before,
+        "after_bytes": after,
+        "reduction": before / after if after else np.nan,
+        "conversions": conversions,
+    }
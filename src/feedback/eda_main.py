@@ -1,11 +1,33 @@
 from .data_quality_analyzer import DataQualityAnalyzer
 from .eda_reporter import EDAReporter
 from .feedback_generator import FeedbackGenerator
+from .sampled_analyzer import SampledDataQualityAnalyzer
+from .streaming_analyzer import StreamingDataQualityAnalyzer
 
 
-def run_comprehensive_eda(csv_file_path, print_report=True, save_feedback=True):
+def run_comprehensive_eda(
+    csv_file_path,
+    print_report=True,
+    save_feedback=True,
+    chunksize=None,
+    workers=1,
+    optimize_dtypes=False,
+    sample_size=None,
+    strata=None,
+):
     try:
-        analyzer = DataQualityAnalyzer(csv_file_path)
+        if sample_size:
+            # Fast mode: checks run on a sample, results carry error bounds
+            analyzer = SampledDataQualityAnalyzer(
+                csv_file_path, sample_size=sample_size, strata=strata
+            )
+        elif chunksize:
+            # Out-of-core mode: bounded memory, approximate distinct/quantile stats
+            analyzer = StreamingDataQualityAnalyzer(csv_file_path, chunksize=chunksize)
+        else:
+            analyzer = DataQualityAnalyzer(
+                csv_file_path, workers=workers, optimize_dtypes=optimize_dtypes
+            )
         results = analyzer.run_full_analysis()
 
         if print_report:
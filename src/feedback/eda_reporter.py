@@ -5,6 +5,19 @@ class EDAReporter:
     def __init__(self, analysis_results):
         self.results = analysis_results
 
+    def _interval(self, *keys):
+        # Sampled runs carry confidence bounds; exact runs print nothing extra
+        sampling = self.results.get("sampling")
+        if not sampling:
+            return ""
+        bounds = sampling["bounds"]
+        for key in keys:
+            bounds = bounds.get(key)
+            if bounds is None:
+                return ""
+        low, high = bounds
+        return f" [{low:.1f}-{high:.1f}%]"
+
     def print_basic_info(self):
         info = self.results["basic_info"]
         print("=" * 80)
@@ -13,6 +26,14 @@ class EDAReporter:
         print(f"\nDataset Shape: {info['shape'][0]} rows × {info['shape'][1]} columns")
         print(f"Memory Usage: {info['memory_usage_kb']:.2f} KB")
         print(f"File Size: {info['file_size_kb']:.2f} KB")
+        sampling = self.results.get("sampling")
+        if sampling:
+            print(
+                f"Approximate: {sampling['method']} sample of "
+                f"{sampling['sample_rows']} of {sampling['population_rows']} rows; "
+                f"ranges are {sampling['confidence']:.0%} confidence bounds "
+                "(uniqueness: worst-case bounds)"
+            )
 
     def print_column_analysis(self):
         print("\nCOLUMN ANALYSIS")
@@ -39,6 +60,7 @@ class EDAReporter:
 
         print(
             f"Duplicate Rows: {qa['duplicate_count']} ({qa['duplicate_percent']:.2f}%)"
+            + self._interval("duplicate_percent")
         )
 
         if qa["empty_strings"]:
@@ -63,6 +85,7 @@ class EDAReporter:
             for col, outlier_info in summary["outliers"].items():
                 print(
                     f"  {col}: {outlier_info['count']} outliers ({outlier_info['percent']:.1f}%)"
+                    + self._interval("outlier_percent", col)
                 )
 
         if "categorical" in summary:
@@ -122,11 +145,14 @@ class EDAReporter:
 
         correlations = self.results["correlations"]
         if correlations:
-            print("High Correlations (|r| > 0.7):")
+            print("High Correlations / Associations (> 0.7):")
             for corr in correlations:
-                print(f"  {corr['col1']} ↔ {corr['col2']}: {corr['correlation']:.3f}")
+                method = corr.get("method", "pearson").replace("_", " ")
+                print(
+                    f"  {corr['col1']} ↔ {corr['col2']}: {corr['correlation']:.3f} ({method})"
+                )
         else:
-            print("No high correlations found between numerical columns")
+            print("No high correlations found between columns")
 
     def print_range_analysis(self):
         print("\nREALISTIC VALUE RANGES CHECK")
@@ -145,11 +171,26 @@ class EDAReporter:
         print("-" * 40)
 
         scores = self.results["quality_scores"]
-        print(f"Completeness Score:   {scores['completeness']:.1f}%")
-        print(f"Uniqueness Score:     {scores['uniqueness']:.1f}%")
-        print(f"Consistency Score:    {scores['consistency']:.1f}%")
-        print(f"Range Validity Score: {scores['range_validity']:.1f}%")
-        print(f"Overall Quality Score: {scores['overall']:.1f}%")
+        print(
+            f"Completeness Score:   {scores['completeness']:.1f}%"
+            + self._interval("quality_scores", "completeness")
+        )
+        print(
+            f"Uniqueness Score:     {scores['uniqueness']:.1f}%"
+            + self._interval("quality_scores", "uniqueness")
+        )
+        print(
+            f"Consistency Score:    {scores['consistency']:.1f}%"
+            + self._interval("quality_scores", "consistency")
+        )
+        print(
+            f"Range Validity Score: {scores['range_validity']:.1f}%"
+            + self._interval("quality_scores", "range_validity")
+        )
+        print(
+            f"Overall Quality Score: {scores['overall']:.1f}%"
+            + self._interval("quality_scores", "overall")
+        )
 
     def print_recommendations(self):
         print("\nRECOMMENDATIONS FOR IMPROVEMENT")
@@ -0,0 +1,52 @@
+import io
+import pandas as pd
+from .streaming_analyzer import StreamingDataQualityAnalyzer
+
+
+class IncrementalQualityTracker(StreamingDataQualityAnalyzer):
+    """Quality scores kept up to date as generated batches arrive.
+
+    Each batch is folded into the streaming accumulators, duplicates
+    included, so refreshing the live scores costs the new rows plus a
+    per-column summary of the accumulators, and ``run_full_analysis()``
+    at the end needs no re-read of the dataset. ``should_stop()`` is the
+    early-stop hook for generation: once ``min_rows`` rows are in, it
+    turns true when the overall score is below ``threshold``.
+    """
+
+    def __init__(self, threshold=None, min_rows=100, **kwargs):
+        super().__init__(None, **kwargs)
+        self.threshold = threshold
+        self.min_rows = min_rows
+        self.latest_scores = None
+
+    def add_batch(self, header, lines):
+        if not lines:
+            return self.latest_scores
+
+        text = header + "\n" + "\n".join(lines) + "\n"
+        self._source_bytes += len(text.encode("utf-8"))
+        chunk = pd.read_csv(io.StringIO(text), on_bad_lines="skip")
+        if not chunk.empty:
+            self.update(chunk)
+            self.latest_scores = self.live_scores()
+        return self.latest_scores
+
+    def live_scores(self):
+        profile = self.profile
+        consistency_issues = self.check_consistency()
+        range_issues = self.check_value_ranges()
+        scores = self.calculate_quality_scores(consistency_issues, range_issues)
+        return {
+            "rows": profile["rows"],
+            "duplicate_percent": (profile["duplicate_count"] / profile["rows"]) * 100,
+            **scores,
+        }
+
+    def should_stop(self):
+        if self.threshold is None or self.latest_scores is None:
+            return False
+        return (
+            self.latest_scores["rows"] >= self.min_rows
+            and self.latest_scores["overall"] < self.threshold
+        )
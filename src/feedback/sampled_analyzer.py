@@ -0,0 +1,384 @@
+import math
+import random
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from .csv_loader import RepairingReader, iter_csv_chunks, sniff_dialect
+from .data_quality_analyzer import DataQualityAnalyzer
+from .size_accounting import file_size_bytes, memory_usage_bytes
+
+_KEY = "__sample_key__"
+# Stratified sampling refuses columns with more distinct values than this
+MAX_STRATA = 1000
+# Rows kept per stratum beyond its proportional share of the sample, so a
+# share that grows later in the file can still fill its quota
+STRATUM_SLACK = 0.1
+STRATUM_MIN_SLACK = 10
+
+
+def _raw_records(f, quotechar):
+    # Same record boundaries as RepairingReader, without parsing anything
+    for line in f:
+        if quotechar in line:
+            while line.count(quotechar) % 2:
+                nxt = next(f, None)
+                if nxt is None:
+                    break
+                line += nxt
+        if line.isspace() or line.lstrip().startswith("```"):
+            continue
+        yield line
+
+
+def reservoir_sample(records, k, rng):
+    """Uniform sample of ``k`` items from an iterable in one pass.
+
+    Vitter's Algorithm L: after the reservoir fills, it draws how many
+    items to skip rather than a random number per item. Returns the
+    sample in input order and the number of items seen.
+    """
+    records = iter(records)
+    sample = []
+    for seen, record in enumerate(records):
+        if len(sample) == k:
+            break
+        sample.append((seen, record))
+    else:
+        return [r for _, r in sample], len(sample)
+
+    w = math.exp(math.log(rng.random()) / k)
+    next_pick = k + math.floor(math.log(rng.random()) / math.log(1 - w))
+    # ``record`` is item k, already consumed by the loop above
+    seen = k
+    while True:
+        if seen == next_pick:
+            sample[rng.randrange(k)] = (seen, record)
+            w *= math.exp(math.log(rng.random()) / k)
+            next_pick += 1 + math.floor(math.log(rng.random()) / math.log(1 - w))
+        record = next(records, None)
+        if record is None:
+            break
+        seen += 1
+    sample.sort()
+    return [r for _, r in sample], seen + 1
+
+
+def _wilson(successes, n, population, z):
+    """Wilson interval for a proportion, narrowed by the finite population
+    correction so a sample of the whole population has zero width."""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    fpc = (population - n) / (population - 1) if population > 1 else 0.0
+    if fpc <= 0:
+        return p, p
+    n_eff = n / fpc
+    denom = 1 + z**2 / n_eff
+    centre = (p + z**2 / (2 * n_eff)) / denom
+    half = z * math.sqrt(p * (1 - p) / n_eff + z**2 / (4 * n_eff**2)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _poisson(count, z):
+    # Variance-stabilised interval; gives a non-zero upper bound for 0
+    low = max(0.0, math.sqrt(count) - z / 2) ** 2
+    high = (math.sqrt(count + 1) + z / 2) ** 2
+    return low, high
+
+
+class SampledDataQualityAnalyzer(DataQualityAnalyzer):
+    """Approximate DataQualityAnalyzer for a quick go/no-go on large files.
+
+    One pass over the file keeps a uniform random sample of ``sample_size``
+    records (reservoir sampling, parsing only the kept records), or a
+    proportional stratified sample when ``strata`` names a column. Every check runs on the sample,
+    counts are scaled to the full row count, and ``run_full_analysis()``
+    adds a ``sampling`` entry with ``confidence`` bounds for completeness,
+    duplicate rate, outlier percentages and the quality scores. Distinct
+    counts have no useful confidence interval, so uniqueness (and the
+    overall score through it) gets hard lower/upper bounds instead.
+    """
+
+    def __init__(
+        self,
+        csv_file_path,
+        sample_size=10_000,
+        strata=None,
+        confidence=0.95,
+        seed=0,
+        chunksize=100_000,
+        memory_mode="cheap",
+        df=None,
+    ):
+        self.sample_size = sample_size
+        self.strata = strata
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.seed = seed
+        self.chunksize = chunksize
+        self._sample_counts = None
+        self._source_df = df
+        super().__init__(
+            csv_file_path, memory_mode=memory_mode, correlation_sample_rows=None
+        )
+        print(
+            f"Sampled {len(self.df)} of {self.population_rows} rows "
+            f"({'stratified by ' + strata if strata else 'uniform'})"
+        )
+
+    def _load_csv_robust(self):
+        # Only the sample is loaded; the base class analyzes it as the data
+        if self._source_df is None and self.strata is None:
+            sample, self.population_rows = self._sample_file()
+        else:
+            chunks = (
+                [self._source_df]
+                if self._source_df is not None
+                else self._iter_chunks()
+            )
+            sample, self.population_rows = self._draw_sample(chunks)
+        self._source_df = None
+        return sample
+
+    def _sample_file(self):
+        # Only the sampled records are repaired and parsed, so the pass over
+        # the file costs little more than reading its lines.
+        delimiter, quotechar = sniff_dialect(self.csv_file_path)
+        with open(
+            self.csv_file_path, "r", encoding="utf-8", errors="replace", newline=""
+        ) as f:
+            records = _raw_records(f, quotechar)
+            header = next(records, None)
+            if header is None:
+                raise ValueError("CSV file has no data")
+            sample, rows = reservoir_sample(
+                records, self.sample_size, random.Random(self.seed)
+            )
+
+        reader = RepairingReader([header] + sample, delimiter, quotechar)
+        df = pd.read_csv(
+            reader, sep=delimiter, quotechar=quotechar, on_bad_lines="skip"
+        )
+        # Line numbers in the report refer to the sample, not the file
+        self.load_report = reader.report(parsed_rows=len(df))
+        if len(df) < len(sample):
+            # Quarantined rows are left out of the population the same way
+            rows = round(rows * len(df) / len(sample))
+        return df, rows
+
+    def _iter_chunks(self):
+        self.load_report = {}
+        yield from iter_csv_chunks(self.csv_file_path, self.chunksize, self.load_report)
+
+    def _draw_sample(self, chunks):
+        rng = np.random.default_rng(self.seed)
+        kept = None
+        rows = 0
+        stratum_sizes = None
+        for chunk in chunks:
+            rows += len(chunk)
+            chunk = chunk.assign(**{_KEY: rng.random(len(chunk))})
+            combined = (
+                chunk if kept is None else pd.concat([kept, chunk], ignore_index=True)
+            )
+            if self.strata:
+                sizes = chunk[self.strata].value_counts(dropna=False)
+                stratum_sizes = (
+                    sizes
+                    if stratum_sizes is None
+                    else stratum_sizes.add(sizes, fill_value=0)
+                )
+                if len(stratum_sizes) > MAX_STRATA:
+                    raise ValueError(
+                        f"Strata column '{self.strata}' has more than "
+                        f"{MAX_STRATA} distinct values"
+                    )
+                # Keep the smallest keys per stratum, up to its share of the
+                # sample so far plus slack; the allocation below takes
+                # about its share of the whole file.
+                share = stratum_sizes * self.sample_size / rows
+                cap = (np.ceil(share * (1 + STRATUM_SLACK)) + STRATUM_MIN_SLACK).clip(
+                    upper=self.sample_size
+                )
+                rank = combined.groupby(self.strata, dropna=False)[_KEY].rank(
+                    method="first"
+                )
+                kept = combined[rank <= combined[self.strata].map(cap)]
+            else:
+                kept = combined.nsmallest(self.sample_size, _KEY)
+
+        if kept is None:
+            raise ValueError("CSV file has no data")
+
+        if self.strata and rows > self.sample_size:
+            # Proportional allocation keeps the sample self-weighting
+            quota = (stratum_sizes * self.sample_size / rows).round().clip(lower=1)
+            rank = kept.groupby(self.strata, dropna=False)[_KEY].rank(method="first")
+            limit = kept[self.strata].map(quota).fillna(1)
+            kept = kept[rank <= limit]
+
+        sample = kept.sort_values(_KEY).drop(columns=_KEY).reset_index(drop=True)
+        return sample, rows
+
+    @property
+    def _exact(self):
+        return len(self.df) >= self.population_rows
+
+    def _build_profile(self):
+        profile = super()._build_profile()
+        n = profile["rows"]
+        N = self.population_rows
+        counts = {
+            "rows": n,
+            "null_counts": profile["null_counts"].copy(),
+            "outlier_counts": (
+                profile["outlier_counts"].copy()
+                if profile["outlier_counts"] is not None
+                else None
+            ),
+            "row_nulls": self.df.isnull().sum(axis=1).to_numpy(),
+        }
+
+        if self._exact:
+            counts["unique_bounds"] = {
+                col: (int(v), int(v)) for col, v in profile["unique_counts"].items()
+            }
+            counts["duplicate_pairs"] = None
+            self._sample_counts = counts
+            return profile
+
+        scale = N / n
+        for key in (
+            "null_counts",
+            "non_null_counts",
+            "outlier_counts",
+            "negative_counts",
+        ):
+            if profile[key] is not None:
+                profile[key] = (profile[key] * scale).round().astype("int64")
+        if profile["numeric_summary"] is not None:
+            profile["numeric_summary"].loc["count"] *= scale
+        for info in profile["text"].values():
+            info["empty_count"] = int(round(info["empty_count"] * scale))
+            info["untrimmed_count"] = int(round(info["untrimmed_count"] * scale))
+
+        # Distinct counts do not scale linearly. The Duj1 estimator (Haas et
+        # al. 1995) scales up only as far as values seen once suggest; the
+        # true count lies between the distinct values in the sample and the
+        # count if every value seen once were unique in the file.
+        unique_bounds = {}
+        q = n / N
+        for col in self.df.columns:
+            freq = self.df[col].value_counts()
+            seen_once = int((freq == 1).sum())
+            distinct = len(freq)
+            sampled = int(freq.sum())
+            if seen_once < sampled:
+                estimate = distinct / (1 - (1 - q) * seen_once / sampled)
+            else:
+                estimate = distinct / q
+            upper = scale * seen_once + (distinct - seen_once)
+            cap = int(profile["non_null_counts"][col])
+            profile["unique_counts"][col] = int(round(min(estimate, cap)))
+            unique_bounds[col] = (distinct, int(round(min(upper, cap))))
+        counts["unique_bounds"] = unique_bounds
+
+        # A duplicated pair lands in the sample with probability about
+        # (n/N)^2, so sampled pairs scale by N(N-1)/(n(n-1)); this assumes
+        # duplicates mostly come in pairs, as repeated generated rows do.
+        group_sizes = self.df.value_counts(dropna=False).to_numpy()
+        pairs = int((group_sizes * (group_sizes - 1) // 2).sum())
+        pair_scale = (N * (N - 1)) / (n * (n - 1)) if n > 1 else 0.0
+        profile["duplicate_count"] = int(min(round(pairs * pair_scale), N - 1))
+        counts["duplicate_pairs"] = pairs
+        counts["pair_scale"] = pair_scale
+
+        profile["rows"] = N
+        self._sample_counts = counts
+        return profile
+
+    def get_basic_info(self):
+        profile = self.profile
+        if self.csv_file_path:
+            file_size = file_size_bytes(self.csv_file_path)
+        else:
+            file_size = None
+        memory = memory_usage_bytes(self.df, None, deep=self.memory_mode == "deep")
+        return {
+            "shape": (self.population_rows, len(profile["columns"])),
+            "memory_usage_kb": memory
+            * self.population_rows
+            / max(len(self.df), 1)
+            / 1024,
+            "file_size_kb": file_size / 1024 if file_size is not None else 0.0,
+        }
+
+    def _bounds(self, results):
+        counts = self._sample_counts
+        n = counts["rows"]
+        N = self.population_rows
+        cols = len(self.profile["columns"])
+        z = self.z
+
+        # Rows are the sampling unit, so completeness uses the spread of
+        # per-row completeness rather than treating cells as independent.
+        row_complete = 1 - counts["row_nulls"] / cols
+        mean = float(row_complete.mean())
+        if self._exact or n < 2:
+            completeness = (mean, mean)
+        else:
+            fpc = (N - n) / (N - 1)
+            half = z * float(row_complete.std(ddof=1)) / math.sqrt(n) * math.sqrt(fpc)
+            completeness = (max(0.0, mean - half), min(1.0, mean + half))
+
+        if counts["duplicate_pairs"] is None:
+            rate = results["quality_assessment"]["duplicate_percent"]
+            duplicate_percent = (rate, rate)
+        else:
+            low, high = _poisson(counts["duplicate_pairs"], z)
+            duplicate_percent = tuple(
+                min(100.0, v * counts["pair_scale"] / N * 100) for v in (low, high)
+            )
+
+        outlier_percent = {}
+        if counts["outlier_counts"] is not None:
+            for col, k in counts["outlier_counts"].items():
+                low, high = _wilson(int(k), n, N, z)
+                outlier_percent[col] = (low * 100, high * 100)
+
+        scores = results["quality_scores"]
+        cells = N * cols
+        unique_low = sum(low for low, _ in counts["unique_bounds"].values())
+        unique_high = sum(high for _, high in counts["unique_bounds"].values())
+        uniqueness = tuple(min(v / cells * 100, 100) for v in (unique_low, unique_high))
+        completeness_pct = tuple(v * 100 for v in completeness)
+        # Consistency and range scores come from issues seen in the sample
+        fixed = scores["consistency"] + scores["range_validity"]
+        quality_scores = {
+            "completeness": completeness_pct,
+            "uniqueness": uniqueness,
+            "consistency": (scores["consistency"], scores["consistency"]),
+            "range_validity": (scores["range_validity"], scores["range_validity"]),
+            "overall": tuple(
+                (c + u + fixed) / 4 for c, u in zip(completeness_pct, uniqueness)
+            ),
+        }
+
+        return {
+            "sample_rows": n,
+            "population_rows": N,
+            "method": "stratified" if self.strata else "reservoir",
+            "strata": self.strata,
+            "confidence": self.confidence,
+            "bounds": {
+                "completeness": completeness_pct,
+                "duplicate_percent": duplicate_percent,
+                "outlier_percent": outlier_percent,
+                "quality_scores": quality_scores,
+            },
+        }
+
+    def run_full_analysis(self):
+        results = super().run_full_analysis()
+        results["sampling"] = self._bounds(results)
+        return results
@@ -0,0 +1,83 @@
+"""Cheap size and memory accounting for analyzed datasets.
+
+Avoids re-serializing the data (``df.to_csv()``) or walking every Python
+string (``memory_usage(deep=True)``) just to report a size.
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Per-object overhead of a CPython str, on top of one byte per ASCII char
+STR_OBJECT_OVERHEAD = sys.getsizeof("")
+SAMPLE_SIZE = 1000
+
+
+def file_size_bytes(path):
+    return os.stat(path).st_size
+
+
+def _holds_python_strings(series):
+    return pd.api.types.is_object_dtype(series) or (
+        getattr(series.dtype, "storage", None) == "python"
+    )
+
+
+def _non_null(series, profile):
+    if profile is not None:
+        return int(profile["non_null_counts"][series.name])
+    return int(series.count())
+
+
+def _mean_length(series, profile):
+    if profile is not None and series.name in profile["text"]:
+        return profile["text"][series.name]["mean_length"]
+
+    # Fixed-position sample: no full-column copy or shuffle
+    if len(series) > SAMPLE_SIZE:
+        positions = np.random.default_rng(0).integers(0, len(series), SAMPLE_SIZE)
+        series = series.iloc[positions]
+    sample = series.dropna().astype(str)
+    return float(sample.str.len().mean()) if len(sample) else 0.0
+
+
+def memory_usage_bytes(df, profile=None, deep=False):
+    """In-memory footprint of ``df``.
+
+    ``deep=True`` is exact but visits every string. The cheap mode takes
+    the shallow usage and adds string payloads estimated from the mean
+    length (from the analyzer ``profile`` when available, else a sample).
+    """
+    if deep:
+        return int(df.memory_usage(deep=True).sum())
+
+    total = int(df.memory_usage(index=False, deep=False).sum())
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Shallow usage counts the codes and category pointers only;
+            # categories are few, so their strings are measured exactly
+            categories = series.cat.categories
+            if _holds_python_strings(categories):
+                lengths = categories.astype(str).str.len().to_numpy()
+                total += int(len(categories) * STR_OBJECT_OVERHEAD + lengths.sum())
+            continue
+        if not _holds_python_strings(series):
+            continue
+        non_null = _non_null(series, profile)
+        total += int(non_null * (STR_OBJECT_OVERHEAD + _mean_length(series, profile)))
+    return total
+
+
+def estimate_csv_size(df, profile=None):
+    """Estimated size of ``df`` written as CSV without the index."""
+    header = len(",".join(map(str, df.columns))) + 1
+    # One delimiter between fields and a newline per row
+    total = header + len(df) * len(df.columns)
+
+    for col in df.columns:
+        series = df[col]
+        total += int(_non_null(series, profile) * _mean_length(series, profile))
+
+    return total
@@ -0,0 +1,289 @@
+import numpy as np
+import pandas as pd
+from .accumulators import (
+    HashSet,
+    HyperLogLog,
+    MisraGries,
+    MomentsAccumulator,
+    TDigest,
+    hash_values,
+)
+from .correlations import _CoMoments
+from .csv_loader import iter_csv_chunks
+from .data_quality_analyzer import DataQualityAnalyzer
+from .size_accounting import file_size_bytes, memory_usage_bytes
+
+DESCRIBE_INDEX = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+class _ColumnState:
+    def __init__(self, kind, dtype):
+        self.kind = kind
+        self.dtype = dtype
+        self.nulls = 0
+        self.distinct = HyperLogLog()
+        if kind == "numeric":
+            self.moments = MomentsAccumulator()
+            self.digest = TDigest()
+            self.negatives = 0
+        elif kind == "text":
+            self.lower_distinct = HyperLogLog()
+            self.top = MisraGries()
+            self.empty = 0
+            self.untrimmed = 0
+            self.length_sum = 0
+            self.length_count = 0
+
+
+class StreamingDataQualityAnalyzer(DataQualityAnalyzer):
+    """Chunked variant of DataQualityAnalyzer for CSVs larger than memory.
+
+    The file is read ``chunksize`` rows at a time into mergeable
+    accumulators, so memory stays bounded by the chunk size. Distinct
+    counts, quantiles, outliers and top values are estimates; counts,
+    means, std, min/max and correlations are exact. Duplicate rows are
+    counted exactly up to ``max_exact_duplicate_rows`` rows and estimated
+    beyond that.
+    """
+
+    def __init__(
+        self,
+        csv_file_path,
+        chunksize=100_000,
+        max_exact_duplicate_rows=10_000_000,
+        memory_mode="cheap",
+    ):
+        self.chunksize = chunksize
+        self.max_exact_duplicate_rows = max_exact_duplicate_rows
+        super().__init__(csv_file_path, memory_mode=memory_mode)
+        self._memory_bytes = 0
+        self._source_bytes = 0
+        self._corr_matrix = None
+        self._file_consumed = False
+
+        self._columns = None
+        self._states = {}
+        self._numeric_cols = []
+        self._rows = 0
+        self._row_set = HashSet()
+        self._duplicates = 0
+        self._exact_duplicates = True
+        self._row_distinct = HyperLogLog()
+        self._co_moments = None
+
+    def _load_csv_robust(self):
+        # Rows are never held in memory; the file is read chunk by chunk
+        # when the profile is first built
+        return None
+
+    def _ensure_profile(self):
+        # Building the profile reads the file and fills _corr_matrix
+        if self._profile is None:
+            self._profile = self._build_profile()
+
+    def _iter_chunks(self):
+        self.load_report = {}
+        yield from iter_csv_chunks(self.csv_file_path, self.chunksize, self.load_report)
+
+    def update(self, chunk):
+        """Fold one chunk of rows into the accumulators."""
+        if self._columns is None:
+            self._columns = list(chunk.columns)
+            self._numeric_cols = list(chunk.select_dtypes(include=[np.number]).columns)
+            for col in self._columns:
+                if col in self._numeric_cols:
+                    kind = "numeric"
+                elif pd.api.types.is_object_dtype(
+                    chunk[col]
+                ) or pd.api.types.is_string_dtype(chunk[col]):
+                    kind = "text"
+                else:
+                    kind = "other"
+                self._states[col] = _ColumnState(kind, str(chunk[col].dtype))
+            if len(self._numeric_cols) > 1:
+                self._co_moments = _CoMoments(chunk[self._numeric_cols])
+
+        chunk = chunk.reindex(columns=self._columns)
+        # Later chunks may infer a different dtype; keep the first one
+        for col in self._numeric_cols:
+            if not pd.api.types.is_numeric_dtype(chunk[col]):
+                chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+
+        self._rows += len(chunk)
+        self._memory_bytes += memory_usage_bytes(chunk, deep=self.memory_mode == "deep")
+
+        hashes = hash_values(chunk)
+        self._row_distinct.update_hashes(hashes)
+        if self._exact_duplicates:
+            self._duplicates += self._row_set.add_hashes(hashes)
+            if self._rows > self.max_exact_duplicate_rows:
+                self._exact_duplicates = False
+                self._row_set = None
+
+        null_counts = chunk.isnull().sum()
+        for col, state in self._states.items():
+            state.nulls += int(null_counts[col])
+            self._update_column(state, chunk[col])
+
+        if self._co_moments is not None:
+            self._co_moments.update(chunk[self._numeric_cols])
+
+        # Anything derived from the accumulators is now stale
+        self._profile = None
+
+    def _build_profile(self):
+        if self.csv_file_path and not self._file_consumed:
+            self._file_consumed = True
+            for chunk in self._iter_chunks():
+                self.update(chunk)
+
+        if self._columns is None:
+            raise ValueError("CSV file has no data")
+
+        if self._exact_duplicates:
+            duplicate_count = self._duplicates
+        else:
+            duplicate_count = max(0, self._rows - self._row_distinct.estimate())
+
+        self._corr_matrix = (
+            self._co_moments.correlation(self._numeric_cols)
+            if self._co_moments is not None
+            else None
+        )
+        return self._assemble_profile(
+            self._columns,
+            self._states,
+            self._numeric_cols,
+            self._rows,
+            duplicate_count,
+        )
+
+    def _update_column(self, state, series):
+        values = series.dropna()
+        if state.kind == "numeric":
+            array = values.to_numpy(dtype="float64")
+            state.distinct.update(values)
+            state.moments.update(array)
+            state.digest.update(array)
+            state.negatives += int((array < 0).sum())
+            return
+
+        counts = values.value_counts()
+        # Hashing distinct values is enough: HyperLogLog ignores repeats
+        state.distinct.update(counts.index)
+        if state.kind != "text":
+            return
+
+        distinct = counts.index.astype(str)
+        stripped = distinct.str.strip()
+        lengths = distinct.str.len().to_numpy()
+        weights = counts.to_numpy()
+
+        state.lower_distinct.update(distinct.str.lower())
+        state.top.merge_counts(counts)
+        state.empty += int(weights[(stripped == "")].sum())
+        state.untrimmed += int(weights[lengths != stripped.str.len().to_numpy()].sum())
+        state.length_sum += int((lengths * weights).sum())
+        state.length_count += int(weights.sum())
+
+    def _assemble_profile(self, columns, states, numeric_cols, rows, duplicate_count):
+        null_counts = pd.Series(
+            {col: states[col].nulls for col in columns}, dtype="int64"
+        )
+        unique_counts = pd.Series(
+            {
+                col: min(states[col].distinct.estimate(), rows - states[col].nulls)
+                for col in columns
+            },
+            dtype="int64",
+        )
+
+        numeric_summary = None
+        outlier_counts = None
+        negative_counts = None
+        if numeric_cols:
+            summary = {}
+            outliers = {}
+            for col in numeric_cols:
+                state = states[col]
+                q1, q2, q3 = (state.digest.quantile(q) for q in (0.25, 0.5, 0.75))
+                summary[col] = [
+                    state.moments.count,
+                    state.moments.mean if state.moments.count else np.nan,
+                    state.moments.std,
+                    state.moments.min,
+                    q1,
+                    q2,
+                    q3,
+                    state.moments.max,
+                ]
+                iqr = q3 - q1
+                outside = state.digest.cdf(q1 - 1.5 * iqr) + (
+                    1 - state.digest.cdf(q3 + 1.5 * iqr)
+                )
+                outliers[col] = (
+                    int(round(state.moments.count * outside)) if iqr == iqr else 0
+                )
+            numeric_summary = pd.DataFrame(summary, index=DESCRIBE_INDEX)
+            outlier_counts = pd.Series(outliers, dtype="int64")
+            negative_counts = pd.Series(
+                {col: states[col].negatives for col in numeric_cols}, dtype="int64"
+            )
+
+        text = {}
+        for col in columns:
+            state = states[col]
+            if state.kind != "text":
+                continue
+            top = state.top.top(10)
+            text[col] = {
+                "unique_count": int(unique_counts[col]),
+                "lower_unique_count": min(
+                    state.lower_distinct.estimate(), int(unique_counts[col])
+                ),
+                "most_common": top[0][0] if top else None,
+                "value_counts": dict(top),
+                "empty_count": state.empty,
+                "untrimmed_count": state.untrimmed,
+                "mean_length": (
+                    state.length_sum / state.length_count if state.length_count else 0.0
+                ),
+            }
+
+        return {
+            "rows": rows,
+            "columns": columns,
+            "dtypes": {col: states[col].dtype for col in columns},
+            "duplicate_count": duplicate_count,
+            "null_counts": null_counts,
+            "non_null_counts": rows - null_counts,
+            "unique_counts": unique_counts,
+            "numeric_columns": numeric_cols,
+            "text_columns": list(text),
+            "numeric_summary": numeric_summary,
+            "outlier_counts": outlier_counts,
+            "negative_counts": negative_counts,
+            "text": text,
+        }
+
+    def get_basic_info(self):
+        profile = self.profile
+        return {
+            "shape": (profile["rows"], len(profile["columns"])),
+            "memory_usage_kb": self._memory_bytes / 1024,
+            "file_size_kb": (
+                file_size_bytes(self.csv_file_path)
+                if self.csv_file_path
+                else self._source_bytes
+            )
+            / 1024,
+        }
+
+    def _correlation_frame(self):
+        # Rows are not kept, so only the exact streamed Pearson matrix is
+        # available; rank and categorical measures need the data.
+        return None
+
+    def _correlation_matrix(self, method="pearson", frame=None):
+        self._ensure_profile()
+        return self._corr_matrix if method == "pearson" else None
@@ -1,84 +1,683 @@
 import os
+import collections
+import contextlib
+import contextvars
 import csv
+import io
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from openai import OpenAI
-import streamlit as st
+import pandas as pd
+from batch_planner import BatchPlanner
+from clients import get_client
+from datasetconfig import config
+from dedup import RowDeduplicator
+from progress import ProgressReporter
 from refine import model
+from retry import call_with_retry, limited
+from row_sink import MemoryRowSink
+from schema import RowValidator, extract_schema, unique_columns
+from synthesizer import SYNTHESIZER_MODEL, SeedSynthesizer
 from system_prompts.dataset_config import dataset_config_prompt
-from logger import logger
+from logger import log_context, logger, summarize_payload
+from metrics import JobMetrics, record_call
 
 load_dotenv()
 
+GENERATION_MODEL = "deepseek/deepseek-r1-0528-qwen3-8b:free"
+MAX_CONCURRENT_BATCHES = int(os.getenv("max_concurrent_batches", "5"))
+MAX_COMPLETION_TOKENS = 4000
+MAX_EMPTY_WAVES = 3
+AMPLIFY_SEED_ROWS = int(os.getenv("amplify_seed_rows", "500"))
 
-def generate_multiple_batches(user_prompt):
+
+BATCH_SYSTEM_PROMPT = """Generate rows of CSV data based on the dataset specification.
+Follow the batch instruction for the number of rows and whether to include headers.
+Return pure CSV format with no explanatory text."""
+
+
+def _batch_messages(refined_prompt, batch_num, batch_size, include_header=None):
+    if include_header is None:
+        include_header = batch_num == 0
+
+    header_instruction = (
+        "Include headers in the first row."
+        if include_header
+        else "Do NOT include headers, only data rows."
+    )
+
+    # Everything that varies per batch goes in the last message so the
+    # system prompt and refined prompt form a byte-identical prefix that
+    # provider-side prompt caching can reuse.
+    return [
+        {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+        {"role": "user", "content": refined_prompt},
+        {
+            "role": "user",
+            "content": f"Generate batch {batch_num + 1} with exactly {batch_size} rows. {header_instruction}",
+        },
+    ]
+
+
+def _usage_counts(usage):
+    if usage is None:
+        return {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": None}
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "cached_tokens": getattr(details, "cached_tokens", None) or 0,
+        "completion_tokens": usage.completion_tokens,
+    }
+
+
+def _is_csv_row(line):
+    return bool(line) and "," in line
+
+
+def iter_csv_lines(chunks):
+    # Tokens arrive in arbitrary pieces, so hold back the trailing partial
+    # line until its newline shows up (or the stream ends).
+    buffer = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line = line.strip()
+            if _is_csv_row(line):
+                yield line
+
+    line = buffer.strip()
+    if _is_csv_row(line):
+        yield line
+
+
+def _generate_batch(client, refined_prompt, batch_num, batch_size, include_header):
+    started = time.perf_counter()
+    completion = client.chat.completions.create(
+        model=GENERATION_MODEL,
+        messages=_batch_messages(refined_prompt, batch_num, batch_size, include_header),
+        max_tokens=MAX_COMPLETION_TOKENS,
+        temperature=0.8,
+    )
+
+    choice = completion.choices[0]
+    batch_output = (choice.message.content or "").strip()
+    lines = list(iter_csv_lines([batch_output]))
+
+    # A completion cut off by max_tokens ends mid-row; drop that row and let
+    # the planner request the shortfall in a follow-up batch.
+    if choice.finish_reason == "length" and lines:
+        lines = lines[:-1]
+
+    usage = _usage_counts(completion.usage)
+    usage["latency"] = time.perf_counter() - started
+    usage["batch_size"] = batch_size
+    return lines, usage
+
+
+def _open_stream(client, refined_prompt, batch_num, batch_size, include_header):
+    return client.chat.completions.create(
+        model=GENERATION_MODEL,
+        messages=_batch_messages(refined_prompt, batch_num, batch_size, include_header),
+        max_tokens=MAX_COMPLETION_TOKENS,
+        temperature=0.8,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+
+
+def _stream_batch(stream, info=None):
+    # ``info`` collects the finish reason, first-token time and usage
+    finish = info if info is not None else {}
+    finish["reason"] = None
+
+    def deltas():
+        for event in stream:
+            if getattr(event, "usage", None):
+                finish["usage"] = event.usage
+            if event.choices:
+                choice = event.choices[0]
+                if choice.finish_reason:
+                    finish["reason"] = choice.finish_reason
+                if choice.delta.content and "first_token" not in finish:
+                    finish["first_token"] = time.perf_counter()
+                yield choice.delta.content
+
+    # Hold each row back by one so a row cut off by max_tokens is dropped
+    pending = None
+    try:
+        for line in iter_csv_lines(deltas()):
+            if pending is not None:
+                yield pending
+            pending = line
+    finally:
+        # A consumer that stops early (cancel, target reached) must not
+        # leave the HTTP response open on the pooled connection
+        stream.close()
+
+    if pending is not None and finish["reason"] != "length":
+        yield pending
+
+
+def stream_dataset_rows(
+    user_prompt,
+    target_rows=None,
+    schema=None,
+    deduplicator=None,
+    key_columns=None,
+    progress=None,
+    batch_slots=None,
+    cancel_event=None,
+):
+    """Yield CSV lines (header first) as they are generated.
+
+    Batches run one after another so rows come out in order, sized by the
+    same ``BatchPlanner`` as ``generate_multiple_batches`` until
+    ``target_rows`` (the dataset config by default) have been yielded;
+    usable from Streamlit or the command line. Repeated headers, rows
+    failing the ``RowValidator`` checks and rows already seen by
+    ``deduplicator`` are dropped as in batch mode. ``key_columns``,
+    ``progress``, ``batch_slots`` and ``cancel_event`` work as in
+    ``generate_multiple_batches``; a batch holds its slot until its
+    streamed response is used up.
+    """
+    if progress is None:
+        progress = ProgressReporter()
     deep_seek_api = os.getenv("deep_seek_api")
     if not deep_seek_api:
-        st.error("API key 'deep_seek_api' not found in environment variables")
+        raise RuntimeError("API key 'deep_seek_api' not found in environment variables")
+
+    job = JobMetrics()
+    with log_context(job.job_id):
+        refined_prompt = model(user_prompt, job=job, batch_slots=batch_slots)
+        if not refined_prompt:
+            raise RuntimeError("refined_prompt is empty or None")
+
+        logger.info(f"Using refined prompt: {summarize_payload(refined_prompt)}")
+
+        if schema is None:
+            schema = extract_schema(refined_prompt)
+            logger.info(f"Extracted schema for {len(schema)} columns")
+        validator = None
+        if deduplicator is None:
+            deduplicator = RowDeduplicator(key_columns, unique_columns(schema))
+
+        if target_rows is None:
+            target_rows = config.max_rows
+
+        planner = BatchPlanner(target_rows, max_tokens=MAX_COMPLETION_TOKENS)
+        client = get_client(deep_seek_api)
+        header = None
+        written = 0
+        batch_num = 0
+        empty_batches = 0
+
+        while not planner.done and written < target_rows:
+            if cancel_event is not None and cancel_event.is_set():
+                logger.warning("Generation cancelled")
+                progress.cancelled()
+                break
+            batch_size = planner.plan_wave(1)[0]
+            include_header = header is None
+            started = time.perf_counter()
+            retries = []
+            info = {}
+            produced = 0
+            duplicates = 0
+            rows = 0
+            try:
+                # Rows keep arriving after the request opens, so the slot
+                # covers the whole response rather than just the call
+                slot = (
+                    batch_slots if batch_slots is not None else contextlib.nullcontext()
+                )
+                with slot:
+                    stream = call_with_retry(
+                        _open_stream,
+                        client,
+                        refined_prompt,
+                        batch_num,
+                        batch_size,
+                        include_header,
+                        on_retry=lambda attempt, e: retries.append(attempt),
+                    )
+                    # Closing the generator closes the response on early exit
+                    with contextlib.closing(_stream_batch(stream, info)) as lines:
+                        for line in lines:
+                            if include_header and header is None:
+                                header = line
+                                validator = RowValidator(header, schema)
+                                deduplicator.set_header(header)
+                                yield line
+                                continue
+                            if line == header:
+                                continue
+                            produced += 1
+                            if not validator.validate([line])[0]:
+                                continue
+                            if deduplicator.is_duplicate(line):
+                                duplicates += 1
+                                continue
+                            rows += 1
+                            yield line
+                            written += 1
+                            if written >= target_rows:
+                                break
+            except Exception as e:
+                logger.error(f"Error streaming batch {batch_num + 1}: {e}")
+                info["error"] = e.__class__.__name__
+
+            usage = _usage_counts(info.get("usage"))
+            planner.observe(produced, usage["completion_tokens"])
+            planner.discard(produced - rows)
+            deduplicator.record_batch(
+                rows + duplicates, duplicates, batch_num, usage["completion_tokens"]
+            )
+            if produced > rows + duplicates:
+                logger.info(
+                    f"Batch {batch_num + 1}: rejected {produced - rows - duplicates}"
+                    f"/{produced} rows failing validation"
+                )
+            if duplicates:
+                logger.info(
+                    f"Batch {batch_num + 1}: dropped {duplicates}"
+                    f"/{rows + duplicates} duplicate rows"
+                )
+            first_token = info.get("first_token")
+            record_call(
+                "generate",
+                GENERATION_MODEL,
+                time.perf_counter() - started,
+                job=job,
+                prompt_tokens=usage["prompt_tokens"],
+                cached_tokens=usage["cached_tokens"],
+                completion_tokens=usage["completion_tokens"],
+                rows=rows,
+                rejected=produced - rows,
+                retries=len(retries),
+                ttft=first_token - started if first_token else None,
+                error=info.get("error"),
+                batch=batch_num,
+                batch_size=batch_size,
+            )
+            batch_num += 1
+
+            if rows:
+                empty_batches = 0
+            else:
+                empty_batches += 1
+                if empty_batches >= MAX_EMPTY_WAVES:
+                    logger.warning(
+                        f"Stopping stream: {empty_batches} batches in a row produced no rows"
+                    )
+                    break
+
+        logger.info(
+            f"Job summary: {job.finish(target_rows=target_rows, rows_written=written)}"
+        )
+
+
+def generate_multiple_batches(
+    user_prompt,
+    target_rows=None,
+    max_concurrency=MAX_CONCURRENT_BATCHES,
+    sink=None,
+    quality_tracker=None,
+    deduplicator=None,
+    key_columns=None,
+    schema=None,
+    progress=None,
+    batch_slots=None,
+    cancel_event=None,
+):
+    """Generate a dataset for ``user_prompt``.
+
+    Without a ``sink`` the dataset is returned as a CSV string. With one
+    (e.g. ``CsvFileRowSink``) rows are streamed into it batch by batch and
+    the closed sink is returned, so large jobs never sit in memory.
+
+    A ``quality_tracker`` (``IncrementalQualityTracker``) is fed every
+    written batch; generation stops early when it reports ``should_stop()``.
+
+    Rows repeated across batches are dropped by ``deduplicator`` before
+    they are written, and the planner asks for replacements to keep the
+    target row count. The default ``RowDeduplicator`` checks full rows, the
+    composite ``key_columns`` and each column the schema marks unique.
+    Rows that do not fit the header or the column ``schema`` (by default
+    extracted from the refined prompt) are rejected the same way.
+
+    Status, completion and messages go to ``progress`` (a
+    ``ProgressReporter``). ``batch_slots`` is an optional semaphore shared
+    between jobs to cap concurrent model calls across all of them. Setting
+    ``cancel_event`` stops the job once the current wave is written.
+    """
+    if progress is None:
+        progress = ProgressReporter()
+    deep_seek_api = os.getenv("deep_seek_api")
+    if not deep_seek_api:
+        progress.notify(
+            "error", "API key 'deep_seek_api' not found in environment variables"
+        )
         return None
 
-    # Refine prompt
-    refined_prompt = model(user_prompt)
-    if not refined_prompt:
-        st.error("refined_prompt is empty or None")
+    job = JobMetrics()
+    with log_context(job.job_id):
+
+        # Refine prompt
+        refined_prompt = model(user_prompt, job=job, batch_slots=batch_slots)
+        if not refined_prompt:
+            progress.notify("error", "refined_prompt is empty or None")
+            return None
+
+        logger.info(f"Using refined prompt: {summarize_payload(refined_prompt)}")
+
+        if schema is None:
+            schema = extract_schema(refined_prompt)
+            logger.info(f"Extracted schema for {len(schema)} columns")
+        validator = None
+
+        if target_rows is None:
+            target_rows = config.max_rows
+
+        planner = BatchPlanner(target_rows, max_tokens=MAX_COMPLETION_TOKENS)
+        header = None
+        pending_batches = []
+        next_batch_num = 0
+        empty_waves = 0
+        retries = collections.Counter()
+
+        return_csv = sink is None
+        if sink is None:
+            sink = MemoryRowSink()
+        if deduplicator is None:
+            deduplicator = RowDeduplicator(key_columns, unique_columns(schema))
+
+        client = get_client(deep_seek_api)
+
+        progress.status(f"Generating {target_rows} rows...")
+
+        # The first batch runs alone to measure tokens per row; after that each
+        # wave of concurrently dispatched batches is sized to fill the budget.
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            while not planner.done:
+                if cancel_event is not None and cancel_event.is_set():
+                    progress.notify("warning", "Generation cancelled")
+                    logger.warning("Generation cancelled")
+                    progress.cancelled()
+                    break
+                wave_limit = 1 if planner.tokens_per_row is None else max_concurrency
+                sizes = planner.plan_wave(max(1, wave_limit))
+                if not sizes:
+                    break
+
+                futures = {}
+                for i, batch_size in enumerate(sizes):
+                    batch_num = next_batch_num + i
+                    include_header = header is None and i == 0
+                    # Copy the context so worker-thread logs keep the job id
+                    future = executor.submit(
+                        contextvars.copy_context().run,
+                        call_with_retry,
+                        limited(batch_slots, _generate_batch),
+                        client,
+                        refined_prompt,
+                        batch_num,
+                        batch_size,
+                        include_header,
+                        on_retry=lambda attempt, e, b=batch_num: retries.update([b]),
+                    )
+                    futures[future] = (batch_num, include_header)
+                next_batch_num += len(sizes)
+
+                wave_results = {}
+                for future in as_completed(futures):
+                    batch_num, include_header = futures[future]
+                    try:
+                        lines, usage = future.result()
+                    except Exception as e:
+                        progress.notify(
+                            "error", f"Error generating batch {batch_num + 1}: {e}"
+                        )
+                        record_call(
+                            "generate",
+                            GENERATION_MODEL,
+                            0.0,
+                            job=job,
+                            retries=retries[batch_num],
+                            error=e.__class__.__name__,
+                            batch=batch_num,
+                        )
+                        continue
+
+                    if include_header and lines:
+                        if header is None:
+                            header = lines[0]
+                        lines = lines[1:]
+                    lines = [line for line in lines if line != header]
+
+                    planner.observe(len(lines), usage["completion_tokens"])
+                    wave_results[batch_num] = (lines, usage)
+
+                    progress.status(
+                        f"Generated batch {batch_num + 1} "
+                        f"({min(planner.rows_collected, target_rows)}/{target_rows} rows)"
+                    )
+                    progress.advance(
+                        min(planner.rows_collected / max(target_rows, 1), 1.0)
+                    )
+
+                # Reassemble in batch order so output is deterministic
+                for batch_num in sorted(wave_results):
+                    pending_batches.append((batch_num, *wave_results[batch_num]))
+
+                # Rows are held back only until a header has been generated
+                written = []
+                if header is not None:
+                    sink.write_header(header)
+                    deduplicator.set_header(header)
+                    if validator is None:
+                        validator = RowValidator(header, schema)
+                    fresh = []
+                    for batch_num, lines, usage in pending_batches:
+                        valid, rejected = validator.validate(lines)
+                        if rejected:
+                            logger.info(
+                                f"Batch {batch_num + 1}: rejected {rejected}"
+                                f"/{len(lines)} rows failing validation"
+                            )
+                        kept = deduplicator.filter(
+                            valid, batch_num, usage["completion_tokens"]
+                        )
+                        planner.discard(len(lines) - len(kept))
+                        record_call(
+                            "generate",
+                            GENERATION_MODEL,
+                            usage["latency"],
+                            job=job,
+                            prompt_tokens=usage["prompt_tokens"],
+                            cached_tokens=usage["cached_tokens"],
+                            completion_tokens=usage["completion_tokens"],
+                            rows=len(kept),
+                            rejected=len(lines) - len(kept),
+                            retries=retries[batch_num],
+                            batch=batch_num,
+                            batch_size=usage["batch_size"],
+                        )
+                        fresh.extend(kept)
+                        if len(kept) < len(valid):
+                            logger.info(
+                                f"Batch {batch_num + 1}: dropped {len(valid) - len(kept)}"
+                                f"/{len(valid)} duplicate rows"
+                            )
+                    pending_batches = []
+
+                    remaining = target_rows - sink.row_count
+                    written = fresh[:remaining]
+                    sink.write_rows(written)
+
+                    if quality_tracker is not None and written:
+                        scores = quality_tracker.add_batch(header, written)
+                        if scores:
+                            progress.quality(scores)
+                        if quality_tracker.should_stop():
+                            progress.notify(
+                                "warning",
+                                f"Stopping early: quality score {scores['overall']:.1f}% "
+                                f"is below {quality_tracker.threshold}%",
+                            )
+                            logger.warning(
+                                f"Generation stopped early on quality ({scores})"
+                            )
+                            break
+
+                # A wave of nothing but duplicates counts as empty too
+                if written or any(lines for _, lines, _ in pending_batches):
+                    empty_waves = 0
+                else:
+                    empty_waves += 1
+                    if empty_waves >= MAX_EMPTY_WAVES:
+                        logger.warning(
+                            f"Stopping generation: {empty_waves} waves in a row produced no rows"
+                        )
+                        break
+
+        progress.status("Dataset generation complete!")
+        summary = job.finish(target_rows=target_rows, rows_written=sink.row_count)
+        logger.info(f"Job summary: {summary}")
+        if validator is not None and validator.rejected:
+            progress.notify(
+                "info",
+                f"Rejected {validator.rejected} rows that did not match the schema "
+                f"({validator.rejection_rate * 100:.1f}% of generated rows)",
+            )
+            logger.info(f"Validation rejections by reason: {validator.reasons}")
+        if deduplicator.duplicates:
+            progress.notify(
+                "info",
+                f"Dropped {deduplicator.duplicates} duplicate rows "
+                f"({deduplicator.duplicate_rate * 100:.1f}% of generated rows, "
+                f"~{deduplicator.wasted_tokens} completion tokens)",
+            )
+            logger.info(f"Duplicate rows per batch: {deduplicator.batch_stats}")
+
+        sink.close()
+
+        if sink.row_count:
+            progress.notify(
+                "success", f"Final dataset generated with {sink.row_count} rows"
+            )
+            return sink.getvalue() if return_csv else sink
+
         return None
 
-    logger.info(f"Using refined prompt: {refined_prompt}")
 
-    all_rows = []
-    batch_size = 200
-    total_batches = 5
+def amplify_dataset(
+    user_prompt,
+    target_rows,
+    seed_rows=AMPLIFY_SEED_ROWS,
+    sink=None,
+    quality_tracker=None,
+    random_state=None,
+    key_columns=None,
+    progress=None,
+    batch_slots=None,
+    cancel_event=None,
+):
+    """Generate a small LLM seed, then amplify it locally to ``target_rows``.
 
-    client = OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=deep_seek_api,
+    The seed comes from ``generate_multiple_batches`` (so it is validated
+    and deduplicated as usual) and is written first; the remaining rows are
+    drawn from a ``SeedSynthesizer`` fitted on it, without further model
+    calls. Returns ``(result, report)`` where ``result`` is a CSV string or
+    the closed ``sink`` as in ``generate_multiple_batches`` and ``report``
+    scores the output against the seed. ``key_columns``, ``progress``,
+    ``batch_slots`` and ``cancel_event`` work as in
+    ``generate_multiple_batches``.
+    """
+    if progress is None:
+        progress = ProgressReporter()
+    seed_csv = generate_multiple_batches(
+        user_prompt,
+        target_rows=min(seed_rows, target_rows),
+        quality_tracker=quality_tracker,
+        key_columns=key_columns,
+        progress=progress,
+        batch_slots=batch_slots,
+        cancel_event=cancel_event,
     )
+    if not seed_csv:
+        return None, None
 
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-
-    for batch_num in range(total_batches):
-        status_text.text(f"Generating batch {batch_num + 1}/{total_batches}...")
-        progress_bar.progress((batch_num + 1) / total_batches)
-
-        batch_system = f"""Generate exactly {batch_size} rows of CSV data based on the prompt.
-        {'Include headers in the first row.' if batch_num == 0 else 'Do NOT include headers, only data rows.'}
-        Return pure CSV format with no explanatory text."""
-
-        try:
-            completion = client.chat.completions.create(
-                model="deepseek/deepseek-r1-0528-qwen3-8b:free",
-                messages=[
-                    {"role": "system", "content": batch_system},
-                    {
-                        "role": "user",
-                        "content": f"{refined_prompt}\n\nGenerate batch {batch_num + 1} with {batch_size} rows.",
-                    },
-                ],
-                max_tokens=4000,
-                temperature=0.8,
-            )
+    seed_lines = seed_csv.split("\n")
+    header, seed_lines = seed_lines[0], seed_lines[1:]
+    seed = pd.read_csv(io.StringIO(seed_csv), skipinitialspace=True)
 
-            batch_output = completion.choices[0].message.content.strip()
-            batch_lines = [
-                line.strip()
-                for line in batch_output.split("\n")
-                if line.strip() and "," in line
-            ]
+    return_csv = sink is None
+    if sink is None:
+        sink = MemoryRowSink()
 
-            if batch_lines:
-                all_rows.extend(batch_lines)
+    job = JobMetrics()
+    with log_context(job.job_id):
+        started = time.perf_counter()
+        synthesizer = SeedSynthesizer(random_state=random_state).fit(seed)
+        logger.info(f"Fitted synthesizer on {len(seed)} seed rows: {synthesizer.kinds}")
+
+        sink.write_header(header)
+        sink.write_rows(seed_lines)
+        remaining = max(0, target_rows - sink.row_count)
+
+        for lines in synthesizer.iter_csv_lines(remaining):
+            if cancel_event is not None and cancel_event.is_set():
+                progress.notify("warning", "Amplification cancelled")
+                progress.cancelled()
+                break
+            sink.write_rows(lines)
+            progress.status(f"Amplified to {sink.row_count}/{target_rows} rows...")
+            progress.advance(min(sink.row_count / max(target_rows, 1), 1.0))
+
+        record_call(
+            "amplify",
+            SYNTHESIZER_MODEL,
+            time.perf_counter() - started,
+            job=job,
+            rows=sink.row_count - len(seed_lines),
+            seed_rows=len(seed_lines),
+        )
+        sink.close()
+
+        progress.status("Scoring amplified rows against the seed...")
+        if return_csv:
+            output = sink.getvalue()
+            report = synthesizer.score(df=pd.read_csv(io.StringIO(output)))
+        else:
+            report = synthesizer.score(sink.path)
+        progress.status("Dataset generation complete!")
+
+        summary = job.finish(
+            target_rows=target_rows,
+            rows_written=sink.row_count,
+            fidelity=round(report["fidelity"], 2),
+        )
+        logger.info(f"Amplify job summary: {summary}")
+
+    progress.notify(
+        "success",
+        f"Amplified {len(seed_lines)} seed rows to {sink.row_count} rows "
+        f"(fidelity to seed {report['fidelity']:.1f}%)",
+    )
+    return (output if return_csv else sink), report
 
-        except Exception as e:
-            st.error(f"Error generating batch {batch_num + 1}: {e}")
-            continue
 
-    status_text.text("Dataset generation complete!")
+if __name__ == "__main__":
+    import sys
 
-    if all_rows:
-        final_csv = "\n".join(all_rows)
-        st.success(f"Final dataset generated with {len(all_rows)-1} rows")
-        return final_csv
+    if len(sys.argv) < 2:
+        print('Usage: python generate.py "<dataset prompt>"')
+        sys.exit(1)
 
-    return None
+    for row in stream_dataset_rows(" ".join(sys.argv[1:])):
+        print(row, flush=True)
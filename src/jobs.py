@@ -0,0 +1,344 @@
+"""Background generation jobs for the Streamlit app.
+
+A Streamlit script run should never block on a multi-minute generation:
+the button only submits a job here and keeps its ID in session state, and
+later reruns poll ``JobManager.snapshot`` for progress and the newest
+rows. One manager is shared by every session in the server process, so
+several users can generate at once while a single semaphore keeps the
+total number of model calls bounded.
+"""
+
+import collections
+import csv
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from feedback.incremental_analyzer import IncrementalQualityTracker
+from generate import (
+    MAX_CONCURRENT_BATCHES,
+    amplify_dataset,
+    generate_multiple_batches,
+    stream_dataset_rows,
+)
+from logger import logger
+from progress import ProgressReporter
+from row_sink import CsvFileRowSink
+
+MAX_BACKGROUND_JOBS = int(os.getenv("max_background_jobs", "4"))
+JOB_TTL = int(os.getenv("job_ttl", "3600"))
+PREVIEW_ROWS = 500
+MAX_MESSAGES = 50
+# Streamed rows are scored in chunks; one read_csv per row would dominate
+STREAM_QUALITY_ROWS = 100
+
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+
+class PreviewRowSink(CsvFileRowSink):
+    """File sink that also keeps the newest rows in memory for live previews."""
+
+    def __init__(self, path=None, preview_rows=PREVIEW_ROWS):
+        super().__init__(path)
+        self.recent = collections.deque(maxlen=preview_rows)
+        self._lock = threading.Lock()
+
+    def write_rows(self, lines):
+        super().write_rows(lines)
+        with self._lock:
+            self.recent.extend(lines)
+
+    def preview(self):
+        """Header and newest rows as parsed lists, padded to the header width."""
+        if self.header is None:
+            return None, []
+        with self._lock:
+            lines = list(self.recent)
+        header = next(csv.reader([self.header]))
+        # Rows with the wrong field count are shown padded/trimmed while
+        # generating; the final CSV is parsed properly once complete.
+        rows = [(r + [""] * len(header))[: len(header)] for r in csv.reader(lines)]
+        return header, rows
+
+
+class JobProgressReporter(ProgressReporter):
+    """Records progress on the job so any rerun can display it."""
+
+    def __init__(self, job):
+        self.job = job
+
+    def status(self, message):
+        self.job["status_message"] = message
+
+    def advance(self, fraction):
+        self.job["progress"] = fraction
+
+    def quality(self, scores):
+        self.job["quality"] = scores
+
+    def notify(self, level, message):
+        messages = self.job["messages"]
+        messages.append((level, message))
+        del messages[:-MAX_MESSAGES]
+
+    def cancelled(self):
+        self.job["stopped_by_cancel"] = True
+
+
+def _score_stream(quality_tracker, header, lines, progress):
+    # True once the live quality score calls for an early stop
+    scores = quality_tracker.add_batch(header, lines)
+    if scores:
+        progress.quality(scores)
+    if not quality_tracker.should_stop():
+        return False
+    progress.notify(
+        "warning",
+        f"Stopping early: quality score {scores['overall']:.1f}% "
+        f"is below {quality_tracker.threshold}%",
+    )
+    logger.warning(f"Generation stopped early on quality ({scores})")
+    return True
+
+
+def _stream_rows(
+    user_prompt, sink, progress, batch_slots, cancel_event, quality_tracker=None
+):
+    rows = stream_dataset_rows(
+        user_prompt,
+        progress=progress,
+        batch_slots=batch_slots,
+        cancel_event=cancel_event,
+    )
+    pending = []
+    try:
+        for row in rows:
+            if cancel_event.is_set():
+                progress.notify("warning", "Generation cancelled")
+                progress.cancelled()
+                break
+            if sink.header is None:
+                sink.write_header(row)
+                continue
+            sink.write_rows([row])
+            progress.status(f"Received {sink.row_count} rows...")
+            if quality_tracker is None:
+                continue
+            pending.append(row)
+            if len(pending) >= STREAM_QUALITY_ROWS:
+                stop = _score_stream(quality_tracker, sink.header, pending, progress)
+                pending = []
+                if stop:
+                    break
+        else:
+            if pending:
+                _score_stream(quality_tracker, sink.header, pending, progress)
+    finally:
+        rows.close()
+    if not sink.row_count:
+        return None
+    progress.notify("success", f"Final dataset generated with {sink.row_count} rows")
+    return sink
+
+
+class JobManager:
+    """Runs generation jobs on a shared thread pool.
+
+    Jobs are plain dicts keyed by ID. Worker threads update them in place
+    and readers only take copies through ``snapshot``, so no lock is
+    needed around individual fields.
+    """
+
+    def __init__(
+        self,
+        max_workers=MAX_BACKGROUND_JOBS,
+        max_concurrent_calls=MAX_CONCURRENT_BATCHES,
+        ttl=JOB_TTL,
+    ):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="generation-job"
+        )
+        self.batch_slots = threading.BoundedSemaphore(max(1, max_concurrent_calls))
+        self.ttl = ttl
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, user_prompt, mode="batches", amplify_rows=None, threshold=None):
+        """Queue a job and return its ID.
+
+        ``mode`` is ``batches`` (``generate_multiple_batches``), ``stream``
+        (``stream_dataset_rows``) or ``amplify`` (``amplify_dataset`` up to
+        ``amplify_rows``). ``threshold`` is the early-stop quality score.
+        """
+        self._prune()
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "job_id": job_id,
+            "mode": mode,
+            "state": "queued",
+            "progress": 0.0,
+            "status_message": "Waiting for a free worker...",
+            "quality": None,
+            "messages": [],
+            "sink": PreviewRowSink(),
+            "result": None,
+            "report": None,
+            "error": None,
+            "cancel_event": threading.Event(),
+            "stopped_by_cancel": False,
+            "submitted": time.time(),
+            "finished": None,
+        }
+        with self._lock:
+            self.jobs[job_id] = job
+        job["future"] = self.executor.submit(
+            self._run, job, user_prompt, amplify_rows, threshold
+        )
+        logger.info(f"Submitted {mode} job {job_id}")
+        return job_id
+
+    def _run(self, job, user_prompt, amplify_rows, threshold):
+        cancel_event = job["cancel_event"]
+        sink = job["sink"]
+        if cancel_event.is_set():
+            self._finish(job, "cancelled")
+            return
+        job["state"] = "running"
+        job["status_message"] = "Starting..."
+        progress = JobProgressReporter(job)
+        try:
+            if job["mode"] == "stream":
+                result = _stream_rows(
+                    user_prompt,
+                    sink,
+                    progress,
+                    self.batch_slots,
+                    cancel_event,
+                    quality_tracker=IncrementalQualityTracker(threshold=threshold),
+                )
+            elif job["mode"] == "amplify":
+                result, job["report"] = amplify_dataset(
+                    user_prompt,
+                    int(amplify_rows),
+                    sink=sink,
+                    quality_tracker=IncrementalQualityTracker(threshold=threshold),
+                    progress=progress,
+                    batch_slots=self.batch_slots,
+                    cancel_event=cancel_event,
+                )
+            else:
+                result = generate_multiple_batches(
+                    user_prompt,
+                    sink=sink,
+                    quality_tracker=IncrementalQualityTracker(threshold=threshold),
+                    progress=progress,
+                    batch_slots=self.batch_slots,
+                    cancel_event=cancel_event,
+                )
+        except Exception as e:
+            logger.exception(f"Job {job['job_id']} failed")
+            job["error"] = f"{e.__class__.__name__}: {e}"
+            progress.notify("error", str(e))
+            result = None
+
+        job["result"] = result
+        # A cancel that lands after the last wave leaves a complete dataset;
+        # only a job that actually stopped short counts as cancelled
+        if job["stopped_by_cancel"] or (cancel_event.is_set() and not result):
+            self._finish(job, "cancelled")
+        elif result:
+            self._finish(job, "done")
+        else:
+            self._finish(job, "failed")
+
+    def _finish(self, job, state):
+        # Jobs cancelled while queued never ran, so their file is still open
+        job["sink"].close()
+        job["state"] = state
+        job["finished"] = time.time()
+        if state == "done":
+            job["progress"] = 1.0
+            job["status_message"] = "Dataset generation complete!"
+        elif state == "cancelled":
+            job["status_message"] = "Cancelled"
+        else:
+            job["status_message"] = "Generation failed"
+        logger.info(f"Job {job['job_id']} {state} with {job['sink'].row_count} rows")
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def snapshot(self, job_id):
+        """Copy of the job's public fields, or ``None`` for unknown IDs."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        sink = job["sink"]
+        return {
+            "job_id": job_id,
+            "mode": job["mode"],
+            "state": job["state"],
+            "progress": job["progress"],
+            "status_message": job["status_message"],
+            "quality": job["quality"],
+            "messages": list(job["messages"]),
+            "rows": sink.row_count,
+            "error": job["error"],
+            "elapsed": (job["finished"] or time.time()) - job["submitted"],
+        }
+
+    def preview(self, job_id):
+        """Header and newest rows written so far."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None, []
+        return job["sink"].preview()
+
+    def cancel(self, job_id):
+        """Ask a job to stop; queued jobs never start, running ones stop
+        after their current wave."""
+        job = self.jobs.get(job_id)
+        if job is None or job["state"] in FINISHED_STATES:
+            return False
+        job["cancel_event"].set()
+        if job["future"].cancel():
+            self._finish(job, "cancelled")
+        logger.info(f"Cancelling job {job_id}")
+        return True
+
+    def discard(self, job_id, remove_file=True):
+        """Cancel the job if needed and forget it, deleting its output
+        unless ``remove_file`` is false."""
+        self.cancel(job_id)
+        with self._lock:
+            job = self.jobs.pop(job_id, None)
+        if job is None or not remove_file:
+            return
+        if job["state"] in FINISHED_STATES:
+            self._remove_output(job)
+        else:
+            # Still writing; delete once the worker has closed the file
+            job["future"].add_done_callback(lambda _: self._remove_output(job))
+
+    @staticmethod
+    def _remove_output(job):
+        path = job["sink"].path
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _prune(self):
+        # Finished jobs whose session never came back for them; collected
+        # jobs are discarded by their session, so nothing else holds the
+        # output and it goes with the record
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self.jobs.items()
+                if job["finished"] is not None and job["finished"] < cutoff
+            ]
+            expired = [self.jobs.pop(job_id) for job_id in expired]
+        for job in expired:
+            # Runs at once unless the worker is still closing the file
+            job["future"].add_done_callback(lambda _, job=job: self._remove_output(job))
@@ -1,9 +1,107 @@
+import atexit
+import contextlib
+import contextvars
+import hashlib
+import json
 import logging
+import logging.handlers
+import os
+import queue
 
-logging.basicConfig(
-    filename="app.log",
-    filemode="a",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+LOG_PATH = os.getenv("log_path", "app.log")
+LOG_MAX_BYTES = int(os.getenv("log_max_bytes", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("log_backup_count", "5"))
+LOG_MAX_MESSAGE_CHARS = int(os.getenv("log_max_message_chars", "2000"))
+PAYLOAD_PREVIEW_CHARS = 200
+
+job_id_var = contextvars.ContextVar("job_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "job_id"}
+
+
+def summarize_payload(text, limit=PAYLOAD_PREVIEW_CHARS):
+    """Short, greppable stand-in for a large payload such as a prompt."""
+    if text is None:
+        return None
+    if len(text) <= limit:
+        return text
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+    return f"{text[:limit]}... [{len(text)} chars, sha256:{digest}]"
+
+
+@contextlib.contextmanager
+def log_context(job_id):
+    """Tag every record logged inside the block with ``job_id``."""
+    token = job_id_var.set(job_id)
+    try:
+        yield
+    finally:
+        try:
+            job_id_var.reset(token)
+        except ValueError:
+            # A generator closed from another context (e.g. garbage collected)
+            job_id_var.set(None)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Runs in the calling thread: stamp the job id and resolve the
+        # message, but leave formatting to the listener thread.
+        record.job_id = job_id_var.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        message = summarize_payload(record.getMessage(), LOG_MAX_MESSAGE_CHARS)
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "job_id": getattr(record, "job_id", None),
+            "message": message,
+        }
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                payload[key] = value
+        return json.dumps(payload, default=str)
+
+
+def _configure():
+    # Callers only pay for a queue put; the listener thread formats and
+    # writes the records to the rotating file.
+    root = logging.getLogger()
+    if any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers):
+        return
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_PATH,
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    root.addHandler(queue_handler)
+    root.setLevel(logging.INFO)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+
+_configure()
 logger = logging.getLogger(__name__)
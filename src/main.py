@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
-import io
+import os
 
 try:
-    from generate import generate_multiple_batches
+    from jobs import FINISHED_STATES, JobManager
+    from row_sink import read_lines
+    from results import (
+        STATS_SAMPLE_ROWS,
+        column_stats,
+        quality_report,
+        raw_page,
+        table_page,
+    )
 
     generate_available = True
 except ImportError as e:
@@ -33,6 +41,103 @@ except ImportError:
     logger_available = False
 
 
+PREVIEW_PAGE_SIZE = 100
+RAW_PAGE_LINES = 200
+FAST_EDA_SAMPLE_SIZE = 10_000
+AMPLIFY_DEFAULT_ROWS = 100_000
+GENERATION_MODES = {
+    "batches": "Batches",
+    "stream": "Stream rows live",
+    "amplify": "Amplify locally",
+}
+
+
+@st.cache_resource
+def get_job_manager():
+    # One manager per server process, shared by every session
+    return JobManager()
+
+
+@st.fragment(run_every=1.0)
+def _job_panel(manager):
+    job_id = st.session_state.get("job_id")
+    job = manager.snapshot(job_id)
+    if job is None:
+        del st.session_state["job_id"]
+        st.rerun()
+
+    if job["state"] in FINISHED_STATES:
+        _collect_job(manager, job)
+        st.rerun()
+
+    st.progress(job["progress"])
+    st.text(f"{job['status_message']} ({job['rows']} rows, {job['elapsed']:.0f}s)")
+    if job["quality"]:
+        scores = job["quality"]
+        st.text(
+            f"Live quality: {scores['overall']:.1f}% overall | "
+            f"completeness {scores['completeness']:.1f}% | "
+            f"duplicates {scores['duplicate_percent']:.1f}% | "
+            f"range validity {scores['range_validity']:.1f}%"
+        )
+    for level, message in job["messages"]:
+        getattr(st, level)(message)
+    header, rows = manager.preview(job_id)
+    if header:
+        st.dataframe(
+            pd.DataFrame(rows, columns=header), use_container_width=True, height=400
+        )
+    if st.button("⏹️ Cancel", use_container_width=True):
+        manager.cancel(job_id)
+
+
+def _collect_job(manager, job):
+    # Hand a finished job over to the session; cancelled jobs keep the rows
+    # written before they stopped
+    record = manager.get(job["job_id"])
+    result = record["result"]
+    st.session_state.job_messages = job["messages"]
+    if job["state"] == "cancelled" and result:
+        st.session_state.job_messages.append(
+            ("info", f"Kept {job['rows']} rows generated before cancelling")
+        )
+    if result:
+        _store_result(record["sink"])
+        if record["report"]:
+            st.session_state.amplify_report = record["report"]
+    manager.discard(job["job_id"], remove_file=not result)
+    del st.session_state["job_id"]
+
+
+def _store_result(sink):
+    st.session_state.generated_path = sink.path
+    st.session_state.generated_rows = sink.row_count
+    st.session_state.generated_size = sink.size_bytes
+    st.session_state.generated_hash = sink.content_hash
+    st.session_state.show_results = True
+
+
+def _clear_results():
+    job_id = st.session_state.get("job_id")
+    if job_id:
+        get_job_manager().discard(job_id)
+    path = st.session_state.get("generated_path")
+    if path and os.path.exists(path):
+        os.remove(path)
+    for key in (
+        "generated_path",
+        "generated_rows",
+        "generated_size",
+        "generated_hash",
+        "amplify_report",
+        "job_id",
+        "job_messages",
+        "show_results",
+    ):
+        if key in st.session_state:
+            del st.session_state[key]
+
+
 def main():
     st.set_page_config(page_title="Dataset Generator", page_icon="📊", layout="wide")
 
@@ -48,11 +153,19 @@ def main():
     with st.sidebar:
         st.header("Configuration")
         st.info("Make sure your environment variables are set:")
-        st.code(
-            """
+        st.code("""
         openrouter_api_key=your_key_here
         deep_seek_api=your_key_here
-        """
+        """)
+
+        st.header("Quality")
+        early_stop_threshold = st.slider(
+            "Stop early below quality score (%)",
+            min_value=0,
+            max_value=100,
+            value=40,
+            help="Generation stops once the live overall quality score drops "
+            "below this value. Set to 0 to always generate the full dataset.",
         )
 
     # Main interface
@@ -67,37 +180,67 @@ def main():
 
     with col1:
         st.subheader("Generate Dataset")
-        if st.button("🚀 Generate Dataset", type="primary", use_container_width=True):
+        # One job runs in one mode, so the choices are exclusive
+        mode = st.radio(
+            "Mode",
+            list(GENERATION_MODES),
+            format_func=GENERATION_MODES.get,
+            horizontal=True,
+            help="Stream rows live: show rows in a table as they are generated. "
+            "Amplify locally: generate a small seed with the model, then "
+            "synthesize the remaining rows locally without further API calls.",
+        )
+        amplify = mode == "amplify"
+        if amplify:
+            amplify_rows = st.number_input(
+                "Rows to generate",
+                min_value=1000,
+                max_value=10_000_000,
+                value=AMPLIFY_DEFAULT_ROWS,
+                step=10_000,
+            )
+        manager = get_job_manager()
+        running = "job_id" in st.session_state
+        if st.button(
+            "🚀 Generate Dataset",
+            type="primary",
+            use_container_width=True,
+            disabled=running,
+        ):
             if not user_prompt.strip():
                 st.error("Please enter a prompt first!")
             else:
-                with st.spinner("Generating dataset..."):
-                    result = generate_multiple_batches(user_prompt)
-                    if result:
-                        st.session_state.generated_csv = result
-                        st.session_state.show_results = True
+                _clear_results()
+                st.session_state.job_id = manager.submit(
+                    user_prompt,
+                    mode=mode,
+                    amplify_rows=int(amplify_rows) if amplify else None,
+                    threshold=early_stop_threshold or None,
+                )
+                running = True
+        if running:
+            _job_panel(manager)
+        for level, message in st.session_state.get("job_messages", []):
+            getattr(st, level)(message)
 
     with col2:
         st.subheader("Actions")
-        if (
-            hasattr(st.session_state, "generated_csv")
-            and st.session_state.generated_csv
+        if st.session_state.get("generated_path") and os.path.exists(
+            st.session_state.generated_path
         ):
-            # Download button
-            st.download_button(
-                label="💾 Download CSV",
-                data=st.session_state.generated_csv,
-                file_name="generated_dataset.csv",
-                mime="text/csv",
-                use_container_width=True,
-            )
+            # Download button, served from the file on disk
+            with open(st.session_state.generated_path, "rb") as f:
+                st.download_button(
+                    label="💾 Download CSV",
+                    data=f,
+                    file_name="generated_dataset.csv",
+                    mime="text/csv",
+                    use_container_width=True,
+                )
 
             # Clear results button
             if st.button("🗑️ Clear Results", use_container_width=True):
-                if "generated_csv" in st.session_state:
-                    del st.session_state.generated_csv
-                if "show_results" in st.session_state:
-                    del st.session_state.show_results
+                _clear_results()
                 st.rerun()
 
     # Display results
@@ -107,52 +250,149 @@ def main():
         # Tabs for different views
         tab1, tab2, tab3 = st.tabs(["📊 Table View", "📝 Raw CSV", "📈 Statistics"])
 
+        path = st.session_state.generated_path
+        content_hash = st.session_state.generated_hash
+        total_rows = st.session_state.generated_rows
+
         with tab1:
             try:
-                # Convert CSV string to DataFrame
-                csv_data = io.StringIO(st.session_state.generated_csv)
-                df = pd.read_csv(csv_data)
+                # Only the visible page is parsed, so large datasets never
+                # sit in memory
+                page_count = max(1, -(-total_rows // PREVIEW_PAGE_SIZE))
+                page = st.number_input(
+                    "Page", min_value=1, max_value=page_count, value=1, step=1
+                )
+                page_df = table_page(path, content_hash, page, PREVIEW_PAGE_SIZE)
 
                 # Display the dataframe
-                st.dataframe(df, use_container_width=True, height=400)
+                st.dataframe(page_df, use_container_width=True, height=400)
 
                 # Show basic info
                 st.subheader("Dataset Info")
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("Total Rows", len(df))
+                    st.metric("Total Rows", total_rows)
                 with col2:
-                    st.metric("Total Columns", len(df.columns))
+                    st.metric("Total Columns", len(page_df.columns))
                 with col3:
                     st.metric(
-                        "Data Size", f"{len(st.session_state.generated_csv)} chars"
+                        "Data Size",
+                        f"{st.session_state.generated_size / 1024:.1f} KB",
                     )
 
             except Exception as e:
                 st.error(f"Error displaying table: {e}")
                 st.text("Raw CSV data:")
-                st.text(st.session_state.generated_csv)
+                st.text("\n".join(read_lines(path, limit=RAW_PAGE_LINES)))
 
         with tab2:
+            raw_page_count = max(1, -(-(total_rows + 1) // RAW_PAGE_LINES))
+            raw_page_num = st.number_input(
+                "Raw page",
+                min_value=1,
+                max_value=raw_page_count,
+                value=1,
+                step=1,
+            )
             st.text_area(
-                "Raw CSV Data",
-                value=st.session_state.generated_csv,
+                f"Raw CSV Data (page {raw_page_num}/{raw_page_count})",
+                value=raw_page(path, content_hash, raw_page_num, RAW_PAGE_LINES),
                 height=400,
                 disabled=True,
             )
 
         with tab3:
             try:
-                csv_data = io.StringIO(st.session_state.generated_csv)
-                df = pd.read_csv(csv_data)
+                report = st.session_state.get("amplify_report")
+                if report:
+                    st.subheader("Amplified vs. Seed")
+                    st.caption(
+                        f"Fitted on {report['seed_rows']} model-generated rows; "
+                        "column distance is KS for numbers and dates, total "
+                        "variation for categories"
+                    )
+                    score_cols = st.columns(3)
+                    with score_cols[0]:
+                        st.metric("Fidelity to seed", f"{report['fidelity']:.1f}%")
+                    with score_cols[1]:
+                        st.metric(
+                            "Seed quality",
+                            f"{report['seed_scores']['overall']:.1f}%",
+                        )
+                    with score_cols[2]:
+                        st.metric(
+                            "Amplified quality",
+                            f"{report['synthetic_scores']['overall']:.1f}%",
+                        )
+                    if report["correlation_error"] is not None:
+                        st.write(
+                            "Mean correlation difference: "
+                            f"{report['correlation_error']:.3f}"
+                        )
+                    st.table(report["columns"])
+
+                if st.toggle("Fast approximate EDA", value=False):
+                    sample_size = st.number_input(
+                        "Sample size",
+                        min_value=1000,
+                        value=FAST_EDA_SAMPLE_SIZE,
+                        step=1000,
+                    )
+                    report = quality_report(path, content_hash, int(sample_size))
+                    sampling = report["sampling"]
+                    bounds = sampling["bounds"]
+                    st.caption(
+                        f"Estimated from {sampling['sample_rows']} of "
+                        f"{sampling['population_rows']} rows; ranges are "
+                        f"{sampling['confidence']:.0%} confidence bounds, "
+                        "worst-case bounds for uniqueness"
+                    )
+                    score_cols = st.columns(3)
+                    for column, name in zip(
+                        score_cols, ("overall", "completeness", "uniqueness")
+                    ):
+                        low, high = bounds["quality_scores"][name]
+                        with column:
+                            st.metric(
+                                name.capitalize(),
+                                f"{report['quality_scores'][name]:.1f}%",
+                            )
+                            st.caption(f"{low:.1f}% - {high:.1f}%")
+                    low, high = bounds["duplicate_percent"]
+                    st.write(
+                        f"Duplicate rows: "
+                        f"{report['quality_assessment']['duplicate_percent']:.2f}% "
+                        f"({low:.2f}% - {high:.2f}%)"
+                    )
+                    if bounds["outlier_percent"]:
+                        st.write("Outlier rate by column:")
+                        st.table(
+                            {
+                                col: {"low %": low, "high %": high}
+                                for col, (low, high) in bounds[
+                                    "outlier_percent"
+                                ].items()
+                            }
+                        )
+
+                stats, dtype_report, sampled = column_stats(
+                    path, content_hash, total_rows
+                )
 
                 st.subheader("Column Information")
-                for col in df.columns:
+                if sampled:
+                    st.caption(
+                        f"Estimated from a uniform sample of "
+                        f"{STATS_SAMPLE_ROWS} rows"
+                    )
+                else:
+                    st.caption(
+                        f"In memory: {dtype_report['after_bytes'] / 1024:.1f} KB "
+                        f"(down from {dtype_report['before_bytes'] / 1024:.1f} KB "
+                        "after compacting column types)"
+                    )
+                for col, col_info in stats.items():
                     with st.expander(f"Column: {col}"):
-                        if df[col].dtype in ["int64", "float64"]:
-                            col_info = df[col].describe()
-                        else:
-                            col_info = df[col].value_counts().head()
                         st.write(col_info)
 
             except Exception as e:
@@ -0,0 +1,194 @@
+"""Per-call metrics for the refine and generate stages.
+
+Every model call is appended to ``metrics.jsonl`` as one JSON object, each
+generation job adds a summary line, and process-wide totals are exported
+in Prometheus text format for a textfile collector or scraper.
+"""
+
+import collections
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from logger import logger
+
+METRICS_LOG_PATH = os.getenv("metrics_log_path", "metrics.jsonl")
+METRICS_PROM_PATH = os.getenv("metrics_prom_path", "metrics.prom")
+
+COUNTERS = {
+    "calls": "Model calls",
+    "errors": "Model calls that failed after retries",
+    "retries": "Retried attempts",
+    "latency_seconds": "Time spent in successful model calls",
+    "prompt_tokens": "Prompt tokens sent",
+    "cached_tokens": "Prompt tokens served from the provider cache",
+    "completion_tokens": "Completion tokens received",
+    "rows": "Rows produced",
+    "rows_rejected": "Rows rejected as invalid or duplicate",
+}
+
+_lock = threading.Lock()
+_totals = collections.defaultdict(float)
+
+
+def _append(record, path=METRICS_LOG_PATH):
+    line = json.dumps(record, default=str)
+    with _lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def record_call(
+    stage,
+    model,
+    latency,
+    job=None,
+    prompt_tokens=0,
+    cached_tokens=0,
+    completion_tokens=0,
+    rows=0,
+    rejected=0,
+    retries=0,
+    ttft=None,
+    error=None,
+    **extra,
+):
+    """Record one model call; returns the record written to the log."""
+    record = {
+        "type": "call",
+        "ts": time.time(),
+        "job_id": job.job_id if job is not None else None,
+        "stage": stage,
+        "model": model,
+        "latency": round(latency, 4),
+        "ttft": round(ttft, 4) if ttft is not None else None,
+        "prompt_tokens": prompt_tokens or 0,
+        "cached_tokens": cached_tokens or 0,
+        "completion_tokens": completion_tokens or 0,
+        "rows": rows,
+        "rows_rejected": rejected,
+        "retries": retries,
+        "error": error,
+        **extra,
+    }
+    try:
+        _append(record)
+    except OSError:
+        logger.exception("Could not append call metrics")
+
+    labels = (stage, model)
+    with _lock:
+        _totals[("calls", labels)] += 1
+        _totals[("retries", labels)] += retries
+        if error is not None:
+            _totals[("errors", labels)] += 1
+        else:
+            _totals[("latency_seconds", labels)] += latency
+        for key in (
+            "prompt_tokens",
+            "cached_tokens",
+            "completion_tokens",
+            "rows",
+            "rows_rejected",
+        ):
+            _totals[(key, labels)] += record[key]
+
+    if job is not None:
+        job.add(record)
+    return record
+
+
+class JobMetrics:
+    """Calls made for one generation job and their summary."""
+
+    def __init__(self, job_id=None):
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.started = time.perf_counter()
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.calls.append(record)
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        ok = [c for c in self.calls if c["error"] is None]
+        ttfts = [c["ttft"] for c in ok if c["ttft"] is not None]
+        totals = {
+            key: sum(c[key] for c in self.calls)
+            for key in (
+                "prompt_tokens",
+                "cached_tokens",
+                "completion_tokens",
+                "rows",
+                "rows_rejected",
+                "retries",
+            )
+        }
+        tokens = totals["prompt_tokens"] + totals["completion_tokens"]
+        return {
+            "type": "job",
+            "job_id": self.job_id,
+            "elapsed": round(elapsed, 3),
+            "calls": len(self.calls),
+            "errors": len(self.calls) - len(ok),
+            **totals,
+            "mean_latency": (
+                round(sum(c["latency"] for c in ok) / len(ok), 4) if ok else None
+            ),
+            "mean_ttft": round(sum(ttfts) / len(ttfts), 4) if ttfts else None,
+            "rows_per_second": round(totals["rows"] / elapsed, 3) if elapsed else None,
+            "rows_per_1k_tokens": (
+                round(totals["rows"] * 1000 / tokens, 3) if tokens else None
+            ),
+            "models": sorted({c["model"] for c in self.calls}),
+        }
+
+    def finish(self, **extra):
+        """Log the job summary and refresh the Prometheus file.
+
+        Export failures are logged rather than raised, so metrics can never
+        fail the job they describe.
+        """
+        summary = {**self.summary(), **extra}
+        try:
+            _append(summary)
+            write_prometheus()
+        except OSError:
+            logger.exception(f"Could not export metrics for job {self.job_id}")
+        return summary
+
+
+def prometheus_text():
+    lines = []
+    with _lock:
+        totals = dict(_totals)
+    for name, help_text in COUNTERS.items():
+        metric = f"synthee_{name}_total"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for (key, (stage, model)), value in sorted(totals.items()):
+            if key == name:
+                lines.append(f'{metric}{{stage="{stage}",model="{model}"}} {value:g}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=METRICS_PROM_PATH):
+    # Write then rename so a scraper never reads a half-written file; each
+    # writer gets its own temp file so concurrent jobs cannot clobber one
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=".metrics-", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(prometheus_text())
+        # mkstemp creates the file owner-only; collectors need to read it
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
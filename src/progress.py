@@ -0,0 +1,50 @@
+from logger import logger
+
+
+class ProgressReporter:
+    """Receives progress from a generation job.
+
+    The generation functions never talk to a UI directly; they call these
+    methods and the caller decides what to do with them. The base class
+    ignores everything, so it also serves as a silent reporter.
+    """
+
+    def status(self, message):
+        """Short description of what the job is doing now."""
+
+    def advance(self, fraction):
+        """Overall completion between 0 and 1."""
+
+    def quality(self, scores):
+        """Latest live quality scores (``IncrementalQualityTracker`` output)."""
+
+    def notify(self, level, message):
+        """A message for the user; ``level`` is info, success, warning or error."""
+
+    def cancelled(self):
+        """The job stopped short because its ``cancel_event`` was set."""
+
+
+class LoggingProgressReporter(ProgressReporter):
+    """Sends progress to the application log, for headless runs."""
+
+    def __init__(self, name=None):
+        self.prefix = f"[{name}] " if name else ""
+        self._last_percent = None
+
+    def status(self, message):
+        logger.info(f"{self.prefix}{message}")
+
+    def advance(self, fraction):
+        # Only whole-percent changes, so large jobs do not flood the log
+        percent = int(fraction * 100)
+        if percent != self._last_percent:
+            self._last_percent = percent
+            logger.debug(f"{self.prefix}{percent}% done")
+
+    def quality(self, scores):
+        logger.info(f"{self.prefix}Live quality: {scores['overall']:.1f}% overall")
+
+    def notify(self, level, message):
+        log = {"error": logger.error, "warning": logger.warning}.get(level, logger.info)
+        log(f"{self.prefix}{message}")
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TTL_SECONDS = int(os.getenv("prompt_cache_ttl", str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("prompt_cache_max_entries", "1000"))
+
+
+def default_cache_path():
+    """``prompt_cache_path`` from the environment, relative to the package
+    directory rather than the working directory."""
+    path = os.getenv("prompt_cache_path") or "prompt_cache.sqlite3"
+    return os.path.join(PACKAGE_DIR, os.path.expanduser(path))
+
+
+def cache_key(user_prompt, system_prompt, model_name):
+    digest = hashlib.sha256()
+    for part in (model_name, system_prompt, user_prompt):
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") differ
+        encoded = part.encode("utf-8")
+        digest.update(f"{len(encoded)}:".encode("ascii"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class PromptCache:
+    """Persistent cache of refined prompts with TTL and LRU size eviction.
+
+    The database is opened on first use, so importing a module that holds
+    a cache creates no file; ``path`` defaults to ``default_cache_path()``.
+    """
+
+    def __init__(
+        self,
+        path=None,
+        ttl_seconds=DEFAULT_TTL_SECONDS,
+        max_entries=DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = None
+
+    @property
+    def _conn(self):
+        # Callers hold ``_lock``
+        if self._db is None:
+            if self.path is None:
+                self.path = default_cache_path()
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("""CREATE TABLE IF NOT EXISTS refined_prompts (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )""")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_last_accessed ON refined_prompts (last_accessed)"
+            )
+            self._db.commit()
+        return self._db
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM refined_prompts WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM refined_prompts WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE refined_prompts SET last_accessed = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO refined_prompts VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        if self.ttl_seconds:
+            self._conn.execute(
+                "DELETE FROM refined_prompts WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            )
+
+        if self.max_entries:
+            self._conn.execute(
+                """DELETE FROM refined_prompts WHERE key IN (
+                    SELECT key FROM refined_prompts
+                    ORDER BY last_accessed DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        with self._lock:
+            (entries,) = self._conn.execute(
+                "SELECT COUNT(*) FROM refined_prompts"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "hit_rate": (self.hits / lookups) * 100 if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM refined_prompts")
+            self._conn.commit()
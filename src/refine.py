@@ -1,27 +1,77 @@
 import os
+import time
 from dotenv import load_dotenv
-from openai import OpenAI
+from clients import get_client
 from datasetconfig import DatasetConfig
+from prompt_cache import PromptCache, cache_key
+from retry import call_with_retry, limited
 from system_prompts.prompt_refiner import refiner_system_prompt
+from logger import logger
+from metrics import record_call
 
 load_dotenv()
 
 api_key = os.getenv("openrouter_api_key")
 
+REFINER_MODEL = "meta-llama/llama-4-maverick:free"
+
 system = refiner_system_prompt()
 
+prompt_cache = PromptCache()
 
-def model(user_question):
-    client = OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=api_key,
-    )
-    stream_response = client.chat.completions.create(
-        model="meta-llama/llama-4-maverick:free",
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user_question},
-        ],
+
+def model(user_question, job=None, batch_slots=None):
+    # ``batch_slots`` caps in-flight model calls shared with the generation
+    # batches; cache hits never take a slot
+    started = time.perf_counter()
+    key = cache_key(user_question, system, REFINER_MODEL)
+    cached = prompt_cache.get(key)
+    if cached is not None:
+        logger.info(f"Refined prompt cache hit ({prompt_cache.stats()})")
+        record_call(
+            "refine",
+            REFINER_MODEL,
+            time.perf_counter() - started,
+            job=job,
+            cache_hit=True,
+        )
+        return cached
+
+    client = get_client(api_key)
+    retries = []
+    try:
+        stream_response = call_with_retry(
+            limited(batch_slots, client.chat.completions.create),
+            model=REFINER_MODEL,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user_question},
+            ],
+            on_retry=lambda attempt, e: retries.append(attempt),
+        )
+    except Exception as e:
+        record_call(
+            "refine",
+            REFINER_MODEL,
+            time.perf_counter() - started,
+            job=job,
+            retries=len(retries),
+            error=e.__class__.__name__,
+        )
+        raise
+
+    usage = stream_response.usage
+    record_call(
+        "refine",
+        REFINER_MODEL,
+        time.perf_counter() - started,
+        job=job,
+        prompt_tokens=usage.prompt_tokens if usage else 0,
+        completion_tokens=usage.completion_tokens if usage else 0,
+        retries=len(retries),
+        cache_hit=False,
     )
     refined_prompt = stream_response.choices[0].message.content
+    if refined_prompt:
+        prompt_cache.set(key, refined_prompt)
     return refined_prompt
@@ -0,0 +1,60 @@
+import io
+import pandas as pd
+import streamlit as st
+from feedback.dtype_optimizer import optimize_dtypes
+from feedback.sampled_analyzer import SampledDataQualityAnalyzer
+from row_sink import read_lines
+
+STATS_SAMPLE_ROWS = 100_000
+
+# Cached functions take the content hash recorded by the row sink at
+# generation time; the path alone could be reused for a different dataset.
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def table_page(path, content_hash, page, rows_per_page):
+    """One page of parsed rows, read without loading the rest of the file."""
+    header = read_lines(path, limit=1)
+    lines = read_lines(path, offset=1 + (page - 1) * rows_per_page, limit=rows_per_page)
+    return pd.read_csv(io.StringIO("\n".join(header + lines)))
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def column_stats(path, content_hash, total_rows):
+    """Per-column summaries; returns (stats, dtype report, sampled).
+
+    Datasets over ``STATS_SAMPLE_ROWS`` rows are summarised from a uniform
+    sample of that many rows, so memory stays flat for amplified datasets.
+    """
+    sampled = total_rows > STATS_SAMPLE_ROWS
+    if sampled:
+        df = SampledDataQualityAnalyzer(path, sample_size=STATS_SAMPLE_ROWS).df
+    else:
+        df = pd.read_csv(path)
+    df, dtype_report = optimize_dtypes(df)
+    stats = {}
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            stats[col] = df[col].describe()
+        else:
+            stats[col] = df[col].value_counts().head()
+    return stats, dtype_report, sampled
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def quality_report(path, content_hash, sample_size):
+    """Approximate quality scores from a sample, with confidence bounds."""
+    results = SampledDataQualityAnalyzer(
+        path, sample_size=sample_size
+    ).run_full_analysis()
+    return {
+        "quality_scores": results["quality_scores"],
+        "quality_assessment": results["quality_assessment"],
+        "sampling": results["sampling"],
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def raw_page(path, content_hash, page, lines_per_page):
+    lines = read_lines(path, offset=(page - 1) * lines_per_page, limit=lines_per_page)
+    return "\n".join(lines)
@@ -0,0 +1,89 @@
+import os
+import random
+import time
+import openai
+from logger import logger
+
+MAX_RETRIES = int(os.getenv("max_retries", "4"))
+BASE_DELAY = float(os.getenv("retry_base_delay", "1.0"))
+MAX_DELAY = float(os.getenv("retry_max_delay", "30.0"))
+
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def is_transient(error):
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in TRANSIENT_STATUS_CODES
+    return isinstance(error, TimeoutError)
+
+
+def retry_after_seconds(error):
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = response.headers.get("retry-after")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def backoff_delay(attempt, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+    # Full jitter keeps concurrent batches from retrying in lockstep
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
+
+
+def limited(slots, fn):
+    # Hold a shared slot only while a call is in flight, not during the
+    # retry backoff between attempts
+    if slots is None:
+        return fn
+
+    def call(*args, **kwargs):
+        with slots:
+            return fn(*args, **kwargs)
+
+    return call
+
+
+def call_with_retry(
+    fn,
+    *args,
+    max_retries=MAX_RETRIES,
+    base_delay=BASE_DELAY,
+    max_delay=MAX_DELAY,
+    on_retry=None,
+    **kwargs,
+):
+    attempt = 0
+    while True:
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt >= max_retries or not is_transient(e):
+                raise
+
+            delay = retry_after_seconds(e)
+            if delay is None:
+                delay = backoff_delay(attempt, base_delay, max_delay)
+            delay = min(delay, max_delay)
+
+            attempt += 1
+            if on_retry is not None:
+                on_retry(attempt, e)
+            logger.warning(
+                f"Transient error ({e.__class__.__name__}), retry {attempt}/{max_retries} in {delay:.1f}s: {e}"
+            )
+            time.sleep(delay)
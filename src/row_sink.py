@@ -0,0 +1,103 @@
+import abc
+import hashlib
+import io
+import os
+import tempfile
+import uuid
+
+DATASET_DIR = os.getenv("dataset_output_dir", tempfile.gettempdir())
+
+
+class RowSink(abc.ABC):
+    """Destination for generated CSV lines.
+
+    Sinks receive the header once and data rows in batch order, and keep a
+    running content hash so callers never have to re-read the data to
+    identify it.
+    """
+
+    def __init__(self):
+        self.header = None
+        self.row_count = 0
+        self.size_bytes = 0
+        self._hash = hashlib.sha256()
+
+    @property
+    def content_hash(self):
+        return self._hash.hexdigest()
+
+    def write_header(self, header):
+        if self.header is not None:
+            return
+        self.header = header
+        self._write(header + "\n")
+
+    def write_rows(self, lines):
+        if not lines:
+            return
+        self._write("\n".join(lines) + "\n")
+        self.row_count += len(lines)
+
+    def _write(self, text):
+        data = text.encode("utf-8")
+        self._hash.update(data)
+        self.size_bytes += len(data)
+        self._write_bytes(data)
+
+    @abc.abstractmethod
+    def _write_bytes(self, data):
+        """Store ``data`` (encoded UTF-8 text) in the destination."""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MemoryRowSink(RowSink):
+    def __init__(self):
+        super().__init__()
+        self._buffer = io.BytesIO()
+
+    def _write_bytes(self, data):
+        self._buffer.write(data)
+
+    def getvalue(self):
+        return self._buffer.getvalue().decode("utf-8").rstrip("\n")
+
+
+class CsvFileRowSink(RowSink):
+    """Appends rows to a CSV file so memory stays flat for large jobs."""
+
+    def __init__(self, path=None):
+        super().__init__()
+        if path is None:
+            path = os.path.join(DATASET_DIR, f"synthee_{uuid.uuid4().hex}.csv")
+        self.path = path
+        self._file = open(path, "ab")
+
+    def _write_bytes(self, data):
+        self._file.write(data)
+        # Flush per write so previews see every completed batch
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def read_lines(path, offset=0, limit=200):
+    """Return raw text lines ``offset`` to ``offset + limit`` without loading the file."""
+    lines = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for i, line in enumerate(f):
+            if i < offset:
+                continue
+            if i >= offset + limit:
+                break
+            lines.append(line.rstrip("\n"))
+    return lines
@@ -0,0 +1,384 @@
+"""Column schema extracted from the refined prompt and batch validation.
+
+The refiner is asked for a "Column Specifications" section (name, data
+type, constraints per column). ``extract_schema`` parses it once per job
+and ``RowValidator`` checks whole batches of CSV lines with pandas ops.
+"""
+
+import csv
+import re
+import numpy as np
+import pandas as pd
+from logger import logger
+
+TYPE_ALIASES = {
+    "integer": "integer",
+    "int": "integer",
+    "float": "float",
+    "decimal": "float",
+    "double": "float",
+    "numeric": "float",
+    "number": "float",
+    "boolean": "boolean",
+    "bool": "boolean",
+    "date": "date",
+    "datetime": "date",
+    "timestamp": "date",
+    "categorical": "categorical",
+    "category": "categorical",
+    "enum": "categorical",
+    "string": "string",
+    "text": "string",
+}
+
+BOOLEAN_VALUES = {"true", "false", "yes", "no", "1", "0", "t", "f", "y", "n"}
+
+_NUMBER = r"(-?\d[\d,]*(?:\.\d+)?)"
+_FIELD = re.compile(
+    r"^[\s>*#\-\d.]*\**\s*(column name|column|name|data type|type|constraints?|"
+    r"sample values|description)\s*\**\s*:\s*\**\s*(.*)$",
+    re.IGNORECASE,
+)
+# "Column Specifications", "## Columns", "**Field definitions:**" and the like
+_SECTION = re.compile(
+    r"^[\s#*>]*(?:dataset\s+)?(?:columns?|fields?|schema)\b[\w\s]*[*:]*\s*$", re.I
+)
+# Markdown headings, or a bold or bare title of a few words ("Data quality
+# recommendations"); one-word or snake_case titles are column names
+_HEADING = re.compile(
+    r"^(?:\s*#+\s+\S.*|\s*\*\*[A-Za-z ]+ [A-Za-z ]+:?\*\*:?\s*"
+    r"|[A-Z][a-z]+(?: [A-Za-z]+){1,5}:?\s*)$"
+)
+_SIGN = re.compile(r"(?<![\w-])(?:non-?negative|positive)\b", re.I)
+_EITHER_SIGN = re.compile(
+    r"\b(?:positive|negative)\s*(?:or|/|and)\s*(?:positive|negative)\b", re.I
+)
+_RANGE = re.compile(_NUMBER + r"\s*(?:-|–|to|and)\s*" + _NUMBER)
+_MIN = re.compile(
+    r"(?:min(?:imum)?|>=|at least|greater than or equal to)\s*:?\s*" + _NUMBER, re.I
+)
+_MAX = re.compile(
+    r"(?:max(?:imum)?|<=|at most|less than or equal to)\s*:?\s*" + _NUMBER, re.I
+)
+# "max 2 decimal places", "at least 3 characters": a length, not a value bound
+_UNIT = re.compile(
+    r"\s*(?:decimal|digit|character|char|place|letter|word|significant)s?\b", re.I
+)
+# The value list ends at the first clause break: "; required", "(optional)"
+_ENUM = re.compile(
+    r"(?:one of|(?:allowed|valid|possible|accepted) values)\s*:?\s*"
+    r"([^;(]+?)\s*(?:[;(]|\.\s|\.?$)",
+    re.I,
+)
+# Hedged or descriptive lists ("typically one of the major US cities");
+# lowercase "a" only, so grades like "A, B, C" still count as values
+_PROSE = re.compile(
+    r"\b(?:an?|(?i:the|typically|usually|mostly|commonly|such as|including"
+    r"|like|etc|e\.g|for example|various|any))\b"
+)
+MAX_ENUM_VALUE_WORDS = 4
+# "unique" or "primary key", but not "non-unique" or "not unique"
+_UNIQUE = re.compile(r"(?<![\w-])(?<!not )(?:unique|primary key)\b", re.I)
+
+
+def _number(text):
+    return float(text.replace(",", ""))
+
+
+def _clean_name(text):
+    name = text.strip().strip("*`'\" ").strip()
+    return re.sub(r"\s+", "_", name)
+
+
+def _parse_type(text):
+    for word in re.findall(r"[a-z]+", text.lower()):
+        if word in TYPE_ALIASES:
+            return TYPE_ALIASES[word]
+    return "string"
+
+
+def _bound(pattern, text):
+    # First number that is a value bound rather than a length or precision
+    for match in pattern.finditer(text):
+        if not _UNIT.match(text, match.end()):
+            return match
+    return None
+
+
+def _parse_constraints(spec, text):
+    lowered = text.lower()
+    # An explicit range wins over min/max prose, and neither replaces a
+    # bound already set for the column
+    if spec["type"] in ("integer", "float"):
+        match = _bound(_RANGE, text)
+        if match and spec["min"] is None and spec["max"] is None:
+            spec["min"], spec["max"] = sorted(map(_number, match.groups()))
+        match = _bound(_MIN, text)
+        if match and spec["min"] is None:
+            spec["min"] = _number(match.group(1))
+        match = _bound(_MAX, text)
+        if match and spec["max"] is None:
+            spec["max"] = _number(match.group(1))
+
+    # "non-positive" and "positive or negative" say nothing about a minimum
+    if spec["min"] is None and _SIGN.search(text) and not _EITHER_SIGN.search(text):
+        spec["min"] = 0.0
+
+    match = _ENUM.search(text)
+    if match and spec["type"] in ("categorical", "string"):
+        values = re.split(r",|\||/|\bor\b", match.group(1).strip(" .[]"))
+        values = [v.strip().strip("'\"` ").casefold() for v in values]
+        values = [v for v in values if v]
+        if (
+            values
+            and not _PROSE.search(match.group(1))
+            and all(len(v.split()) <= MAX_ENUM_VALUE_WORDS for v in values)
+        ):
+            spec["allowed"] = set(values)
+
+    if "required" in lowered and "optional" not in lowered:
+        spec["required"] = True
+    if _UNIQUE.search(text):
+        spec["unique"] = True
+
+
+def _new_spec(name):
+    return {
+        "name": name,
+        "type": "string",
+        "min": None,
+        "max": None,
+        "allowed": None,
+        "required": False,
+        "unique": False,
+    }
+
+
+def _table_specs(lines):
+    # Markdown table form: | column | type | ... | constraints |
+    specs = []
+    columns = None
+    for line in lines:
+        if not line.strip().startswith("|"):
+            columns = None if specs else columns
+            continue
+        cells = [c.strip().strip("*` ") for c in line.strip().strip("|").split("|")]
+        if columns is None:
+            lowered = [c.lower() for c in cells]
+            if any("column" in c or "name" in c for c in lowered) and any(
+                "type" in c for c in lowered
+            ):
+                columns = lowered
+            continue
+        if set("".join(cells)) <= set("-: "):
+            continue
+
+        row = dict(zip(columns, cells))
+        name = next((v for k, v in row.items() if "column" in k or "name" in k), "")
+        if not name:
+            continue
+        spec = _new_spec(_clean_name(name))
+        spec["type"] = _parse_type(next((v for k, v in row.items() if "type" in k), ""))
+        _parse_constraints(
+            spec, next((v for k, v in row.items() if "constraint" in k), "")
+        )
+        specs.append(spec)
+    return specs
+
+
+def _section_lines(lines):
+    # Lines under a column specification heading, up to the next heading;
+    # None when the prompt has no such section
+    section = None
+    inside = False
+    for line in lines:
+        if _SECTION.match(line) and not _FIELD.match(line):
+            inside = True
+            section = section or []
+            continue
+        if inside and _HEADING.match(line) and not _FIELD.match(line):
+            inside = False
+        if inside:
+            section.append(line)
+    return section
+
+
+def extract_schema(refined_prompt):
+    """Parse the column specifications in ``refined_prompt``.
+
+    Only the column specification section is read when the prompt has one,
+    so "Name: ..." prose elsewhere is not taken for a column. Returns a
+    list of column spec dicts (name, type, min, max, allowed, required,
+    unique); empty when no specification could be found.
+    """
+    if not refined_prompt:
+        return []
+
+    lines = refined_prompt.splitlines()
+    candidates = _section_lines(lines) or lines
+    specs = []
+    names = set()
+    skipped = []
+    spec = None
+    for line in candidates:
+        match = _FIELD.match(line)
+        if not match:
+            continue
+        key, value = match.group(1).lower(), match.group(2).strip()
+        if key in ("column name", "column", "name"):
+            if not value:
+                continue
+            spec = _new_spec(_clean_name(value))
+            if spec["name"].casefold() in names:
+                # Keep the first definition; its details are not overwritten
+                skipped.append(spec["name"])
+                spec = None
+                continue
+            names.add(spec["name"].casefold())
+            specs.append(spec)
+        elif spec is None:
+            continue
+        elif key in ("data type", "type"):
+            spec["type"] = _parse_type(value)
+        elif key.startswith("constraint"):
+            _parse_constraints(spec, value)
+
+    if not specs:
+        specs = []
+        for spec in _table_specs(lines):
+            if spec["name"].casefold() in names:
+                skipped.append(spec["name"])
+                continue
+            names.add(spec["name"].casefold())
+            specs.append(spec)
+
+    if skipped:
+        logger.warning(f"Skipped repeated column names in refined prompt: {skipped}")
+    return specs
+
+
+def unique_columns(schema):
+    """Names of the columns the schema marks unique, e.g. an ``id`` key."""
+    return [spec["name"] for spec in schema if spec["unique"]]
+
+
+class RowValidator:
+    """Rejects generated rows that do not fit the header and schema.
+
+    Rows must have one field per header column. Columns named in the schema
+    are also checked for type, numeric range and allowed values; empty
+    fields only fail when the column is required. Each batch is checked
+    column by column with vectorized pandas operations.
+    """
+
+    def __init__(self, header, schema=None):
+        self.header = next(csv.reader([header]))
+        self.expected_fields = len(self.header)
+        specs = {s["name"].casefold(): s for s in schema or []}
+        self.specs = {}
+        for i, name in enumerate(self.header):
+            spec = specs.get(_clean_name(name).casefold())
+            if spec is not None:
+                self.specs[i] = spec
+        if schema and not self.specs:
+            logger.warning(
+                "Generated header does not match the refined prompt schema; "
+                "only field counts are validated"
+            )
+        self.rows_checked = 0
+        self.rejected = 0
+        self.reasons = {}
+
+    def _reject(self, mask, reason, invalid):
+        new = mask & ~invalid
+        count = int(new.sum())
+        if count:
+            self.reasons[reason] = self.reasons.get(reason, 0) + count
+        return invalid | mask
+
+    def _in_set(self, values, allowed):
+        # Few distinct values per column: normalize those, not every row
+        uniques = pd.Series(values.unique())
+        accepted = uniques[uniques.str.strip().str.casefold().isin(allowed)]
+        return values.isin(accepted)
+
+    def _to_number(self, values, present):
+        numbers = pd.to_numeric(values, errors="coerce")
+        # Only values pandas could not parse get symbols stripped
+        retry = present & numbers.isna()
+        if retry.any():
+            numbers[retry] = pd.to_numeric(
+                values[retry].str.replace(r"[,$€£%\s]", "", regex=True),
+                errors="coerce",
+            )
+        return numbers
+
+    def _check_column(self, values, spec, invalid):
+        present = values.str.strip() != "" if spec["required"] else values != ""
+        name = spec["name"]
+        if spec["required"]:
+            invalid = self._reject(~present, f"{name}: missing", invalid)
+
+        kind = spec["type"]
+        if kind in ("integer", "float"):
+            numbers = self._to_number(values, present)
+            bad = present & numbers.isna()
+            if kind == "integer":
+                bad |= present & numbers.notna() & (numbers % 1 != 0)
+            invalid = self._reject(bad, f"{name}: not {kind}", invalid)
+            if spec["min"] is not None:
+                invalid = self._reject(
+                    numbers < spec["min"], f"{name}: below {spec['min']:g}", invalid
+                )
+            if spec["max"] is not None:
+                invalid = self._reject(
+                    numbers > spec["max"], f"{name}: above {spec['max']:g}", invalid
+                )
+        elif kind == "boolean":
+            bad = present & ~self._in_set(values, BOOLEAN_VALUES)
+            invalid = self._reject(bad, f"{name}: not boolean", invalid)
+        elif kind == "date":
+            parsed = pd.to_datetime(values, errors="coerce", format="ISO8601")
+            retry = present & parsed.isna()
+            if retry.any():
+                parsed[retry] = pd.to_datetime(
+                    values[retry], errors="coerce", format="mixed"
+                )
+            invalid = self._reject(
+                present & parsed.isna(), f"{name}: not a date", invalid
+            )
+
+        if spec["allowed"]:
+            bad = present & ~self._in_set(values, spec["allowed"])
+            invalid = self._reject(bad, f"{name}: unexpected value", invalid)
+        return invalid
+
+    def validate(self, lines):
+        """Return ``(valid_lines, rejected_count)`` for one batch."""
+        if not lines:
+            return [], 0
+
+        rows = list(csv.reader(lines, skipinitialspace=True))
+        counts = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+        invalid = pd.Series(counts != self.expected_fields)
+        if invalid.any():
+            self.reasons["wrong field count"] = self.reasons.get(
+                "wrong field count", 0
+            ) + int(invalid.sum())
+
+        if self.specs and not invalid.all():
+            frame = pd.DataFrame(rows, columns=None).iloc[:, : self.expected_fields]
+            for i, spec in self.specs.items():
+                values = frame[i].fillna("")
+                invalid = self._check_column(values, spec, invalid)
+
+        keep = ~invalid.to_numpy()
+        valid = [line for line, ok in zip(lines, keep) if ok]
+        rejected = len(lines) - len(valid)
+        self.rows_checked += len(lines)
+        self.rejected += rejected
+        return valid, rejected
+
+    @property
+    def rejection_rate(self):
+        return self.rejected / self.rows_checked if self.rows_checked else 0.0
@@ -0,0 +1,427 @@
+"""Local synthesizer that amplifies a small LLM-generated seed dataset.
+
+``SeedSynthesizer.fit`` learns per-column marginals and pairwise
+dependencies from the seed; ``sample`` then draws any number of new rows
+with vectorized NumPy operations and no model calls:
+
+- numeric and date columns share a Gaussian copula (rank correlations of
+  their normal scores) over empirical marginals, optionally conditioned on
+  the categorical column that explains them best;
+- categorical columns are drawn along a tree of conditional frequency
+  tables, each column conditioned on its most associated parent;
+- id-like columns continue their sequence, and free text is resampled
+  from the seed values.
+"""
+
+import math
+import re
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from feedback.correlations import (
+    MAX_CATEGORIES,
+    correlation_matrix,
+    correlation_ratio,
+    cramers_v,
+)
+from feedback.sampled_analyzer import SampledDataQualityAnalyzer
+from feedback.data_quality_analyzer import DataQualityAnalyzer
+
+SYNTHESIZER_MODEL = "gaussian-copula"
+BATCH_ROWS = 100_000
+MIN_GROUP_ROWS = 20
+MAX_DECIMALS = 6
+SCORE_SAMPLE_ROWS = 50_000
+
+_SEQUENCE = re.compile(r"^(\D*?)(\d+)$")
+
+
+def _normal_cdf(z):
+    # Abramowitz & Stegun 7.1.26 (error < 1.5e-7); numpy has no erf
+    x = np.abs(z) / math.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (
+        0.254829592
+        + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429)))
+    )
+    erf = 1 - poly * np.exp(-(x**2))
+    return 0.5 * (1 + np.sign(z) * erf)
+
+
+def _normal_scores(values):
+    # Ranks mapped through the inverse normal CDF; NaNs stay NaN
+    ranks = values.rank(method="average")
+    u = ranks / (values.notna().sum() + 1)
+    inv = NormalDist().inv_cdf
+    return u.map(lambda p: inv(p) if p == p else np.nan)
+
+
+def _nearest_correlation(matrix):
+    # Pairwise-complete estimates need not be positive definite
+    values, vectors = np.linalg.eigh(matrix)
+    fixed = vectors @ np.diag(np.clip(values, 1e-6, None)) @ vectors.T
+    scale = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(scale, scale)
+
+
+def _decimals(values):
+    for places in range(MAX_DECIMALS + 1):
+        if np.allclose(values, np.round(values, places), rtol=0, atol=1e-9):
+            return places
+    return MAX_DECIMALS
+
+
+def _regular_steps(values):
+    # Ids step by a constant amount in (nearly) every gap
+    if len(values) < 10:
+        return False
+    steps = np.diff(np.sort(np.asarray(values, dtype="float64")))
+    return pd.Series(steps).value_counts().iloc[0] >= 0.8 * len(steps)
+
+
+def _quantile(sorted_values, u):
+    # Inverse empirical CDF with linear interpolation between seed values;
+    # the grid is uniform, so positions are computed rather than searched
+    position = u * (len(sorted_values) - 1)
+    low = np.minimum(position.astype("int64"), len(sorted_values) - 1)
+    high = np.minimum(low + 1, len(sorted_values) - 1)
+    frac = position - low
+    return sorted_values[low] + frac * (sorted_values[high] - sorted_values[low])
+
+
+def _draw(cumulative, u):
+    # Index of the first cumulative probability above u; ``cumulative`` is
+    # one row shared by all draws or one row per draw
+    return np.minimum((u[:, None] > cumulative).sum(axis=1), cumulative.shape[1] - 1)
+
+
+class SeedSynthesizer:
+    """Fits a seed DataFrame and samples new rows that resemble it."""
+
+    def __init__(self, random_state=None):
+        self.rng = np.random.default_rng(random_state)
+        self.seed = None
+        self.columns = []
+        self.kinds = {}
+        self._specs = {}
+
+    def _kind(self, series):
+        values = series.dropna()
+        if values.empty:
+            return "empty"
+        unique = values.nunique()
+        if pd.api.types.is_bool_dtype(series):
+            return "categorical"
+        if pd.api.types.is_numeric_dtype(series):
+            integral = np.allclose(values, np.round(values))
+            if integral and unique == len(values) and _regular_steps(values):
+                return "sequence"
+            return "numeric"
+
+        text = values.astype(str)
+        if unique == len(values):
+            matches = text.str.extract(_SEQUENCE)
+            if (
+                matches[1].notna().all()
+                and matches[0].nunique() == 1
+                and _regular_steps(matches[1].astype("int64"))
+            ):
+                return "sequence"
+        parsed = pd.to_datetime(text, errors="coerce", format="ISO8601")
+        if parsed.notna().mean() >= 0.95:
+            return "date"
+        if unique <= MAX_CATEGORIES and unique <= max(2, len(values) // 2):
+            return "categorical"
+        return "text"
+
+    def fit(self, seed):
+        """Learn marginals and dependencies from the ``seed`` DataFrame."""
+        self.seed = seed.reset_index(drop=True)
+        self.columns = list(seed.columns)
+        self.kinds = {col: self._kind(seed[col]) for col in self.columns}
+
+        for col in self.columns:
+            kind = self.kinds[col]
+            spec = {"null_rate": float(seed[col].isna().mean())}
+            values = seed[col].dropna()
+            if kind == "sequence":
+                spec["prefix"] = None
+                numbers = values
+                if not pd.api.types.is_numeric_dtype(seed[col]):
+                    parts = values.astype(str).str.extract(_SEQUENCE)
+                    numbers = parts[1].astype("int64")
+                    spec.update(prefix=parts[0].iloc[0], width=parts[1].str.len().max())
+                ordered = np.sort(numbers.to_numpy())
+                spec["start"] = ordered[-1]
+                spec["step"] = pd.Series(np.diff(ordered)).mode().iloc[0]
+            elif kind == "text":
+                spec["values"] = values.to_numpy()
+            self._specs[col] = spec
+
+        self._fit_categoricals()
+        self._fit_copula()
+        return self
+
+    def _fit_categoricals(self):
+        cats = [c for c in self.columns if self.kinds[c] == "categorical"]
+        self._codes = {}
+        for col in cats:
+            codes, uniques = pd.factorize(self.seed[col], use_na_sentinel=False)
+            self._codes[col] = codes
+            counts = np.bincount(codes, minlength=len(uniques)).astype("float64")
+            self._specs[col].update(categories=uniques, marginal=counts / counts.sum())
+
+        def association(a, b):
+            table = pd.crosstab(self._codes[a], self._codes[b]).to_numpy()
+            value = cramers_v(table.astype("float64"))
+            return 0.0 if np.isnan(value) else value
+
+        # Greedy maximum spanning tree: the root is the column most
+        # associated with the rest, then each step adds the strongest link.
+        strength = {(a, b): association(a, b) for a in cats for b in cats if a < b}
+        link = lambda a, b: strength[(min(a, b), max(a, b))]
+        order = []
+        parents = {}
+        if cats:
+            root = max(cats, key=lambda c: sum(link(c, o) for o in cats if o != c))
+            order.append(root)
+            parents[root] = None
+            remaining = [c for c in cats if c != root]
+            while remaining:
+                child, parent = max(
+                    ((c, p) for c in remaining for p in order),
+                    key=lambda cp: link(*cp),
+                )
+                if link(child, parent) <= 0:
+                    parent = None
+                order.append(child)
+                parents[child] = parent
+                remaining.remove(child)
+        self._cat_order = order
+
+        for col in order:
+            spec = self._specs[col]
+            parent = parents[col]
+            spec["parent"] = parent
+            if parent is None:
+                spec["cumulative"] = np.cumsum(spec["marginal"])[None, :]
+                continue
+            table = np.zeros(
+                (len(self._specs[parent]["categories"]), len(spec["categories"]))
+            )
+            np.add.at(table, (self._codes[parent], self._codes[col]), 1)
+            # One pseudo-row of the marginal keeps rare parents from
+            # forcing a single child value
+            probs = (table + spec["marginal"]) / (table.sum(axis=1, keepdims=True) + 1)
+            spec["cumulative"] = np.cumsum(probs, axis=1)
+
+    def _fit_copula(self):
+        numeric = [c for c in self.columns if self.kinds[c] in ("numeric", "date")]
+        self._numeric = numeric
+        self._anchor = None
+        if not numeric:
+            return
+
+        frame = pd.DataFrame(index=self.seed.index)
+        for col in numeric:
+            values = self.seed[col]
+            spec = self._specs[col]
+            if self.kinds[col] == "date":
+                parsed = pd.to_datetime(
+                    values.astype("string"), errors="coerce", format="ISO8601"
+                )
+                if parsed.dt.tz is not None:
+                    parsed = parsed.dt.tz_localize(None)
+                has_time = (parsed.dropna() != parsed.dropna().dt.normalize()).any()
+                spec["format"] = "%Y-%m-%d %H:%M:%S" if has_time else "%Y-%m-%d"
+                values = (parsed - pd.Timestamp(0)).dt.total_seconds()
+            else:
+                observed = values.dropna().to_numpy(dtype="float64")
+                spec["integer"] = pd.api.types.is_integer_dtype(values) or bool(
+                    np.allclose(observed, np.round(observed))
+                )
+                spec["decimals"] = 0 if spec["integer"] else _decimals(observed)
+            frame[col] = values.astype("float64")
+            spec["null_rate"] = float(frame[col].isna().mean())
+
+        # Marginals are conditioned on the categorical column with the
+        # highest mean correlation ratio against the numeric columns.
+        centred = frame - frame.mean()
+        best = 0.0
+        for col in self._cat_order:
+            grouped = centred.groupby(self._codes[col])
+            etas = correlation_ratio(
+                grouped.count().to_numpy(),
+                grouped.sum().to_numpy(),
+                (centred**2).groupby(self._codes[col]).sum().to_numpy(),
+            )
+            if not np.isnan(etas).all() and np.nanmean(etas) > best:
+                best, self._anchor = float(np.nanmean(etas)), col
+
+        scores = frame.apply(_normal_scores)
+        for col in numeric:
+            spec = self._specs[col]
+            values = frame[col]
+            spec["sorted"] = np.sort(values.dropna().to_numpy())
+            spec["groups"] = {}
+            if self._anchor is None:
+                continue
+            codes = self._codes[self._anchor]
+            for code, group in values.groupby(codes):
+                if group.notna().sum() >= MIN_GROUP_ROWS:
+                    spec["groups"][code] = np.sort(group.dropna().to_numpy())
+                    # Within-group ranks, to match the conditional marginal
+                    rows = codes == code
+                    scores.loc[rows, col] = _normal_scores(group).to_numpy()
+
+        matrix = correlation_matrix(scores).fillna(0.0).to_numpy(copy=True)
+        np.fill_diagonal(matrix, 1.0)
+        self._chol = np.linalg.cholesky(_nearest_correlation(matrix))
+
+    def _sample_categoricals(self, n):
+        codes = {}
+        for col in self._cat_order:
+            spec = self._specs[col]
+            cumulative = spec["cumulative"]
+            if spec["parent"] is not None:
+                cumulative = cumulative[codes[spec["parent"]]]
+            codes[col] = _draw(cumulative, self.rng.random(n))
+        return codes
+
+    def _sample_numeric(self, n, codes):
+        z = self.rng.standard_normal((n, len(self._numeric))) @ self._chol.T
+        u = _normal_cdf(z)
+        out = {}
+        anchor = codes.get(self._anchor) if self._anchor is not None else None
+        for i, col in enumerate(self._numeric):
+            spec = self._specs[col]
+            if len(spec["sorted"]) == 0:
+                out[col] = np.full(n, np.nan)
+                continue
+            values = np.empty(n)
+            rest = np.ones(n, dtype=bool)
+            for code, group in spec["groups"].items():
+                rows = anchor == code
+                values[rows] = _quantile(group, u[rows, i])
+                rest &= ~rows
+            values[rest] = _quantile(spec["sorted"], u[rest, i])
+            values[self.rng.random(n) < spec["null_rate"]] = np.nan
+            out[col] = values
+        return out
+
+    def _format_numeric(self, col, values):
+        spec = self._specs[col]
+        if self.kinds[col] == "date":
+            stamps = pd.to_datetime(pd.Series(values).round(), unit="s")
+            return stamps.dt.strftime(spec["format"])
+        if spec["integer"]:
+            return pd.Series(np.round(values)).astype("Int64")
+        return pd.Series(np.round(values, spec["decimals"]))
+
+    def _sequence(self, col, start, n):
+        spec = self._specs[col]
+        numbers = spec["start"] + spec["step"] * np.arange(start + 1, start + n + 1)
+        if spec["prefix"] is None:
+            return pd.Series(numbers)
+        digits = np.char.zfill(numbers.astype("int64").astype(str), spec["width"])
+        return pd.Series(np.char.add(spec["prefix"], digits))
+
+    def sample(self, n, offset=0):
+        """Draw ``n`` new rows; ``offset`` continues id sequences across calls."""
+        codes = self._sample_categoricals(n)
+        numeric = self._sample_numeric(n, codes) if self._numeric else {}
+        data = {}
+        for col in self.columns:
+            kind = self.kinds[col]
+            spec = self._specs[col]
+            if kind == "categorical":
+                data[col] = pd.Series(spec["categories"][codes[col]])
+            elif kind in ("numeric", "date"):
+                data[col] = self._format_numeric(col, numeric[col])
+            elif kind == "sequence":
+                data[col] = self._sequence(col, offset, n)
+            elif kind == "text":
+                picks = self.rng.integers(0, len(spec["values"]), n)
+                series = pd.Series(spec["values"][picks])
+                data[col] = series.where(self.rng.random(n) >= spec["null_rate"])
+            else:
+                data[col] = pd.Series([None] * n)
+        return pd.DataFrame(data, columns=self.columns)
+
+    def iter_csv_lines(self, n, batch_rows=BATCH_ROWS):
+        """Yield lists of CSV lines (no header) for ``n`` rows, a batch at a time."""
+        done = 0
+        while done < n:
+            size = min(batch_rows, n - done)
+            frame = self.sample(size, offset=done)
+            text = frame.to_csv(index=False, header=False, lineterminator="\n")
+            yield text.rstrip("\n").split("\n")
+            done += size
+
+    def score(self, csv_file_path=None, df=None, sample_size=SCORE_SAMPLE_ROWS):
+        """Compare synthetic output with the seed.
+
+        Both datasets go through the quality analyzer (the output via a
+        sample when it is large). Each column also gets a distance to its
+        seed marginal: the Kolmogorov-Smirnov statistic for numeric and
+        date columns, total variation for the rest. ``correlation_error``
+        is the mean absolute difference between the Pearson matrices.
+        """
+        seed_results = DataQualityAnalyzer.from_dataframe(self.seed).run_full_analysis()
+        analyzer = SampledDataQualityAnalyzer(
+            csv_file_path, sample_size=sample_size, df=df
+        )
+        synthetic_results = analyzer.run_full_analysis()
+        synthetic = analyzer.df
+
+        distances = {}
+        numeric_pairs = []
+        for col in self.columns:
+            kind = self.kinds[col]
+            if kind in ("sequence", "empty") or col not in synthetic:
+                continue
+            if kind in ("numeric", "date"):
+                a, b = self.seed[col], synthetic[col]
+                if kind == "date":
+                    a = pd.to_datetime(a, errors="coerce", format="ISO8601")
+                    b = pd.to_datetime(b, errors="coerce", format="ISO8601")
+                a = pd.to_numeric(a, errors="coerce").dropna().to_numpy("float64")
+                b = pd.to_numeric(b, errors="coerce").dropna().to_numpy("float64")
+                if len(a) and len(b):
+                    grid = np.concatenate([a, b])
+                    cdf_a = np.searchsorted(np.sort(a), grid, side="right") / len(a)
+                    cdf_b = np.searchsorted(np.sort(b), grid, side="right") / len(b)
+                    distances[col] = {
+                        "metric": "ks",
+                        "distance": float(np.abs(cdf_a - cdf_b).max()),
+                    }
+                if kind == "numeric":
+                    numeric_pairs.append(col)
+            else:
+                a = self.seed[col].astype(str).value_counts(normalize=True)
+                b = synthetic[col].astype(str).value_counts(normalize=True)
+                tv = 0.5 * a.sub(b, fill_value=0).abs().sum()
+                distances[col] = {"metric": "tv", "distance": float(tv)}
+
+        correlation_error = None
+        if len(numeric_pairs) > 1:
+            seed_corr = correlation_matrix(self.seed[numeric_pairs].astype("float64"))
+            synth_corr = correlation_matrix(
+                synthetic[numeric_pairs].apply(pd.to_numeric, errors="coerce")
+            )
+            upper = np.triu(np.ones((len(numeric_pairs),) * 2, dtype=bool), k=1)
+            diff = np.abs(seed_corr.to_numpy() - synth_corr.to_numpy())[upper]
+            correlation_error = float(np.nanmean(diff)) if diff.size else None
+
+        mean_distance = (
+            np.mean([d["distance"] for d in distances.values()]) if distances else 0.0
+        )
+        return {
+            "seed_rows": len(self.seed),
+            "seed_scores": seed_results["quality_scores"],
+            "synthetic_scores": synthetic_results["quality_scores"],
+            "sampling": synthetic_results["sampling"],
+            "columns": distances,
+            "correlation_error": correlation_error,
+            "fidelity": (1 - mean_distance) * 100,
+        }
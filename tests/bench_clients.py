@@ -0,0 +1,140 @@
+"""Connection reuse benchmark for ``clients.get_client``.
+
+Serves a minimal OpenAI-compatible endpoint on localhost and sends
+sequential chat completion requests twice: with a new client per call, as
+refine and generate used to, and through the shared pooled client.
+Reports the TCP connections the server accepted and the mean latency.
+
+    python tests/bench_clients.py [--requests 50] [--delay-ms 40]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from openai import OpenAI  # noqa: E402
+
+import clients  # noqa: E402
+
+COMPLETION = {
+    "id": "bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "stub",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "id,name\n1,a"},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+}
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.connections = 0
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, delayed ACKs
+    # add ~40 ms to every response on a kept-alive connection
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # Called once per accepted TCP connection
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.delay)
+        body = json.dumps(COMPLETION).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _send(client):
+    client.chat.completions.create(
+        model="stub", messages=[{"role": "user", "content": "rows please"}]
+    )
+
+
+def _measure(server, requests, make_client):
+    server.connections = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        _send(make_client())
+    elapsed = time.perf_counter() - started
+    return {
+        "connections": server.connections,
+        "mean_ms": round(elapsed * 1000 / requests, 2),
+    }
+
+
+def run(requests=50, delay_ms=40):
+    """Return connection counts and mean latency for both client setups."""
+    server = StubServer(delay_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # A fresh key so the benchmark never reuses a client from another caller
+    api_key = f"bench-{uuid.uuid4().hex}"
+    try:
+        per_call = _measure(
+            server,
+            requests,
+            lambda: OpenAI(base_url=server.base_url, api_key=api_key, max_retries=0),
+        )
+        shared = _measure(
+            server,
+            requests,
+            lambda: clients.get_client(api_key, base_url=server.base_url),
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {"per_call": per_call, "shared": shared}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--delay-ms", type=float, default=40)
+    args = parser.parse_args(argv)
+
+    results = run(args.requests, args.delay_ms)
+    print(f"{args.requests} sequential requests, {args.delay_ms:g} ms server time")
+    for name, label in (("per_call", "new client per call"), ("shared", "shared")):
+        r = results[name]
+        print(
+            f"  {label:<20} {r['connections']:>3} TCP connections, "
+            f"{r['mean_ms']:.1f} ms/request"
+        )
+
+
+if __name__ == "__main__":
+    main()
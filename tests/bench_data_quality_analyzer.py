@@ -0,0 +1,122 @@
+"""Timing benchmark for ``DataQualityAnalyzer.run_full_analysis``.
+
+Writes a seeded synthetic CSV (numeric, categorical and untidy text
+columns with missing values) and times the full analysis on it, loading
+excluded. ``--baseline REV`` also times the analyzer as it was at a git
+revision, e.g. the commit before the single-profile rewrite:
+
+    python tests/bench_data_quality_analyzer.py --rows 1000000 --cols 20 \\
+        --baseline 746323c^
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SRC = os.path.join(REPO_ROOT, "src")
+
+
+def make_frame(rows, cols, seed=0):
+    """Synthetic frame cycling through int, float, category and text columns."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(cols):
+        kind = i % 4
+        if kind == 0:
+            values = rng.integers(-5, 120, rows)
+        elif kind == 1:
+            values = rng.normal(50, 15, rows)
+        elif kind == 2:
+            values = rng.choice(["north", "south", "East", "east ", "west"], rows)
+        else:
+            values = rng.choice([f"item {n}" for n in range(500)], rows)
+        series = pd.Series(values)
+        if kind:
+            series[rng.random(rows) < 0.05] = None
+        data[f"col_{i}"] = series
+    return pd.DataFrame(data)
+
+
+def time_analysis(csv_path, src=SRC, repeat=1):
+    """Best of ``repeat`` timings of ``run_full_analysis`` and its result."""
+    if src not in sys.path:
+        sys.path.insert(0, src)
+    from feedback.data_quality_analyzer import DataQualityAnalyzer
+
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer = DataQualityAnalyzer(csv_path)
+            started = time.perf_counter()
+            results = analyzer.run_full_analysis()
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def _time_revision(rev, csv_path, repeat):
+    # The old tree is imported in a child process so module names never clash
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = subprocess.run(
+            ["git", "-C", REPO_ROOT, "archive", rev, "src"],
+            check=True,
+            capture_output=True,
+        ).stdout
+        subprocess.run(["tar", "-x", "-C", tmp], input=archive, check=True)
+        out = subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--time-only",
+                csv_path,
+                "--src",
+                os.path.join(tmp, "src"),
+                "--repeat",
+                str(repeat),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return float(out.split()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cols", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--baseline", help="git revision to compare against")
+    parser.add_argument("--src", default=SRC, help=argparse.SUPPRESS)
+    parser.add_argument("--time-only", metavar="CSV", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.time_only:
+        print(time_analysis(args.time_only, args.src, args.repeat)[0])
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "bench.csv")
+        make_frame(args.rows, args.cols).to_csv(csv_path, index=False)
+        print(f"run_full_analysis on {args.rows} x {args.cols}")
+        current, _ = time_analysis(csv_path, args.src, args.repeat)
+        print(f"  current      {current:.2f}s")
+        if args.baseline:
+            baseline = _time_revision(args.baseline, csv_path, args.repeat)
+            print(
+                f"  {args.baseline:<12} {baseline:.2f}s "
+                f"({baseline / current:.1f}x slower)"
+            )
+
+
+if __name__ == "__main__":
+    main()
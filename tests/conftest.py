@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# Keep the log, metrics and prompt cache files out of the working tree;
+# the modules read these paths at import time
+_tmp = tempfile.mkdtemp()
+for name, filename in (
+    ("log_path", "app.log"),
+    ("metrics_log_path", "metrics.jsonl"),
+    ("metrics_prom_path", "metrics.prom"),
+    ("prompt_cache_path", "prompt_cache.sqlite3"),
+):
+    os.environ.setdefault(name, os.path.join(_tmp, filename))
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from feedback.accumulators import (
+    HashSet,
+    HyperLogLog,
+    MisraGries,
+    MomentsAccumulator,
+    TDigest,
+    hash_values,
+)
+
+
+def chunks(values, size):
+    return [values[i : i + size] for i in range(0, len(values), size)]
+
+
+@pytest.fixture
+def normal_values():
+    rng = np.random.default_rng(42)
+    values = rng.normal(50, 15, 100_000)
+    values[rng.random(len(values)) < 0.01] = np.nan
+    return values
+
+
+def test_moments_merge_matches_numpy(normal_values):
+    parts = []
+    for chunk in chunks(normal_values, 7_919):
+        acc = MomentsAccumulator()
+        acc.update(chunk)
+        parts.append(acc)
+    merged = MomentsAccumulator()
+    for acc in parts:
+        merged.merge(acc)
+
+    serial = MomentsAccumulator()
+    serial.update(normal_values)
+
+    values = normal_values[~np.isnan(normal_values)]
+    for acc in (merged, serial):
+        assert acc.count == len(values)
+        assert acc.mean == pytest.approx(values.mean(), rel=1e-12)
+        assert acc.std == pytest.approx(values.std(ddof=1), rel=1e-12)
+        assert acc.min == values.min()
+        assert acc.max == values.max()
+
+
+def test_moments_ignore_empty_input():
+    acc = MomentsAccumulator()
+    acc.update([np.nan, np.nan])
+    acc.merge(MomentsAccumulator())
+
+    assert acc.count == 0
+    assert np.isnan(acc.std)
+
+
+@pytest.mark.parametrize("distinct", [500, 20_000, 300_000])
+def test_hyperloglog_error_within_bound(distinct):
+    rng = np.random.default_rng(distinct)
+    values = rng.permutation(np.repeat(np.arange(distinct), 2))
+    hll = HyperLogLog(precision=12)
+    hll.update(values)
+
+    # Three standard errors of 1.04 / sqrt(2 ** 12)
+    bound = 3 * 1.04 / np.sqrt(2**12)
+    assert abs(hll.estimate() - distinct) <= bound * distinct
+
+
+def test_hyperloglog_merge_equals_serial():
+    values = np.arange(50_000)
+    serial = HyperLogLog()
+    serial.update(values)
+
+    merged = HyperLogLog()
+    for chunk in chunks(values, 6_000):
+        part = HyperLogLog()
+        part.update(chunk)
+        merged.merge(part)
+
+    np.testing.assert_array_equal(merged.registers, serial.registers)
+    assert merged.estimate() == serial.estimate()
+
+
+def test_hashset_counts_repeats_across_batches():
+    rng = np.random.default_rng(3)
+    values = rng.integers(0, 5_000, 40_000)
+    seen = HashSet()
+    repeats = sum(
+        seen.add_hashes(hash_values(pd.Series(c))) for c in chunks(values, 3_000)
+    )
+
+    distinct = len(np.unique(values))
+    assert seen.size == distinct
+    assert repeats == len(values) - distinct
+
+
+def test_hashset_merge_equals_serial():
+    values = hash_values(pd.Series(np.arange(10_000) % 7_000))
+    serial = HashSet()
+    serial.add_hashes(values)
+
+    left, right = HashSet(), HashSet()
+    left.add_hashes(values[:6_000])
+    right.add_hashes(values[6_000:])
+    left.merge(right)
+
+    assert left.size == serial.size == 7_000
+    np.testing.assert_array_equal(
+        np.sort(np.concatenate(left.runs)), np.sort(np.concatenate(serial.runs))
+    )
+
+
+def test_tdigest_quantiles_within_bound(normal_values):
+    digest = TDigest()
+    for chunk in chunks(normal_values, 10_000):
+        digest.update(chunk)
+
+    values = normal_values[~np.isnan(normal_values)]
+    assert digest.count == len(values)
+    for q in (0.001, 0.01, 0.25, 0.5, 0.75, 0.99, 0.999):
+        # Rank error, which the k1 scale keeps small near the tails
+        rank = (values <= digest.quantile(q)).mean()
+        assert abs(rank - q) <= 0.005
+        assert digest.cdf(np.quantile(values, q)) == pytest.approx(q, abs=0.005)
+
+
+def test_tdigest_merge_matches_serial(normal_values):
+    serial = TDigest()
+    serial.update(normal_values)
+
+    merged = TDigest()
+    for chunk in chunks(normal_values, 9_000):
+        part = TDigest()
+        part.update(chunk)
+        merged.merge(part)
+
+    assert merged.count == serial.count
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        assert merged.quantile(q) == pytest.approx(serial.quantile(q), abs=0.2)
+
+
+def test_misra_gries_finds_heavy_hitters():
+    rng = np.random.default_rng(11)
+    heavy = np.repeat(["a", "b", "c"], [5_000, 3_000, 2_000])
+    tail = np.array([f"v{i}" for i in rng.integers(0, 20_000, 40_000)])
+    values = rng.permutation(np.concatenate([heavy, tail]))
+    capacity = 50
+
+    sketch = MisraGries(capacity)
+    for chunk in chunks(values, 4_000):
+        sketch.update(chunk)
+
+    exact = pd.Series(values).value_counts()
+    # Counts are lower bounds, short by at most n / (capacity + 1)
+    slack = len(values) / (capacity + 1)
+    assert [item for item, _ in sketch.top(3)] == ["a", "b", "c"]
+    for item, count in sketch.counters.items():
+        assert exact[item] - slack <= count <= exact[item]
+
+
+def test_misra_gries_merge_keeps_bound():
+    rng = np.random.default_rng(5)
+    values = rng.zipf(1.5, 60_000) % 10_000
+    capacity = 30
+    exact = pd.Series(values).value_counts()
+
+    merged = MisraGries(capacity)
+    for chunk in chunks(values, 5_000):
+        part = MisraGries(capacity)
+        part.update(chunk)
+        merged.merge(part)
+
+    slack = len(values) / (capacity + 1)
+    assert len(merged.counters) <= capacity
+    for item, count in merged.counters.items():
+        assert exact[item] - slack <= count <= exact[item]
+    # Anything more frequent than the slack must survive the merges
+    for item in exact[exact > slack].index:
+        assert item in merged.counters.index
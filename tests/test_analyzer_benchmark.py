@@ -0,0 +1,13 @@
+import bench_data_quality_analyzer as bench
+
+
+def test_benchmark_runs_scaled_down(tmp_path):
+    csv_path = tmp_path / "bench.csv"
+    bench.make_frame(5_000, 8).to_csv(csv_path, index=False)
+
+    elapsed, results = bench.time_analysis(str(csv_path))
+
+    assert elapsed > 0
+    assert results["basic_info"]["shape"] == (5_000, 8)
+    assert results["quality_assessment"]["missing_values"]["col_1"] > 0
+    assert any("col_2" in issue for issue in results["consistency_issues"])
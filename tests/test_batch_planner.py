@@ -0,0 +1,108 @@
+import pytest
+
+from batch_planner import BatchPlanner
+
+
+def test_first_wave_uses_initial_size():
+    planner = BatchPlanner(1000, initial_batch_size=100)
+
+    assert planner.plan_wave(1) == [100]
+    assert planner.batches_issued == 1
+
+
+def test_batches_fill_the_token_budget():
+    planner = BatchPlanner(10_000, max_tokens=4000, token_headroom=0.85)
+    planner.plan_wave(1)
+    planner.observe(100, 3000)
+
+    assert planner.tokens_per_row == 30
+    assert planner.next_batch_size() == int(4000 * 0.85 / 30)
+
+
+def test_estimate_converges_and_leans_to_wider_rows():
+    planner = BatchPlanner(100_000)
+    planner.observe(100, 5000)
+    assert planner.tokens_per_row == 50
+
+    # Narrower rows pull the estimate down gradually
+    previous = planner.tokens_per_row
+    for _ in range(30):
+        planner.observe(100, 2000)
+        assert 20 <= planner.tokens_per_row <= previous
+        previous = planner.tokens_per_row
+    assert planner.tokens_per_row == pytest.approx(20, abs=0.01)
+
+    # A wider batch is taken at once
+    planner.observe(100, 4000)
+    assert planner.tokens_per_row == 40
+
+
+def test_observe_ignores_empty_batches():
+    planner = BatchPlanner(1000)
+    planner.observe(0, 500)
+    planner.observe(10, 0)
+
+    assert planner.tokens_per_row is None
+    assert planner.rows_collected == 10
+
+
+@pytest.mark.parametrize(
+    "tokens_per_row, expected",
+    [(1000, 10), (0.5, 500)],
+)
+def test_batch_size_is_clamped(tokens_per_row, expected):
+    planner = BatchPlanner(100_000, min_batch_size=10, max_batch_size=500)
+    planner.observe(10, 10 * tokens_per_row)
+
+    assert planner.next_batch_size() == expected
+
+
+def test_batch_size_never_exceeds_remaining_rows():
+    planner = BatchPlanner(105)
+    planner.observe(100, 1000)
+
+    assert planner.next_batch_size() == 5
+    assert planner.plan_wave(4) == [5]
+
+
+def test_wave_respects_concurrency_and_batch_cap():
+    planner = BatchPlanner(10_000, max_batches=6)
+    planner.observe(0, 0)
+    planner.tokens_per_row = 34
+
+    assert planner.plan_wave(4) == [100] * 4
+    assert planner.plan_wave(4) == [100] * 2
+    assert planner.done
+    assert planner.plan_wave(4) == []
+
+
+def test_discarded_rows_are_planned_again():
+    planner = BatchPlanner(200)
+    planner.observe(200, 6000)
+    assert planner.done
+
+    planner.discard(30)
+
+    assert not planner.done
+    assert planner.remaining_rows == 30
+    assert planner.plan_wave(2) == [30]
+
+
+def test_simulated_job_reaches_target_within_budget():
+    true_tokens_per_row = 47
+    planner = BatchPlanner(2_000, max_tokens=4000)
+    sizes = []
+    while not planner.done:
+        # As in generate: the first batch runs alone to measure tokens per row
+        for size in planner.plan_wave(1 if planner.tokens_per_row is None else 3):
+            sizes.append(size)
+            # The model stops at the token limit, so oversized batches lose rows
+            rows = min(size, 4000 // true_tokens_per_row)
+            planner.observe(rows, rows * true_tokens_per_row)
+
+    # The last wave may overshoot by less than a batch; generate trims it
+    assert 2_000 <= planner.rows_collected < 2_000 + 72
+    # Every batch after the first fits the budget, none is truncated
+    assert all(size * true_tokens_per_row <= 4000 for size in sizes[1:])
+    first_rows = 4000 // true_tokens_per_row
+    assert planner.batches_issued == 1 + -(-(2_000 - first_rows) // 72)
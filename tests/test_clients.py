@@ -0,0 +1,17 @@
+import bench_clients
+import clients
+
+
+def test_one_client_per_key():
+    first = clients.get_client("key-a", base_url="http://127.0.0.1:1/v1")
+
+    assert clients.get_client("key-a", base_url="http://127.0.0.1:1/v1") is first
+    assert clients.get_client("key-b", base_url="http://127.0.0.1:1/v1") is not first
+    assert first.max_retries == 0
+
+
+def test_shared_client_reuses_its_connection():
+    results = bench_clients.run(requests=10, delay_ms=0)
+
+    assert results["per_call"]["connections"] == 10
+    assert results["shared"]["connections"] == 1
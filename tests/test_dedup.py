@@ -0,0 +1,40 @@
+from dedup import RowDeduplicator
+
+
+def test_repeated_rows_are_dropped_after_normalizing():
+    dedup = RowDeduplicator()
+    dedup.set_header("id,name")
+
+    kept = dedup.filter(["1,Ann", "2,Bob", " 1 , ann ", "2,Bob"], batch_num=0)
+
+    assert kept == ["1,Ann", "2,Bob"]
+    assert dedup.batch_stats[0]["duplicates"] == 2
+
+
+def test_composite_key_columns():
+    dedup = RowDeduplicator(key_columns=["region", "id"])
+    dedup.set_header("id,region,name")
+
+    kept = dedup.filter(["1,north,Ann", "1,south,Bob", "1,North,Cid"])
+
+    assert kept == ["1,north,Ann", "1,south,Bob"]
+
+
+def test_unique_columns_are_checked_separately():
+    dedup = RowDeduplicator(unique_columns=["id", "email"])
+    dedup.set_header("id,email,name")
+
+    kept = dedup.filter(
+        ["1,a@x.io,Ann", "2,a@x.io,Bob", "1,c@x.io,Cid", "3,c@x.io,Cid"]
+    )
+
+    assert kept == ["1,a@x.io,Ann", "3,c@x.io,Cid"]
+    assert dedup.duplicate_rate == 0.5
+
+
+def test_key_columns_missing_from_header_are_ignored():
+    dedup = RowDeduplicator(key_columns=["id", "sku"], unique_columns=["email"])
+    dedup.set_header("id,name")
+
+    # The composite key falls back to id; email is not a column at all
+    assert dedup.filter(["1,Ann", "2,Ann", "1,Bob"]) == ["1,Ann", "2,Ann"]
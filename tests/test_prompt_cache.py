@@ -0,0 +1,57 @@
+import os
+
+import prompt_cache
+from prompt_cache import PromptCache, cache_key, default_cache_path
+
+
+def test_database_is_created_on_first_use(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = PromptCache(str(path))
+    assert not path.exists()
+
+    assert cache.get("missing") is None
+    assert path.exists()
+
+
+def test_default_path_is_beside_the_package(monkeypatch):
+    monkeypatch.delenv("prompt_cache_path", raising=False)
+    assert default_cache_path() == os.path.join(
+        prompt_cache.PACKAGE_DIR, "prompt_cache.sqlite3"
+    )
+
+    monkeypatch.setenv("prompt_cache_path", "cache/prompts.sqlite3")
+    assert default_cache_path() == os.path.join(
+        prompt_cache.PACKAGE_DIR, "cache", "prompts.sqlite3"
+    )
+
+
+def test_path_is_read_from_the_environment_when_opened(tmp_path, monkeypatch):
+    cache = PromptCache()
+    path = tmp_path / "late.sqlite3"
+    monkeypatch.setenv("prompt_cache_path", str(path))
+
+    cache.set("k", "v")
+
+    assert cache.path == str(path)
+    assert path.exists()
+
+
+def test_ttl_and_lru_eviction(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(prompt_cache.time, "time", lambda: now[0])
+    cache = PromptCache(str(tmp_path / "c.sqlite3"), ttl_seconds=60, max_entries=2)
+
+    cache.set("a", "1")
+    cache.set("b", "2")
+    now[0] += 1
+    assert cache.get("a") == "1"
+    cache.set("c", "3")  # evicts b, the least recently used
+    assert cache.get("b") is None
+
+    now[0] += 61
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_key_separates_parts():
+    assert cache_key("ab", "c", "m") != cache_key("a", "bc", "m")
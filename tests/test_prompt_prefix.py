@@ -0,0 +1,63 @@
+import json
+import re
+from types import SimpleNamespace
+
+import generate
+
+REFINED_PROMPT = "Column Name: id\nData Type: integer\nColumn Name: name\n"
+
+
+class FakeCompletions:
+    """Answers every batch request with the number of rows it asks for."""
+
+    def __init__(self):
+        self.requests = []
+        self.next_id = 0
+
+    def create(self, messages, **kwargs):
+        self.requests.append(messages)
+        instruction = messages[-1]["content"]
+        count = int(re.search(r"exactly (\d+) rows", instruction).group(1))
+        rows = ["id,name"] if "Include headers" in instruction else []
+        for _ in range(count):
+            self.next_id += 1
+            rows.append(f"{self.next_id},name {self.next_id}")
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content="\n".join(rows)),
+                    finish_reason="stop",
+                )
+            ],
+            usage=SimpleNamespace(
+                prompt_tokens=100,
+                completion_tokens=20 * count,
+                prompt_tokens_details=None,
+            ),
+        )
+
+
+def test_prompt_prefix_is_identical_across_batches(monkeypatch):
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setenv("deep_seek_api", "test-key")
+    monkeypatch.setattr(generate, "model", lambda prompt, **kwargs: REFINED_PROMPT)
+    monkeypatch.setattr(generate, "get_client", lambda api_key: client)
+
+    csv_text = generate.generate_multiple_batches(
+        "people", target_rows=1000, max_concurrency=3
+    )
+
+    assert csv_text.count("\n") == 1000
+    assert len(completions.requests) > 2
+    prefixes = {
+        json.dumps(messages[:-1], sort_keys=True).encode("utf-8")
+        for messages in completions.requests
+    }
+    assert len(prefixes) == 1
+    assert completions.requests[0][:-1] == [
+        {"role": "system", "content": generate.BATCH_SYSTEM_PROMPT},
+        {"role": "user", "content": REFINED_PROMPT},
+    ]
+    # Only the final message carries the per-batch instruction
+    assert len({messages[-1]["content"] for messages in completions.requests}) > 1
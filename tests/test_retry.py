@@ -0,0 +1,134 @@
+import random
+
+import httpx
+import openai
+import pytest
+
+import retry
+
+REQUEST = httpx.Request("POST", "https://example.test/v1/chat/completions")
+
+
+def status_error(status, headers=None):
+    response = httpx.Response(status, headers=headers or {}, request=REQUEST)
+    return openai.APIStatusError("error", response=response, body=None)
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (status_error(429), True),
+        (status_error(503), True),
+        (status_error(408), True),
+        (status_error(400), False),
+        (status_error(401), False),
+        (openai.APITimeoutError(request=REQUEST), True),
+        (openai.APIConnectionError(request=REQUEST), True),
+        (TimeoutError(), True),
+        (ValueError("bad prompt"), False),
+    ],
+)
+def test_is_transient(error, expected):
+    assert retry.is_transient(error) is expected
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"retry-after-ms": "1500"}, 1.5),
+        ({"retry-after": "3"}, 3.0),
+        ({"retry-after-ms": "soon", "retry-after": "2"}, 2.0),
+        ({"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"}, None),
+        ({}, None),
+    ],
+)
+def test_retry_after_seconds(headers, expected):
+    assert retry.retry_after_seconds(status_error(429, headers)) == expected
+
+
+def test_retry_after_without_response():
+    assert retry.retry_after_seconds(TimeoutError()) is None
+
+
+def test_backoff_delay_bounds():
+    random.seed(7)
+    for attempt in range(10):
+        cap = min(30.0, 1.0 * 2**attempt)
+        delays = [retry.backoff_delay(attempt, 1.0, 30.0) for _ in range(200)]
+        assert all(0 <= d <= cap for d in delays)
+        # Full jitter spreads over the whole window
+        assert max(delays) > cap * 0.8
+        assert min(delays) < cap * 0.2
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(retry.time, "sleep", recorded.append)
+    return recorded
+
+
+def flaky(errors, result="ok"):
+    errors = list(errors)
+    calls = []
+
+    def fn(*args, **kwargs):
+        calls.append((args, kwargs))
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+def test_call_with_retry_recovers(sleeps):
+    fn = flaky([status_error(503), status_error(429, {"retry-after": "2"})])
+    attempts = []
+
+    result = retry.call_with_retry(
+        fn,
+        "prompt",
+        batch=3,
+        base_delay=1.0,
+        max_delay=30.0,
+        on_retry=lambda attempt, e: attempts.append(attempt),
+    )
+
+    assert result == "ok"
+    assert fn.calls == [(("prompt",), {"batch": 3})] * 3
+    assert attempts == [1, 2]
+    assert 0 <= sleeps[0] <= 1.0
+    assert sleeps[1] == 2.0  # Retry-After wins over the backoff
+
+
+def test_retry_after_is_capped(sleeps):
+    fn = flaky([status_error(429, {"retry-after": "600"})])
+
+    retry.call_with_retry(fn, max_delay=5.0)
+
+    assert sleeps == [5.0]
+
+
+def test_call_with_retry_gives_up(sleeps):
+    fn = flaky([status_error(503)] * 5)
+    attempts = []
+
+    with pytest.raises(openai.APIStatusError):
+        retry.call_with_retry(
+            fn, max_retries=3, on_retry=lambda attempt, e: attempts.append(attempt)
+        )
+
+    assert len(fn.calls) == 4
+    assert attempts == [1, 2, 3]
+    assert len(sleeps) == 3
+
+
+def test_permanent_errors_are_not_retried(sleeps):
+    fn = flaky([status_error(400)])
+
+    with pytest.raises(openai.APIStatusError):
+        retry.call_with_retry(fn)
+
+    assert len(fn.calls) == 1
+    assert sleeps == []
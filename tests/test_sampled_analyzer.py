@@ -0,0 +1,132 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feedback import sampled_analyzer
+from feedback.sampled_analyzer import (
+    SampledDataQualityAnalyzer,
+    _poisson,
+    _wilson,
+    reservoir_sample,
+)
+
+Z95 = 1.959964
+
+
+def test_reservoir_keeps_input_order_and_counts():
+    sample, seen = reservoir_sample(iter(range(10_000)), 100, random.Random(1))
+
+    assert len(sample) == 100
+    assert sample == sorted(sample)
+    assert seen == 10_000
+
+
+def test_reservoir_returns_everything_when_short():
+    assert reservoir_sample(range(5), 10, random.Random(1)) == ([0, 1, 2, 3, 4], 5)
+
+
+def test_reservoir_is_uniform():
+    n, k, trials = 200, 20, 5_000
+    rng = random.Random(2)
+    hits = np.zeros(n)
+    for _ in range(trials):
+        sample, _ = reservoir_sample(range(n), k, rng)
+        hits[sample] += 1
+
+    # Each item is kept with probability k / n; allow four standard errors
+    expected = trials * k / n
+    sd = np.sqrt(trials * k / n * (1 - k / n))
+    assert np.abs(hits - expected).max() < 4 * sd
+    # The first k items fill the reservoir but must not be favoured
+    assert abs(hits[:k].mean() - hits[k:].mean()) < sd
+
+
+def test_wilson_covers_the_population_rate():
+    rng = np.random.default_rng(3)
+    population = np.zeros(20_000, dtype=bool)
+    population[:1_000] = True
+    n = 400
+    covered = 0
+    for _ in range(2_000):
+        successes = int(rng.choice(population, n, replace=False).sum())
+        low, high = _wilson(successes, n, len(population), Z95)
+        covered += low <= 0.05 <= high
+    assert covered / 2_000 >= 0.93
+
+
+def test_wilson_is_exact_for_the_whole_population():
+    assert _wilson(30, 100, 100, Z95) == (0.3, 0.3)
+    assert _wilson(0, 0, 100, Z95) == (0.0, 1.0)
+
+
+@pytest.mark.parametrize("rate", [0.5, 4, 40])
+def test_poisson_covers_the_rate(rate):
+    counts = np.random.default_rng(4).poisson(rate, 4_000)
+    intervals = [_poisson(count, Z95) for count in counts]
+    covered = sum(low <= rate <= high for low, high in intervals)
+    assert covered / len(counts) >= 0.93
+
+
+def test_poisson_upper_bound_for_zero():
+    low, high = _poisson(0, Z95)
+    assert low == 0
+    assert high > 1
+
+
+def strata_csv(path, rows, shares, seed=0):
+    rng = np.random.default_rng(seed)
+    names = list(shares)
+    df = pd.DataFrame(
+        {
+            "region": rng.choice(names, rows, p=list(shares.values())),
+            "value": rng.normal(0, 1, rows),
+        }
+    )
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_stratified_sample_is_proportional(tmp_path):
+    shares = {"north": 0.6, "south": 0.3, "east": 0.1}
+    df = strata_csv(tmp_path / "data.csv", 50_000, shares)
+
+    analyzer = SampledDataQualityAnalyzer(
+        str(tmp_path / "data.csv"), sample_size=1_000, strata="region", chunksize=5_000
+    )
+
+    assert analyzer.population_rows == len(df)
+    counts = analyzer.df["region"].value_counts()
+    expected = df["region"].value_counts() * 1_000 / len(df)
+    assert (counts - expected.round()).abs().max() <= 1
+
+
+def test_stratified_retention_is_capped(tmp_path, monkeypatch):
+    shares = {f"r{i}": 1 / 50 for i in range(50)}
+    strata_csv(tmp_path / "data.csv", 60_000, shares)
+    retained = []
+    concat = pd.concat
+
+    def tracking_concat(frames, **kwargs):
+        retained.append(len(frames[0]))
+        return concat(frames, **kwargs)
+
+    monkeypatch.setattr(sampled_analyzer.pd, "concat", tracking_concat)
+    SampledDataQualityAnalyzer(
+        str(tmp_path / "data.csv"), sample_size=1_000, strata="region", chunksize=2_000
+    )
+
+    # Each stratum keeps its share plus slack, not sample_size rows
+    slack = sampled_analyzer.STRATUM_SLACK
+    bound = 1_000 * (1 + slack) + 50 * (1 + sampled_analyzer.STRATUM_MIN_SLACK)
+    assert retained and max(retained) <= bound
+
+
+def test_high_cardinality_strata_are_refused(tmp_path):
+    pd.DataFrame({"id": range(sampled_analyzer.MAX_STRATA + 1)}).to_csv(
+        tmp_path / "ids.csv", index=False
+    )
+
+    with pytest.raises(ValueError, match="distinct values"):
+        SampledDataQualityAnalyzer(str(tmp_path / "ids.csv"), strata="id")
@@ -0,0 +1,207 @@
+import pytest
+
+from schema import RowValidator, extract_schema, unique_columns
+
+MARKDOWN_PROMPT = """\
+### Dataset Overview
+Online orders for a small e-commerce store.
+Name: Store Orders
+
+### Column Specifications
+1. **Column Name:** order_id
+   - **Data Type:** integer
+   - **Description:** Unique order identifier
+   - **Sample Values:** 1001, 1002, 1003
+   - **Constraints:** Required, unique, range 1000-999999
+2. **Column Name:** price
+   - **Data Type:** float
+   - **Sample Values:** 19.99, 5.49, 120.00
+   - **Constraints:** Positive value, max 2 decimal places
+3. **Column Name:** satisfaction_score
+   - **Data Type:** float
+   - **Constraints:** 0-100 scale, max 2 decimal places
+4. **Column Name:** channel
+   - **Data Type:** categorical
+   - **Constraints:** One of Online, In-store, Mobile App; required
+5. **Column Name:** payment_method
+   - **Data Type:** categorical
+   - **Constraints:** One of: Credit Card, PayPal, Bank Transfer (required)
+6. **Column Name:** city
+   - **Data Type:** string
+   - **Constraints:** Typically one of the major US cities
+7. **Column Name:** gift_wrap
+   - **Data Type:** string
+   - **Constraints:** Allowed values: Yes/No
+
+### Data quality recommendations
+- Name: keep order_id unique
+"""
+
+BOLD_PROMPT = """\
+**Column Specifications:**
+
+**Column Name:** username
+**Data Type:** string
+**Constraints:** at least 3 characters; optional
+
+**Column Name:** rating
+**Data Type:** integer
+**Constraints:** at least 3 characters; 1 to 10
+
+**Column Name:** balance
+**Data Type:** float
+**Constraints:** Positive or negative, maximum 5000
+
+**Suggestions for validation:**
+Column Name: not_a_column
+"""
+
+TABLE_PROMPT = """\
+Here is the dataset:
+
+| Column Name | Data Type | Description | Constraints |
+|-------------|-----------|-------------|-------------|
+| `age` | integer | Age in years | 18 to 90, required |
+| **plan** | categorical | Plan tier | One of Free, Pro, Enterprise |
+| signup_date | date | First login | Optional |
+"""
+
+HEADER = "order_id,price,satisfaction_score,channel,payment_method,city,gift_wrap"
+
+
+def _by_name(schema):
+    return {spec["name"]: spec for spec in schema}
+
+
+def test_markdown_section_only():
+    specs = _by_name(extract_schema(MARKDOWN_PROMPT))
+
+    assert list(specs) == [
+        "order_id",
+        "price",
+        "satisfaction_score",
+        "channel",
+        "payment_method",
+        "city",
+        "gift_wrap",
+    ]
+    assert specs["order_id"]["type"] == "integer"
+    assert (specs["order_id"]["min"], specs["order_id"]["max"]) == (1000, 999999)
+    assert specs["order_id"]["required"]
+
+
+@pytest.mark.parametrize(
+    "constraints, unique",
+    [
+        ("Required, unique, range 1000-999999", True),
+        ("Primary key", True),
+        ("Not unique; repeats are expected", False),
+        ("Non-unique", False),
+        ("Required", False),
+    ],
+)
+def test_unique_flag(constraints, unique):
+    prompt = f"Column Name: id\nData Type: integer\nConstraints: {constraints}\n"
+
+    assert unique_columns(extract_schema(prompt)) == (["id"] if unique else [])
+
+
+def test_unit_numbers_are_not_bounds():
+    specs = _by_name(extract_schema(MARKDOWN_PROMPT))
+
+    assert (specs["price"]["min"], specs["price"]["max"]) == (0, None)
+    score = specs["satisfaction_score"]
+    assert (score["min"], score["max"]) == (0, 100)
+
+
+def test_allowed_values_stop_at_clause_breaks():
+    specs = _by_name(extract_schema(MARKDOWN_PROMPT))
+
+    assert specs["channel"]["allowed"] == {"online", "in-store", "mobile app"}
+    assert specs["channel"]["required"]
+    assert specs["payment_method"]["allowed"] == {
+        "credit card",
+        "paypal",
+        "bank transfer",
+    }
+    assert specs["gift_wrap"]["allowed"] == {"yes", "no"}
+    assert specs["city"]["allowed"] is None
+
+
+def test_bold_section_and_range_over_prose():
+    specs = _by_name(extract_schema(BOLD_PROMPT))
+
+    assert list(specs) == ["username", "rating", "balance"]
+    assert (specs["rating"]["min"], specs["rating"]["max"]) == (1, 10)
+    assert not specs["username"]["required"]
+    assert (specs["balance"]["min"], specs["balance"]["max"]) == (None, 5000)
+
+
+def test_table_form():
+    specs = _by_name(extract_schema(TABLE_PROMPT))
+
+    assert list(specs) == ["age", "plan", "signup_date"]
+    assert (specs["age"]["min"], specs["age"]["max"]) == (18, 90)
+    assert specs["age"]["required"]
+    assert specs["plan"]["allowed"] == {"free", "pro", "enterprise"}
+    assert specs["signup_date"]["type"] == "date"
+
+
+def test_no_schema():
+    assert extract_schema("") == []
+    assert extract_schema("Generate some customer data please.") == []
+
+
+def test_validator_accepts_valid_rows():
+    validator = RowValidator(HEADER, extract_schema(MARKDOWN_PROMPT))
+    lines = [
+        "1001,19.99,87.5,Online,Credit Card,Boston,Yes",
+        "1002,$1,250.00,42,In-store,PayPal,Springfield,no",
+        '1003,5.49,100,Mobile App,Bank Transfer,"Portland, OR",No',
+    ]
+
+    valid, rejected = validator.validate(lines)
+
+    assert rejected == 1  # the unquoted "$1,250.00" splits into two fields
+    assert valid == [lines[0], lines[2]]
+    assert validator.reasons == {"wrong field count": 1}
+
+
+@pytest.mark.parametrize(
+    "line, reason",
+    [
+        ("999,19.99,50,Online,PayPal,Boston,Yes", "order_id: below 1000"),
+        ("1001.5,19.99,50,Online,PayPal,Boston,Yes", "order_id: not integer"),
+        (",19.99,50,Online,PayPal,Boston,Yes", "order_id: missing"),
+        ("1001,-3,50,Online,PayPal,Boston,Yes", "price: below 0"),
+        ("1001,cheap,50,Online,PayPal,Boston,Yes", "price: not float"),
+        ("1001,19.99,120,Online,PayPal,Boston,Yes", "satisfaction_score: above 100"),
+        ("1001,19.99,50,Phone,PayPal,Boston,Yes", "channel: unexpected value"),
+        ("1001,19.99,50,Online,PayPal,Boston,Maybe", "gift_wrap: unexpected value"),
+        ("1001,19.99,50,Online", "wrong field count"),
+    ],
+)
+def test_validator_rejects_invalid_rows(line, reason):
+    validator = RowValidator(HEADER, extract_schema(MARKDOWN_PROMPT))
+
+    valid, rejected = validator.validate([line])
+
+    assert (valid, rejected) == ([], 1)
+    assert validator.reasons == {reason: 1}
+
+
+def test_validator_types_and_header_mismatch():
+    schema = extract_schema(TABLE_PROMPT)
+    validator = RowValidator("age,plan,signup_date", schema)
+
+    valid, rejected = validator.validate(
+        ["30,pro,2024-01-05", "45, Free ,", "17,Pro,2024-01-05", "30,Pro,someday"]
+    )
+
+    assert valid == ["30,pro,2024-01-05", "45, Free ,"]
+    assert rejected == 2
+    assert validator.rejection_rate == 0.5
+
+    # A header unrelated to the schema only checks field counts
+    loose = RowValidator("a,b", schema)
+    assert loose.validate(["x,y", "x"]) == (["x,y"], 1)
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+from generate import _stream_batch
+
+
+class FakeStream:
+    def __init__(self, body, finish_reason="stop", chunk=7):
+        self.events = [
+            SimpleNamespace(
+                usage=None,
+                choices=[
+                    SimpleNamespace(
+                        delta=SimpleNamespace(content=body[i : i + chunk]),
+                        finish_reason=None,
+                    )
+                ],
+            )
+            for i in range(0, len(body), chunk)
+        ]
+        self.events.append(
+            SimpleNamespace(
+                usage=None,
+                choices=[
+                    SimpleNamespace(
+                        delta=SimpleNamespace(content=None),
+                        finish_reason=finish_reason,
+                    )
+                ],
+            )
+        )
+        self.closed = False
+
+    def __iter__(self):
+        for event in self.events:
+            if self.closed:
+                raise RuntimeError("read from a closed stream")
+            yield event
+
+    def close(self):
+        self.closed = True
+
+
+BODY = "id,name\n1,Ann\n2,Bob\n3,Cid"
+
+
+def test_rows_are_yielded_and_stream_closed():
+    stream = FakeStream(BODY)
+    info = {}
+
+    assert list(_stream_batch(stream, info)) == ["id,name", "1,Ann", "2,Bob", "3,Cid"]
+    assert info["reason"] == "stop"
+    assert stream.closed
+
+
+def test_row_cut_off_by_max_tokens_is_dropped():
+    stream = FakeStream(BODY, finish_reason="length")
+
+    assert list(_stream_batch(stream)) == ["id,name", "1,Ann", "2,Bob"]
+
+
+def test_closing_early_closes_the_stream():
+    stream = FakeStream(BODY)
+    lines = _stream_batch(stream)
+
+    assert next(lines) == "id,name"
+    lines.close()
+
+    assert stream.closed